@@ -0,0 +1,209 @@
+# app_log.py
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from collections import deque
+
+LOG_QUEUE_SIZE = 10000  # 백그라운드 스레드가 처리하기 전까지 보관하는 최대 레코드 수
+LOG_VIEW_LINES = 2000  # 앱 내 로그 뷰가 보관하는 최근 줄 수
+LOG_AGGREGATE_INTERVAL = 1.0  # 같은 종류의 메시지를 한 줄로 모으는 구간(초)
+LOG_FORMAT = "%(asctime)s.%(msecs)03d %(levelname).1s %(message)s"
+LOG_DATE_FORMAT = "%H:%M:%S"
+
+logger = logging.getLogger("mstg")
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """큐가 가득 차면 기다리지 않고 레코드를 버리고 개수만 세는 QueueHandler."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RingBufferHandler(logging.Handler):
+    """최근 로그 줄을 보관하는 핸들러. GUI는 since(total)로 새 줄만 가져갑니다."""
+
+    def __init__(self, capacity=LOG_VIEW_LINES):
+        super().__init__()
+        self.lines = deque(maxlen=capacity)
+        self.total = 0  # 지금까지 기록한 줄 수 (버려진 줄 포함)
+
+    def emit(self, record):
+        line = self.format(record)
+        with self.lock:
+            self.lines.append(line)
+            self.total += 1
+
+    def since(self, total):
+        """total 이후에 기록된 줄과 새 total을 반환합니다. 너무 오래됐으면 보관 중인 줄 전체."""
+        with self.lock:
+            new = min(self.total - total, len(self.lines))
+            lines = list(self.lines)[len(self.lines) - new :] if new > 0 else []
+            return lines, self.total
+
+
+class RateLimiter:
+    """종류(key)별로 interval마다 첫 메시지만 기록하고 나머지는 개수만 세어 요약합니다.
+
+    key는 (형식 문자열, 인자...) 튜플이며 요약 줄에 그대로 쓰입니다.
+    예: ("ID mismatch from node %d", 5) → "ID mismatch from node 5 ×12034 in last 1 s".
+    호출 쪽 비용은 딕셔너리 조회 한 번이므로 프레임마다 불러도 됩니다.
+    """
+
+    def __init__(self, log=logger, interval=LOG_AGGREGATE_INTERVAL):
+        self.log = log
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.entries = {}  # key -> [구간 시작, 억제한 개수, level]
+
+    def __call__(self, level, key, msg, *args):
+        if not self.log.isEnabledFor(level):
+            return
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and now - entry[0] < self.interval:
+                entry[1] += 1
+                return
+            self.entries[key] = [now, 0, level]
+        if entry is not None and entry[1]:
+            self._summarize(key, entry, now)
+        self.log.log(level, msg, *args)
+
+    def flush(self, force=False):
+        """구간이 끝났는데 요약을 못 남긴 key를 정리합니다 (백그라운드에서 주기적으로 호출).
+
+        force면 구간이 남은 key도 모두 요약합니다 (종료 시).
+        """
+        now = time.monotonic()
+        with self.lock:
+            expired = [
+                (key, entry)
+                for key, entry in self.entries.items()
+                if force or now - entry[0] >= self.interval
+            ]
+            for key, _ in expired:
+                del self.entries[key]
+        for key, entry in expired:
+            if entry[1]:
+                self._summarize(key, entry, now)
+
+    def _summarize(self, key, entry, now):
+        start, count, level = entry
+        self.log.log(
+            level, "%s ×%d in last %.0f s", key[0] % key[1:], count, max(now - start, 1.0)
+        )
+
+
+limited = RateLimiter()
+ring_handler = RingBufferHandler()
+_listener = None
+
+
+def setup_logging(console=True, level=logging.INFO):
+    """큐 핸들러와 백그라운드 기록 스레드를 설정합니다. 여러 번 불러도 한 번만 적용됩니다."""
+    global _listener
+    if _listener is not None:
+        return
+    formatter = logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT)
+    handlers = [ring_handler]
+    if console:
+        # 콘솔 출력은 백그라운드 스레드에서만 일어나므로 느린 콘솔이 호출 쪽을 막지 않음
+        handlers.append(logging.StreamHandler(sys.stdout))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.Queue(LOG_QUEUE_SIZE)
+    logger.addHandler(DroppingQueueHandler(log_queue))
+    logger.setLevel(level)
+    logger.propagate = False
+    _listener = logging.handlers.QueueListener(log_queue, *handlers)
+    _listener.start()
+    threading.Thread(target=_flush_loop, daemon=True).start()
+
+
+def _flush_loop():
+    while _listener is not None:
+        time.sleep(LOG_AGGREGATE_INTERVAL)
+        limited.flush()
+
+
+class _ForwardHandler(logging.Handler):
+    """다른 프로세스에서 온 레코드를 이 프로세스의 logger로 넘깁니다."""
+
+    def emit(self, record):
+        logger.handle(record)
+
+
+def forward_records(log_queue):
+    """자식 프로세스가 log_queue로 보낸 레코드를 이 프로세스의 로그로 옮기는 리스너를 시작합니다.
+
+    끝낼 때는 반환된 리스너의 stop()을 부릅니다.
+    """
+    listener = logging.handlers.QueueListener(log_queue, _ForwardHandler())
+    listener.start()
+    return listener
+
+
+def setup_child_logging(log_queue, level=logging.INFO):
+    """spawn된 자식 프로세스용. 레코드를 log_queue(multiprocessing 큐)로 보내 부모가 기록하게 합니다."""
+    logger.addHandler(DroppingQueueHandler(log_queue))
+    logger.setLevel(level)
+    logger.propagate = False
+    threading.Thread(target=_child_flush_loop, daemon=True).start()
+
+
+def _child_flush_loop():
+    # 자식 프로세스는 프로세스가 끝날 때까지 돌고, 남은 요약은 종료 시 flush(force=True)로 남김
+    while True:
+        time.sleep(LOG_AGGREGATE_INTERVAL)
+        limited.flush()
+
+
+def set_debug(enabled):
+    logger.setLevel(logging.DEBUG if enabled else logging.INFO)
+
+
+def shutdown_logging():
+    """남은 레코드를 모두 기록하고 백그라운드 스레드를 멈춥니다."""
+    global _listener
+    if _listener is None:
+        return
+    limited.flush(force=True)
+    listener, _listener = _listener, None
+    listener.stop()
+
+
+def dropped_records():
+    """큐가 넘쳐 버린 레코드 수."""
+    return sum(
+        handler.dropped
+        for handler in logger.handlers
+        if isinstance(handler, DroppingQueueHandler)
+    )
+
+
+if __name__ == "__main__":
+    # 사용법: python app_log.py [호출 수] — 수신 경로처럼 같은 경고를 연속 호출할 때의 비용 측정
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    setup_logging(console=True)
+    start = time.perf_counter()
+    for i in range(calls):
+        node = i % 4 + 2
+        limited(logging.WARNING, ("ID mismatch from node %d", node), "ID mismatch: node %d", node)
+    elapsed = time.perf_counter() - start
+    shutdown_logging()
+    print(
+        f"{calls} rate-limited calls: {elapsed / calls * 1e6:.2f} us/call, "
+        f"{ring_handler.total} lines written, {dropped_records()} dropped"
+    )
@@ -1,10 +1,11 @@
 from PyQt5.QtCore import QTimer
-from PyQt5.QtWidgets import QMessageBox
 from PyQt5.QtCore import QThread, pyqtSignal
 from itertools import islice
 import can
+import logging
 import time
 import queue
+from app_log import limited, logger
 
 # Response constants
 MSTG_BOOT_RSP_UPDATE_BEGIN = 0x01
@@ -24,6 +25,18 @@ MSTG_BOOT_CRC = 0x03
 MSTG_BOOT_RSP = 0x04
 MSTG_BOOT_STRAP = 0x05
 
+# 부트로더가 수신 스레드에 구독하는 cmd ID
+MSTG_BOOT_CMD_IDS = (
+    MSTG_BOOT_START,
+    MSTG_BOOT_RECORD,
+    MSTG_BOOT_DATA,
+    MSTG_BOOT_CRC,
+    MSTG_BOOT_RSP,
+    MSTG_BOOT_STRAP,
+)
+MSTG_BOOT_RX_QUEUE_SIZE = 256
+MSTG_BOOT_STATE_TICK_MS = 10  # 상태 머신 진행 주기
+
 
 class DataSplitter:
     def __init__(self, data):
@@ -35,9 +48,21 @@ class DataSplitter:
 
 
 class StateMachine:
-    def __init__(self, window, hex_file_path):
-        self.window = window
+    """HEX 파일을 부트로더로 보내는 상태 머신. CanEngine이 소유하며 위젯을 참조하지 않습니다.
+
+    node_id는 일반 업데이트 대상 노드(1~31, 시작 시 한 번 받음)입니다. 화면 쪽 반응은
+    콜백으로 받습니다: on_progress(현재 줄), on_complete(), on_message(제목, 내용).
+    """
+
+    def __init__(
+        self, engine, hex_file_path, node_id, on_progress=None, on_complete=None, on_message=None
+    ):
+        self.engine = engine
         self.hex_file_path = hex_file_path
+        self.node_id = node_id
+        self.on_progress = on_progress
+        self.on_complete = on_complete
+        self.on_message = on_message
         self.record_list = self.parse_hex_file(hex_file_path)
         self.state = "INIT"
         self.chunk_counter = 0
@@ -62,13 +87,25 @@ class StateMachine:
         self.response_timer = QTimer()
         self.response_timer.timeout.connect(self.check_response)
 
-        self.can_receiver = window.can_receiver
+        self.state_timer = QTimer()
+        self.state_timer.timeout.connect(self.run_next_state)
+
+        self.can_receiver = engine.can_receiver
+        self.rx_subscription = self.can_receiver.subscribe(
+            "bootloader", MSTG_BOOT_CMD_IDS, maxsize=MSTG_BOOT_RX_QUEUE_SIZE
+        )
 
         # False is Normal Update, True is Bootstrap Update
         self.update_mode = False
 
+    def notify(self, title, text):
+        if self.on_message is not None:
+            self.on_message(title, text)
+        else:
+            logger.info("[Bootloader] %s: %s", title, text)
+
     def send_can_message(self, arbitration_id, data0, data1):
-        if self.window.bus is None:
+        if self.engine.bus is None:
             self.log_debug(
                 f"[SEND] Bus not connected. ID: {hex(arbitration_id)}, data0: {hex(data0)}, data1: {hex(data1)}"
             )
@@ -78,7 +115,7 @@ class StateMachine:
             msg = can.Message(
                 arbitration_id=arbitration_id, data=data, is_extended_id=False
             )
-            self.window.bus.send(msg)
+            self.engine.send(msg)
             self.log_debug(f"[SEND] Sent ID: {hex(arbitration_id)}, Data: {data}")
         except can.CanError as e:
             self.log_debug(f"[SEND] Failed to send CAN message: {e}")
@@ -86,8 +123,8 @@ class StateMachine:
     def update_progress(self):
         if not self.is_running:
             return
-        # self.current_line += 1
-        self.window.progress_thread.update_progress(self.current_line)
+        if self.on_progress is not None:
+            self.on_progress(self.current_line)
 
     def stop(self):
         self.is_running = False
@@ -95,26 +132,22 @@ class StateMachine:
             self.strap_timer.stop()
         if self.response_timer.isActive():
             self.response_timer.stop()
-        if self.window.progress_dialog:
-            self.window.progress_dialog.close()
+        self.state_timer.stop()
         # 기타 실행 중인 타이머나 스레드가 있다면 여기서 중지
-        self.log_debug("StateMachine stopped.")
+        self.can_receiver.unsubscribe(self.rx_subscription)
+        self.log_debug(
+            f"StateMachine stopped. RX delivered: {self.rx_subscription.delivered}, "
+            f"dropped: {self.rx_subscription.dropped}"
+        )
 
     def get_id_input(self):
-        # id_input 값을 가져오는 메서드
-        try:
-            id_value = int(self.window.id_input.text())
-            if 1 <= id_value <= 31:
-                return id_value
-            else:
-                self.log_debug(f"Invalid ID input: {id_value}.")
-                self.stop()
-                return -1
-        except ValueError:
-            self.log_debug("Invalid ID input. Using default value 1.")
-            QMessageBox.information(self.window, "BootStrap Update", "Invalid ID input")
-            self.stop()
-            return -1
+        # 시작할 때 받은 대상 노드 ID
+        if self.node_id is not None and 1 <= self.node_id <= 31:
+            return self.node_id
+        self.log_debug(f"Invalid ID input: {self.node_id}.")
+        self.notify("BootStrap Update", "Invalid ID input")
+        self.stop()
+        return -1
 
     def start_bootstrap(self):
         self.update_mode = True
@@ -123,8 +156,8 @@ class StateMachine:
         self.strap_start_time = None
         self.log_debug("StateMachine started.")
         self.response_timer.start(1)  # 1ms마다 체크
-        self.window.statemachine_timer.start(1)
-        QMessageBox.information(self.window, "BootStrap Update", "Turn ON Motor")
+        self.state_timer.start(MSTG_BOOT_STATE_TICK_MS)
+        self.notify("BootStrap Update", "Turn ON Motor")
 
     def start_normalboot(self):
         self.update_mode = False
@@ -133,7 +166,7 @@ class StateMachine:
         self.strap_start_time = None
         self.log_debug("StateMachine started.")
         self.response_timer.start(1)  # 1ms마다 체크
-        self.window.statemachine_timer.start(1)
+        self.state_timer.start(MSTG_BOOT_STATE_TICK_MS)
         self.send_bootstart()
 
     def run_next_state(self):
@@ -185,7 +218,8 @@ class StateMachine:
         elif self.state == "COMPLETE":
             self.log_debug("StateMachine completed.")
             self.stop()
-            self.window.statemachine_completed()
+            if self.on_complete is not None:
+                self.on_complete()
 
         else:
             self.log_debug(f"Unexpected state: {self.state}")
@@ -256,17 +290,17 @@ class StateMachine:
         if not self.is_running:
             return
 
-        if self.window.bus is None:
+        if self.engine.bus is None:
             self.log_debug("CAN bus is not connected. Simulating response.")
             return self.simulate_response()
 
         try:
-            message = self.can_receiver.get_message()
+            message = self.rx_subscription.get()
             if message is None:
                 return None
             else:
                 can_id = message.arbitration_id
-                frame_id = can_id & 0x3F if not self.window.uses_adjusted_id else can_id
+                frame_id = can_id & 0x3F if not self.engine.uses_adjusted_id else can_id
 
                 # self.nodeid = (message.arbitration_id >> 6) & 0x1F
                 # self.cmdid = message.arbitration_id & 0x1F
@@ -297,7 +331,7 @@ class StateMachine:
         except Exception as e:
             self.log_debug(f"Error in check_response: {e}")
 
-        new_queue_size = self.can_receiver.queue_size()
+        new_queue_size = self.rx_subscription.qsize()
         self.log_debug(f"Queue size after processing: {new_queue_size}")
         return None
 
@@ -392,7 +426,7 @@ class StateMachine:
             self.log_debug("StateMachine completed.")
             # 타이머 중지
             self.response_timer.stop()
-            self.window.statemachine_timer.stop()
+            self.state_timer.stop()
 
     def simulate_response(self):
         # 가상의 응답을 반환합니다 (디버그 모드용).
@@ -417,16 +451,22 @@ class StateMachine:
             record_data, data, checksum = self.current_record
             self.current_line += 1  # 현재 라인 번호 증가
             self.update_progress()
-            print(f"Line {self.current_line}/{self.total_lines}")
+            limited(
+                logging.INFO,
+                ("[Bootloader] HEX lines sent",),
+                "[Bootloader] Line %d/%d",
+                self.current_line,
+                self.total_lines,
+            )
             self.data_splitter = DataSplitter(data)  # 데이터 부분만 DataSplitter로 생성
             self.state = "SEND_RECORD"
         except StopIteration:
             self.state = "WAIT_FOR_ENDOFFILE"
 
     def log_debug(self, message):
-        if self.window.debug_output:
-            print(message)
-            pass
+        if self.engine.debug_output:
+            # 콘솔 출력은 로그 스레드가 하므로 1ms 상태 머신 틱을 막지 않음
+            logger.debug(message)
 
     def send_strap(self):
         self.send_can_message(MSTG_BOOT_STRAP, 0x00000000, 0x00000000)
@@ -444,10 +484,8 @@ class StateMachine:
             self.log_debug("Max strap duration reached without response.")
             self.state = "COMPLETE"
             self.strap_timer.stop()
-            self.window.statemachine_timer.stop()
-            QMessageBox.information(
-                self.window, "BootStrap Update", "Update Failed: No response"
-            )
+            self.state_timer.stop()
+            self.notify("BootStrap Update", "Update Failed: No response")
         else:
             self.send_strap()
             response = self.check_response()
@@ -469,7 +507,7 @@ class StateMachine:
         if self.state != "SEND_STRAP":
             QTimer.singleShot(0, self.run_next_state)
 
-        if self.window.bus is None:
+        if self.engine.bus is None:
             self.log_debug("CAN bus is not connected. Would send MSTG_BOOT_STRAP.")
             return
         try:
@@ -479,9 +517,9 @@ class StateMachine:
                 data=[0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00],
                 is_extended_id=False,
             )
-            self.window.bus.send(msg)
+            self.engine.send(msg)
 
-            self.window.bus.send(msg)
+            self.engine.send(msg)
         except can.CanError as e:
             self.log_debug(f"Failed to send CAN message: {e}")
 
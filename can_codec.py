@@ -0,0 +1,299 @@
+# can_codec.py
+import random
+import sys
+import time
+
+import cantools
+import numpy as np
+
+# DBC 로드 시 메시지마다 확인하는 무작위 payload 수
+VERIFY_SAMPLES = 64
+# BatchDecoder는 payload를 64비트 정수 하나로 보고 계산하므로 클래식 CAN(8바이트)까지만 사용.
+# CAN-FD처럼 더 긴 메시지는 프레임별 디코더로 처리
+BATCH_MAX_LENGTH = 8
+
+
+def signal_extract_source(signal, message_length, index):
+    """signal 하나의 raw 값을 꺼내 스케일을 적용하는 코드 줄을 만듭니다."""
+    mask = (1 << signal.length) - 1
+    if signal.byte_order == "little_endian":
+        source = "le"
+        shift = signal.start
+    else:
+        # Motorola: start는 MSB의 sawtooth 비트 번호
+        source = "be"
+        msb = 8 * (signal.start // 8) + (7 - signal.start % 8)
+        shift = message_length * 8 - (msb + signal.length)
+
+    lines = [f"    x{index} = ({source} >> {shift}) & {mask:#x}"]
+    if signal.is_signed:
+        sign_bit = 1 << (signal.length - 1)
+        lines.append(f"    x{index} -= (x{index} & {sign_bit:#x}) << 1")
+
+    scale = signal.scale
+    offset = signal.offset
+    if type(scale) is int and scale == 1 and type(offset) is int and offset == 0:
+        value = f"x{index}"
+    else:
+        # cantools와 같은 식(scale * raw + offset)을 그대로 사용해 결과를 비트 단위로 일치시킴
+        value = f"{scale!r} * x{index} + {offset!r}"
+    return lines, value
+
+
+def compile_message_decoder(message):
+    """메시지 하나에 대한 디코더 함수를 생성합니다. 지원하지 않는 구조면 None."""
+    if message.is_multiplexed() or message.is_container:
+        return None
+    if any(signal.is_float for signal in message.signals):
+        return None
+
+    length = message.length
+    body = ["def decode(data):", f"    if len(data) != {length}:", "        return fallback(data)"]
+    if any(s.byte_order == "little_endian" for s in message.signals):
+        body.append("    le = from_bytes(data, 'little')")
+    if any(s.byte_order == "big_endian" for s in message.signals):
+        body.append("    be = from_bytes(data, 'big')")
+
+    items = []
+    for index, signal in enumerate(message.signals):
+        lines, value = signal_extract_source(signal, length, index)
+        body.extend(lines)
+        items.append(f"{signal.name!r}: {value}")
+    body.append("    return {" + ", ".join(items) + "}")
+
+    def fallback(data):
+        return message.decode(data, decode_choices=False)
+
+    namespace = {"from_bytes": int.from_bytes, "fallback": fallback}
+    exec("\n".join(body), namespace)
+    return namespace["decode"]
+
+
+def _same_value(a, b):
+    return type(a) is type(b) and repr(a) == repr(b)
+
+
+def verify_decoder(message, decode, samples=VERIFY_SAMPLES, rng=None):
+    """무작위 payload로 cantools 결과와 비트 단위로 같은지 확인합니다."""
+    rng = rng or random.Random(message.frame_id)
+    for _ in range(samples):
+        data = bytes(rng.getrandbits(8) for _ in range(message.length))
+        expected = message.decode(data, decode_choices=False)
+        actual = decode(data)
+        if expected.keys() != actual.keys():
+            return False
+        if not all(_same_value(expected[k], actual[k]) for k in expected):
+            return False
+    return True
+
+
+class BatchDecoder:
+    """같은 메시지 N개를 (N, length) uint8 배열로 받아 signal별 열(NumPy 배열)로 디코딩합니다.
+
+    length가 BATCH_MAX_LENGTH 이하인 메시지만 지원합니다.
+    """
+
+    def __init__(self, message):
+        self.message = message
+        self.length = message.length
+        self.fields = []
+        for signal in message.signals:
+            # payload를 8바이트로 채운 뒤 64비트 정수로 보고 계산
+            if signal.byte_order == "little_endian":
+                big = False
+                shift = signal.start
+            else:
+                big = True
+                msb = 8 * (signal.start // 8) + (7 - signal.start % 8)
+                shift = 64 - (msb + signal.length)
+            mask = (1 << signal.length) - 1
+            sign_bit = 1 << (signal.length - 1) if signal.is_signed else 0
+            scale = signal.scale
+            offset = signal.offset
+            keep_raw = type(scale) is int and scale == 1 and type(offset) is int and offset == 0
+            self.fields.append(
+                (signal.name, big, np.uint64(shift), np.uint64(mask), sign_bit,
+                 signal.length, scale, offset, keep_raw)
+            )
+
+    def pack(self, frames):
+        """can.Message 목록을 (N, length) uint8 배열로 묶습니다."""
+        data = b"".join(msg.data for msg in frames)
+        return np.frombuffer(data, dtype=np.uint8).reshape(len(frames), self.length)
+
+    def decode(self, rows):
+        if rows.shape[1] != 8:
+            padded = np.zeros((rows.shape[0], 8), dtype=np.uint8)
+            padded[:, : rows.shape[1]] = rows
+            rows = padded
+        rows = np.ascontiguousarray(rows)
+        le = rows.view("<u8")[:, 0]
+        be = rows.view(">u8")[:, 0]
+
+        columns = {}
+        for name, big, shift, mask, sign_bit, length, scale, offset, keep_raw in self.fields:
+            raw = ((be if big else le) >> shift) & mask
+            if sign_bit:
+                raw = raw.view(np.int64)
+                if length < 64:
+                    raw = raw - ((raw & sign_bit) << 1)
+            elif length < 64:
+                raw = raw.astype(np.int64)
+            columns[name] = raw if keep_raw else scale * raw + offset
+        return columns
+
+
+def verify_batch_decoder(message, batch_decoder, samples=VERIFY_SAMPLES, rng=None):
+    """배치 디코딩 결과가 cantools 결과와 행 단위로 같은지 확인합니다."""
+    rng = rng or random.Random(message.frame_id)
+    data = bytes(rng.getrandbits(8) for _ in range(message.length * samples))
+    rows = np.frombuffer(data, dtype=np.uint8).reshape(samples, message.length)
+    columns = batch_decoder.decode(rows)
+    for i in range(samples):
+        expected = message.decode(bytes(rows[i]), decode_choices=False)
+        if expected.keys() != columns.keys():
+            return False
+        for name, value in expected.items():
+            if not _same_value(value, columns[name][i].item()):
+                return False
+    return True
+
+
+class CompiledCodec:
+    """frame ID별 디코더 테이블. DBC 로드 시 한 번 만들어 수신 경로에서 사용합니다."""
+
+    def __init__(self, db, verify_samples=VERIFY_SAMPLES):
+        self.db = db
+        self.decoders = {}  # frame_id -> (message, decode)
+        self.compiled = set()  # 생성된 디코더를 쓰는 frame_id
+        self.batch_decoders = {}  # frame_id -> BatchDecoder
+        for message in db.messages:
+            decode = compile_message_decoder(message)
+            if decode is not None and verify_decoder(message, decode, verify_samples):
+                self.compiled.add(message.frame_id)
+                if message.length <= BATCH_MAX_LENGTH:
+                    batch_decoder = BatchDecoder(message)
+                    if verify_batch_decoder(message, batch_decoder, verify_samples):
+                        self.batch_decoders[message.frame_id] = batch_decoder
+            else:
+                decode = self._cantools_decoder(message)
+            self.decoders[message.frame_id] = (message, decode)
+
+    @staticmethod
+    def _cantools_decoder(message):
+        def decode(data):
+            return message.decode(data, decode_choices=False)
+
+        return decode
+
+    def get(self, frame_id):
+        """(message, decode) 또는 DBC에 없는 ID면 None."""
+        return self.decoders.get(frame_id)
+
+    def decode(self, frame_id, data):
+        return self.decoders[frame_id][1](data)
+
+    def get_batch(self, frame_id):
+        """배치 디코딩이 가능한 메시지면 BatchDecoder, 아니면 None."""
+        return self.batch_decoders.get(frame_id)
+
+
+class PayloadCache:
+    """(노드, cmd) 즉 arbitration ID별 마지막 payload.
+
+    payload가 그대로면 디코딩과 위젯 갱신을 건너뛸 수 있습니다.
+    """
+
+    def __init__(self):
+        self.entries = {}  # can_id -> payload bytes
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, can_id, data):
+        """payload가 직전과 같으면 True (적중률 통계에 반영)."""
+        if self.entries.get(can_id) == data:
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def matches(self, can_id, data):
+        """통계를 남기지 않고 payload가 직전과 같은지만 확인합니다."""
+        return self.entries.get(can_id) == data
+
+    def store(self, can_id, data):
+        self.entries[can_id] = bytes(data)
+
+    def record(self, hits, misses):
+        self.hits += hits
+        self.misses += misses
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self):
+        """화면에 표시된 값과 캐시가 어긋날 수 있을 때(ID 변경, 값 편집 등) 호출합니다."""
+        self.entries.clear()
+
+
+def _benchmark(db, codec, messages, frames=20000):
+    """cantools 조회+디코드와 컴파일된 디코더의 프레임당 시간(us)을 비교합니다."""
+    rng = random.Random(0)
+    payloads = [
+        (m.frame_id, bytes(rng.getrandbits(8) for _ in range(m.length)))
+        for m in (rng.choice(messages) for _ in range(frames))
+    ]
+
+    start = time.perf_counter()
+    for frame_id, data in payloads:
+        db.get_message_by_frame_id(frame_id)
+        db.decode_message(frame_id, data, decode_choices=False)
+    cantools_us = (time.perf_counter() - start) / frames * 1e6
+
+    start = time.perf_counter()
+    for frame_id, data in payloads:
+        codec.get(frame_id)[1](data)
+    codec_us = (time.perf_counter() - start) / frames * 1e6
+
+    return cantools_us, codec_us
+
+
+if __name__ == "__main__":
+    # 사용법: python can_codec.py <dbc 파일> [메시지당 검증 샘플 수]
+    dbc_file = sys.argv[1] if len(sys.argv) > 1 else "dist/CAN_MSTG_Rev.2.14_common_onlyVEL.dbc"
+    samples = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+
+    db = cantools.database.load_file(dbc_file)
+    codec = CompiledCodec(db, verify_samples=samples)
+    print(f"Compiled {len(codec.compiled)}/{len(db.messages)} messages")
+    for message in db.messages:
+        status = "OK" if message.frame_id in codec.compiled else "cantools fallback"
+        print(f"  0x{message.frame_id:03X} {message.name}: {status}")
+
+    compiled = [m for m in db.messages if m.frame_id in codec.compiled]
+    print("Decode cost (cantools -> compiled, us/frame):")
+    for message in compiled:
+        cantools_us, codec_us = _benchmark(db, codec, [message], frames=5000)
+        print(f"  {message.name:<34} {cantools_us:6.2f} -> {codec_us:5.2f}")
+    cantools_us, codec_us = _benchmark(db, codec, compiled)
+    print(f"  {'(all messages, mixed)':<34} {cantools_us:6.2f} -> {codec_us:5.2f}")
+
+    print("Batch decode cost (1000 frames, us/frame):")
+    rng = random.Random(0)
+    for name in ("ID00_21_RSP_PVT_REPORT", "ID00_22_RSP_IDQ_REPORT", "ID00_23_RSP_VDQ_REPORT"):
+        try:
+            message = db.get_message_by_name(name)
+        except KeyError:
+            continue
+        batch_decoder = codec.get_batch(message.frame_id)
+        if batch_decoder is None:
+            continue
+        rows = np.frombuffer(
+            bytes(rng.getrandbits(8) for _ in range(message.length * 1000)), dtype=np.uint8
+        ).reshape(1000, message.length)
+        start = time.perf_counter()
+        for _ in range(100):
+            batch_decoder.decode(rows)
+        batch_us = (time.perf_counter() - start) / 100 / 1000 * 1e6
+        print(f"  {name:<34} {batch_us:5.3f}")
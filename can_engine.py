@@ -0,0 +1,695 @@
+# can_engine.py
+import logging
+import os
+import re
+import sys
+import threading
+import time
+
+import can
+import cantools
+import numpy as np
+
+from app_log import limited, setup_logging, shutdown_logging
+from bootloader_update import StateMachine
+from can_codec import CompiledCodec, PayloadCache
+from can_receiver import CANReceiver
+from rx_engine import EngineBus
+from signal_store import SignalStore
+from tx_scheduler import (
+    CATCH_UP_POLICIES,
+    CATCH_UP_SKIP,
+    CyclicTaskStreams,
+    TimingWheel,
+    TxScheduler,
+    has_native_periodic,
+)
+
+# 한 묶음에 같은 ID의 프레임이 이 수 이상이면 NumPy로 한 번에 디코딩.
+# NumPy 호출의 고정 비용 때문에 이보다 적으면 프레임 단위 디코딩이 더 빠름 (rx_benchmark 기준)
+BATCH_DECODE_MIN = 16
+
+# 정확한 ID 집합 대신 단일 마스크(하드웨어 필터 1개)를 쓸 때 허용하는 최대 초과 비율
+FILTER_COVER_FACTOR = 4
+
+CONTROL_TX_PERIOD = 0.010  # Single 제어 모드 메시지 송신 주기(초)
+CONTROL_KEYWORDS = ("CTRL_POS", "CTRL_VEL", "CTRL_TORQ")  # Single 제어 모드별 메시지 이름 키워드
+CONTROL_TX_STREAM = "TX/CTRL"  # TX 스케줄러의 제어 모드 스트림 이름 (로그 태그로도 쓰임)
+MULTI_TX_STREAM = "TX/MULTI"  # Multi 탭 슬롯 스트림 이름
+# bus가 드라이버 주기 송신을 지원하면 주기 스트림을 드라이버에 맡김 (False면 항상 TxScheduler)
+TX_USE_DRIVER_PERIODIC = True
+
+
+def parse_dbc_to_dict(db):
+    """메시지 이름 -> {signal 이름: 0} (메시지 목록과 그래프 콤보 구성용)."""
+    return {
+        message.name: {signal.name: 0 for signal in message.signals}
+        for message in db.messages
+    }
+
+
+def build_control_index(db, common):
+    """(제어 모드 키워드, 노드 ID) -> 보낼 cantools 메시지 튜플.
+
+    common DBC는 모든 노드가 같은 메시지를 쓰므로 노드 자리에 None을 둡니다. 그 밖의 DBC는
+    이름에 "IDnn_"가 들어간 메시지를 노드 nn에 넣습니다. DBC를 읽을 때 한 번만 만들어,
+    모드나 노드가 바뀔 때는 딕셔너리 조회만 하면 됩니다.
+    """
+    index = {}
+    for message in db.messages:
+        for keyword in CONTROL_KEYWORDS:
+            if keyword not in message.name:
+                continue
+            if common:
+                index.setdefault((keyword, None), []).append(message)
+                continue
+            for node_id in {int(n) for n in re.findall(r"ID(\d\d)_", message.name)}:
+                index.setdefault((keyword, node_id), []).append(message)
+    return {key: tuple(messages) for key, messages in index.items()}
+
+
+def _build_raw_payload(message, message_data):
+    """Convert physical signal values to raw values before encoding."""
+    raw_payload = {}
+
+    for signal in message.signals:
+        if signal.name not in message_data:
+            continue
+
+        value = message_data[signal.name]
+        # Convert textual choice labels back to their numeric representation.
+        if signal.choices and isinstance(value, str):
+            reversed_choices = {v: k for k, v in signal.choices.items()}
+            value = reversed_choices.get(value, value)
+
+        scale = getattr(signal, "scale", None)
+        offset = getattr(signal, "offset", 0)
+
+        try:
+            if scale in (None, 0):
+                # For zero scale signals, fall back to the initial value (or 0)
+                # because any raw value maps to the same physical value.
+                if signal.initial is not None:
+                    raw_value = signal.initial
+                else:
+                    raw_value = value if scale is None else 0
+            else:
+                raw_value = (value - offset) / scale
+        except ZeroDivisionError:
+            raw_value = signal.initial if signal.initial is not None else 0
+
+        if not signal.is_float and isinstance(raw_value, float):
+            raw_value = int(round(raw_value))
+
+        raw_payload[signal.name] = raw_value
+
+    return raw_payload
+
+
+def _acceptance_filters_for_ids(can_ids):
+    """11비트 ID 집합을 받아들이는 python-can 필터 목록을 만듭니다."""
+    ids = sorted({int(can_id) & 0x7FF for can_id in can_ids})
+    if not ids:
+        return None
+
+    # 모든 ID를 덮는 단일 마스크. 초과분이 작으면 하드웨어 필터 1개로 처리
+    common_and = 0x7FF
+    common_or = 0
+    for can_id in ids:
+        common_and &= can_id
+        common_or |= can_id
+    cover_mask = ~(common_and ^ common_or) & 0x7FF
+    cover_size = 1 << bin(~cover_mask & 0x7FF).count("1")
+    if cover_size <= len(ids) * FILTER_COVER_FACTOR:
+        return [{"can_id": common_and, "can_mask": cover_mask, "extended": False}]
+
+    # 아니면 한 비트만 다른 항목끼리 병합해 정확한 집합을 더 적은 필터로 표현
+    entries = {(can_id, 0x7FF) for can_id in ids}
+    changed = True
+    while changed:
+        changed = False
+        for bit in (1 << b for b in range(11)):
+            halves = {}
+            for can_id, mask in entries:
+                if mask & bit:
+                    halves.setdefault((can_id & ~bit, mask), []).append((can_id, mask))
+            for (base, mask), members in halves.items():
+                if len(members) == 2:
+                    entries.difference_update(members)
+                    entries.add((base, mask & ~bit))
+                    changed = True
+
+    return [
+        {"can_id": can_id, "can_mask": mask, "extended": False}
+        for can_id, mask in sorted(entries)
+    ]
+
+
+class CanEngine:
+    """bus, DBC, 디코더, signal 저장소와 주기 송신을 가진 GUI 독립 CAN 엔진.
+
+    위젯을 전혀 참조하지 않으므로 CLI나 테스트에서 그대로 돌릴 수 있습니다.
+    GUI는 node_id/control_keyword 같은 상태를 위젯 이벤트에서 한 번만 바꿔 주고,
+    디코딩 결과는 add_listener()로 등록한 관찰자로 받습니다.
+    관찰자는 listener(can_id, message, timestamps, columns)로 호출됩니다. columns가
+    None이면 프레임 하나(timestamps는 float)이고 값은 signal_store에서 읽으면 됩니다.
+    주기 송신은 set_tx_stream()으로 넣으며, bus가 드라이버 주기 송신을 지원하면 그쪽에,
+    아니면 tx_scheduler 스레드에 맡기므로 GUI가 멈춰도 제어 메시지 주기가 유지됩니다.
+    """
+
+    def __init__(self):
+        self.bus = None
+        self.db = None
+        self.db_filename = None
+        self.codec = None  # DBC 로드 시 생성되는 frame ID별 디코더 테이블
+        self.signal_store = None  # DBC 로드 시 생성되는 (노드, signal) 값 저장소
+        self.payload_cache = PayloadCache()
+        self.message_data = {}
+        self.uses_adjusted_id = False
+        self.node_id = None  # Single 탭에서 보고 있는 노드 ID (입력이 잘못되면 None)
+        self.control_keyword = None  # 주기 송신 중인 제어 모드 ("CTRL_POS" 등), 없으면 None
+        self.tx_frames = {}  # (메시지 이름, 노드) -> 인코딩해 둔 송신 can.Message
+        self.control_index = {}  # build_control_index() 결과
+        self.control_common = False  # common DBC면 제어 메시지가 노드와 무관
+        self.control_stream_names = frozenset()  # 제어 스트림이 지금 보내는 메시지 이름
+        self.simulator = None  # device가 simulator로 연결됐을 때의 DriveSimulator
+        self.bootloader = None  # 펌웨어 업데이트 중이면 StateMachine
+        self.debug_output = False
+        self.listeners = []
+        self.can_receiver = CANReceiver(self)
+        self.can_receiver.start()
+        self.tx_lock = threading.Lock()  # GUI 스레드와 TX 스케줄러가 같은 bus로 보냄
+        self.tx_scheduler = TxScheduler(self.send_frame)  # 스트림이 생기면 송신 스레드 시작
+        self.cyclic_tasks = None  # 연결된 bus가 드라이버 주기 송신을 지원할 때의 CyclicTaskStreams
+        # 스트림 이름 -> (TimingWheel, catch_up). 연결이 바뀌면 새 송신 쪽으로 다시 넣음
+        self.tx_streams = {}
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    # ---- DBC ----
+
+    def load_dbc(self, file_name):
+        """DBC를 읽어 디코더와 저장소를 다시 만듭니다. 실패하면 예외를 그대로 올립니다."""
+        db = cantools.database.load_file(file_name)
+        self.codec = CompiledCodec(db)
+        self.signal_store = SignalStore(db)
+        self.db = db
+        self.payload_cache.clear()
+        self.tx_frames.clear()
+        self.db_filename = os.path.basename(file_name)
+        self.message_data = parse_dbc_to_dict(db)
+        # ID00_ 메시지만 있으면 상위 5비트가 노드 ID인 구조
+        self.uses_adjusted_id = not any(
+            m.name.startswith("ID") and not m.name.startswith("ID00_") for m in db.messages
+        )
+        self.control_common = "common" in self.db_filename.lower()
+        self.control_index = build_control_index(db, self.control_common)
+        self.update_control_stream()
+
+    def unload_dbc(self):
+        self.tx_frames.clear()
+        self.control_index = {}
+        self.db = None
+        self.codec = None
+        self.signal_store = None
+        self.update_control_stream()
+
+    def frame_id_for(self, can_id):
+        """수신 arbitration ID를 DBC frame ID로 바꿉니다."""
+        return can_id & 0x3F if self.uses_adjusted_id else can_id
+
+    def set_node_id(self, node_id):
+        self.node_id = None if node_id is None else int(node_id) & 0x1F
+        # 다른 노드의 값은 화면에 반영된 적이 없으므로 캐시를 비움
+        self.payload_cache.clear()
+        self.update_control_stream()
+
+    # ---- bus ----
+
+    def connect(self, bus_kwargs, separate_process=False):
+        """bus를 열고 수신을 시작합니다. 실패하면 can.CanError."""
+        if separate_process:
+            # 드라이버 수신은 별도 프로세스가 맡고, 이 프로세스는 공유 메모리 링에서 원시 프레임을
+            # 읽어 디코딩함 (디코딩은 이 프로세스에 남음)
+            self.bus = EngineBus(**bus_kwargs)
+        else:
+            self.bus = can.interface.Bus(**bus_kwargs)
+        self.can_receiver.start()
+        if TX_USE_DRIVER_PERIODIC and has_native_periodic(self.bus):
+            self._move_tx_streams(CyclicTaskStreams(self.bus))
+
+    def disconnect(self):
+        """수신을 멈추고 bus를 닫습니다. shutdown 실패 시 can.CanError를 그대로 올립니다."""
+        self.can_receiver.stop()
+        if self.cyclic_tasks is not None:
+            self._move_tx_streams(None)
+        with self.tx_lock:
+            bus, self.bus = self.bus, None
+        if bus:
+            bus.shutdown()
+        self.stop_simulator()
+
+    def stop_simulator(self):
+        if self.simulator is not None:
+            self.simulator.stop()
+            self.simulator = None
+
+    def build_bus_filters(self, node_ids):
+        """로드된 DBC와 node_ids로 수신 필터를 계산합니다. None이면 전체 수신."""
+        if self.db is None:
+            return None
+
+        frame_ids = [m.frame_id for m in self.db.messages if not m.is_extended_frame]
+        if not self.uses_adjusted_id:
+            # ID별 메시지가 DBC에 모두 정의된 구조 → DBC frame ID 그대로
+            return _acceptance_filters_for_ids(frame_ids)
+
+        if not node_ids:
+            return None
+        cmd_ids = {frame_id & 0x3F for frame_id in frame_ids}
+        return _acceptance_filters_for_ids(
+            (node_id << 6) | cmd_id for node_id in node_ids for cmd_id in cmd_ids
+        )
+
+    # ---- 송신 ----
+
+    def send(self, msg):
+        """버스로 프레임을 보내고, 녹화 중이면 송신 프레임도 기록되게 전달합니다."""
+        with self.tx_lock:
+            if self.bus is None:
+                raise can.CanError("CAN bus is not connected")
+            self.bus.send(msg)
+        self.can_receiver.add_sent(msg)
+
+    def encode_frame(self, message_name, signal_values, node_id, tag="TX"):
+        """signal 값으로 node_id에 보낼 can.Message를 만듭니다. 빠진 signal은 0, 실패하면 None."""
+        message = self.db.get_message_by_name(message_name)
+        if not message:
+            return None
+        return self._encode_message(message, signal_values, node_id, tag)
+
+    def _encode_message(self, message, signal_values, node_id, tag="TX"):
+        message_data = {sig.name: 0 for sig in message.signals}
+        message_data.update(signal_values or {})
+        try:
+            raw_payload = _build_raw_payload(message, message_data)
+            encoded_data = message.encode(raw_payload, scaling=False)
+        except (ValueError, KeyError, cantools.database.errors.EncodeError) as e:
+            limited(
+                logging.ERROR,
+                ("[%s] Failed to encode %s", tag, message.name),
+                "[%s] Failed to encode %s: %s",
+                tag,
+                message.name,
+                e,
+            )
+            return None
+
+        frame_id = ((int(node_id) & 0x1F) << 6) | (message.frame_id & 0x3F)
+        return can.Message(arbitration_id=frame_id, data=encoded_data, is_extended_id=False)
+
+    def send_frame(self, msg, tag="TX"):
+        """미리 인코딩한 프레임을 보냅니다. 실패는 기록만 하고 넘어갑니다 (주기 송신용)."""
+        if self.bus is None:
+            return
+        try:
+            self.send(msg)
+        except can.CanError as e:
+            limited(
+                logging.ERROR,
+                ("[%s] Failed to send 0x%03X", tag, msg.arbitration_id),
+                "[%s] Failed to send 0x%03X: %s",
+                tag,
+                msg.arbitration_id,
+                e,
+            )
+            return
+        if self.debug_output:
+            limited(
+                logging.DEBUG,
+                ("[%s] 0x%03X", tag, msg.arbitration_id),
+                "[%s] 0x%03X :: %s",
+                tag,
+                msg.arbitration_id,
+                msg.data.hex(" ").upper(),
+            )
+
+    def tx_frame(self, message, node_id):
+        """signal_store에 있는 node_id의 값으로 message(cantools)를 인코딩한 프레임. 실패하면 None.
+
+        인코딩한 프레임은 (메시지, 노드)별로 보관했다가 값이 바뀔 때까지 그대로 다시 씁니다.
+        """
+        key = (message.name, node_id)
+        msg = self.tx_frames.get(key)
+        if msg is None:
+            values = self.signal_store.read_message(node_id, message.name)
+            msg = self._encode_message(message, values, node_id)
+            if msg is not None:
+                self.tx_frames[key] = msg
+        return msg
+
+    def send_message(self, message_name, node_id):
+        """signal_store에 있는 node_id의 값으로 메시지를 보냅니다."""
+        msg = self.tx_frame(self.db.get_message_by_name(message_name), node_id)
+        if msg is not None:
+            self.send_frame(msg)
+
+    def set_message_values(self, node_id, message_name, values):
+        """사용자가 편집한 값을 저장하고, 보관 중인 송신 프레임을 무효화합니다."""
+        self.signal_store.write_message(node_id, message_name, values)
+        self._invalidate_tx_frame(message_name, node_id)
+        # 편집한 값이 저장되므로 다음 수신 프레임은 다시 반영되어야 함
+        self.payload_cache.clear()
+
+    def _invalidate_tx_frame(self, message_name, node_id):
+        """보관한 송신 프레임을 버리고, 제어 스트림이 보내던 프레임이면 스트림도 갱신합니다."""
+        if self.tx_frames.pop((message_name, node_id), None) is None:
+            return
+        if node_id == self.node_id and message_name in self.control_stream_names:
+            self.update_control_stream()
+
+    def control_messages(self, keyword=None):
+        """현재 노드에 keyword(기본: 선택된 제어 모드)로 보낼 cantools 메시지들."""
+        keyword = keyword or self.control_keyword
+        if self.node_id is None or keyword is None:
+            return ()
+        node_id = None if self.control_common else self.node_id
+        return self.control_index.get((keyword, node_id), ())
+
+    def messages_containing(self, keyword):
+        """현재 노드로 보낼 cantools 메시지 중 이름에 keyword가 들어간 것.
+
+        제어 모드 키워드는 DBC를 읽을 때 만든 인덱스에서 찾고, 그 밖의 키워드만 이름을 훑습니다.
+        """
+        if keyword in CONTROL_KEYWORDS:
+            return self.control_messages(keyword)
+        if self.node_id is None or keyword is None or self.db is None:
+            return []
+        if self.control_common:
+            # DBC 이름에 common 포함 → 전체 메시지
+            return [m for m in self.db.messages if keyword in m.name]
+        # ID 기반 필터링
+        prefix = f"ID{self.node_id:02d}_"
+        return [m for m in self.db.messages if keyword in m.name and prefix in m.name]
+
+    def set_tx_stream(self, name, period, frames, catch_up=CATCH_UP_SKIP):
+        """name 스트림이 frames를 모두 period(초)마다 보내게 합니다."""
+        self.set_tx_schedule(name, TimingWheel.uniform(period, frames), catch_up)
+
+    def set_tx_schedule(self, name, wheel, catch_up=CATCH_UP_SKIP):
+        """name 스트림의 송신표(TimingWheel)를 바꿉니다. 프레임 내용만 바뀌면 위상을 유지합니다.
+
+        catch_up은 마감을 놓쳤을 때의 정책(tx_scheduler의 CATCH_UP_*)으로 스트림마다 정합니다.
+        드라이버 주기 송신은 타이밍을 드라이버가 맡으므로 무시합니다.
+        """
+        if catch_up not in CATCH_UP_POLICIES:
+            raise ValueError(f"Unknown catch-up policy: {catch_up}")
+        if not wheel.entries:
+            self.remove_tx_stream(name)
+            return
+        self.tx_streams[name] = (wheel, catch_up)
+        try:
+            self._tx_backend().set_schedule(name, wheel, catch_up)
+        except (can.CanError, NotImplementedError, ValueError) as e:
+            if self.cyclic_tasks is None:
+                raise
+            # 드라이버가 주기 작업을 거부하면 소프트웨어 스케줄러로 되돌림
+            limited(
+                logging.WARNING,
+                ("[CanEngine] Driver periodic TX failed",),
+                "[CanEngine] Driver periodic TX failed, using TxScheduler: %s",
+                e,
+            )
+            self.cyclic_tasks.stop()
+            self.cyclic_tasks = None
+            for stream_name, (stream_wheel, stream_catch_up) in self.tx_streams.items():
+                self.tx_scheduler.set_schedule(stream_name, stream_wheel, stream_catch_up)
+
+    def remove_tx_stream(self, name):
+        if self.tx_streams.pop(name, None) is not None:
+            self._tx_backend().remove_stream(name)
+
+    def tx_stream_stats(self):
+        return self._tx_backend().stats()
+
+    def _tx_backend(self):
+        return self.cyclic_tasks if self.cyclic_tasks is not None else self.tx_scheduler
+
+    def _move_tx_streams(self, cyclic_tasks):
+        """주기 스트림을 드라이버 주기 송신(cyclic_tasks)과 TxScheduler(None) 사이에서 옮깁니다."""
+        old = self._tx_backend()
+        self.cyclic_tasks = cyclic_tasks
+        new = self._tx_backend()
+        for name, (wheel, catch_up) in self.tx_streams.items():
+            old.remove_stream(name)
+            new.set_schedule(name, wheel, catch_up)
+
+    def set_control_keyword(self, keyword):
+        """Single 제어 모드("CTRL_POS" 등, 없으면 None)를 바꾸고 주기 송신을 시작/중지합니다."""
+        self.control_keyword = keyword
+        self.update_control_stream()
+
+    def send_messages_containing(self, keyword):
+        for message in self.messages_containing(keyword):
+            msg = self.tx_frame(message, self.node_id)
+            if msg is not None:
+                self.send_frame(msg)
+
+    def send_control_messages(self):
+        """선택된 제어 모드의 메시지를 한 번 보냅니다."""
+        for message in self.control_messages():
+            msg = self.tx_frame(message, self.node_id)
+            if msg is not None:
+                self.send_frame(msg)
+
+    def update_control_stream(self):
+        """선택된 제어 모드의 프레임을 TX 스케줄러에 넣습니다. 보낼 것이 없으면 스트림을 뺍니다.
+
+        control_keyword, node_id, DBC나 송신 값이 바뀔 때마다 불러야 합니다.
+        """
+        frames = []
+        messages = self.control_messages() if self.signal_store is not None else ()
+        for message in messages:
+            msg = self.tx_frame(message, self.node_id)
+            if msg is not None:
+                frames.append(msg)
+        self.control_stream_names = frozenset(message.name for message in messages)
+        if frames:
+            self.set_tx_stream(CONTROL_TX_STREAM, CONTROL_TX_PERIOD, frames)
+        else:
+            self.remove_tx_stream(CONTROL_TX_STREAM)
+
+    def encode_for_nodes(self, message_name, signal_values, node_ids, tag="TX/COMMON"):
+        """같은 메시지를 한 번 인코딩해 node_ids의 각 노드로 보낼 프레임 목록을 만듭니다."""
+        encoded = self.encode_frame(message_name, signal_values, 0, tag)
+        if encoded is None:
+            return []
+        return [
+            can.Message(
+                arbitration_id=((int(node_id) & 0x1F) << 6) | encoded.arbitration_id,
+                data=encoded.data,
+                is_extended_id=False,
+            )
+            for node_id in node_ids
+        ]
+
+    def send_to_nodes(self, message_name, signal_values, node_ids, tag="TX/COMMON"):
+        """같은 메시지를 한 번 인코딩해 node_ids의 각 노드로 보냅니다. 빠진 signal은 0."""
+        for frame in self.encode_for_nodes(message_name, signal_values, node_ids, tag):
+            self.send_frame(frame, tag)
+
+    # ---- 수신 ----
+
+    def poll(self):
+        """수신 스레드가 모아 둔 프레임을 꺼내 디코딩합니다. 꺼낸 프레임 목록을 반환."""
+        batch = self.can_receiver.drain()
+        if batch and self.db is not None:
+            self.process(batch)
+        return batch
+
+    def process(self, batch):
+        """프레임 묶음을 디코딩합니다.
+
+        한 묶음에 같은 ID의 프레임이 BATCH_DECODE_MIN개 이상 있고 배치 디코더가 있으면, 그 ID의
+        프레임을 모아 NumPy로 한 번에 디코딩하고 관찰자에게도 한 번에 넘깁니다. 넘기는 시점은
+        그 ID의 첫 프레임이 도착한 자리이고, 나머지 프레임은 도착 순서대로 process_frame()이
+        처리합니다. 그래서 관찰자는 ID마다 시각 순서대로 받지만, 서로 다른 ID 사이의 순서는
+        묶음 안에서 섞일 수 있습니다 (그래프 버퍼는 모두 ID별이라 영향 없음).
+        """
+        groups = {}
+        for msg in batch:
+            frames = groups.get(msg.arbitration_id)
+            if frames is None:
+                groups[msg.arbitration_id] = [msg]
+            else:
+                frames.append(msg)
+
+        columnar = {}  # can_id -> BatchDecoder, 처리한 뒤에는 False
+        for can_id, frames in groups.items():
+            if len(frames) < BATCH_DECODE_MIN:
+                continue
+            batch_decoder = self.codec.get_batch(self.frame_id_for(can_id))
+            # 길이가 다른 프레임이 섞인 ID는 프레임 단위로 처리
+            if batch_decoder is not None and all(
+                len(msg.data) == batch_decoder.length for msg in frames
+            ):
+                columnar[can_id] = batch_decoder
+
+        if not columnar:
+            for msg in batch:
+                self.process_frame(msg)
+            return
+        for msg in batch:
+            can_id = msg.arbitration_id
+            batch_decoder = columnar.get(can_id)
+            if batch_decoder is None:
+                self.process_frame(msg)
+            elif batch_decoder is not False:
+                self.process_columns(can_id, batch_decoder, groups[can_id])
+                columnar[can_id] = False
+
+    def process_frame(self, msg):
+        try:
+            can_id = msg.arbitration_id
+            frame_id = self.frame_id_for(can_id)
+            decoder = self.codec.get(frame_id)
+            if decoder is None:
+                limited(
+                    logging.WARNING,
+                    ("[CanEngine] No DBC message for frame ID 0x%X", frame_id),
+                    "[CanEngine] No DBC message for frame ID: 0x%X",
+                    frame_id,
+                )
+                return
+
+            message = decoder[0]
+            # payload가 직전 프레임과 같으면 디코딩 생략 (관찰자에게는 그대로 알림)
+            if not self.payload_cache.lookup(can_id, msg.data):
+                node_id = (can_id >> 6) & 0x1F
+                try:
+                    self.signal_store.write_frame(node_id, frame_id, msg.data)
+                except Exception as e:
+                    limited(
+                        logging.WARNING,
+                        ("[CanEngine] Decode error for frame ID 0x%X", frame_id),
+                        "[CanEngine] Decode Error: ID: 0x%X, len: %d, error: %s",
+                        frame_id,
+                        len(msg.data),
+                        e,
+                    )
+                    return
+                self.payload_cache.store(can_id, msg.data)
+                if self.tx_frames:
+                    # 수신으로 값이 바뀐 메시지는 다음 송신 때 다시 인코딩
+                    self._invalidate_tx_frame(message.name, node_id)
+
+            for listener in self.listeners:
+                listener(can_id, message, msg.timestamp, None)
+
+        except Exception as e:
+            limited(logging.ERROR, ("[CanEngine] Exception",), "[CanEngine] Exception: %s", e)
+
+    def process_columns(self, can_id, batch_decoder, frames):
+        """같은 ID의 프레임 N개를 signal별 열로 디코딩합니다."""
+        try:
+            message = batch_decoder.message
+            rows = batch_decoder.pack(frames)
+            columns = batch_decoder.decode(rows)
+            last_payload = rows[-1].tobytes()
+            unchanged = self.payload_cache.matches(can_id, last_payload)
+            repeats = int(np.count_nonzero((rows[1:] == rows[:-1]).all(axis=1)))
+            first_repeat = int(self.payload_cache.matches(can_id, rows[0].tobytes()))
+            self.payload_cache.record(
+                repeats + first_repeat, len(frames) - repeats - first_repeat
+            )
+            timestamps = np.fromiter((msg.timestamp for msg in frames), float, len(frames))
+
+            if not unchanged:
+                latest = {name: column[-1].item() for name, column in columns.items()}
+                node_id = (can_id >> 6) & 0x1F
+                self.signal_store.write_message(node_id, message.name, latest)
+                self.payload_cache.store(can_id, last_payload)
+                if self.tx_frames:
+                    self._invalidate_tx_frame(message.name, node_id)
+
+            for listener in self.listeners:
+                listener(can_id, message, timestamps, columns)
+
+        except Exception as e:
+            limited(logging.ERROR, ("[CanEngine] Exception",), "[CanEngine] Exception: %s", e)
+
+    # ---- 부트로더 ----
+
+    def create_bootloader(self, hex_file_path, on_progress=None, on_complete=None, on_message=None):
+        """지금 node_id를 대상으로 하는 펌웨어 업데이트 StateMachine을 만들어 둡니다.
+
+        수신 필터 해제 등 준비가 끝나면 start_bootstrap()/start_normalboot()로 시작합니다.
+        콜백은 StateMachine 참고.
+        """
+        self.stop_bootloader()
+        self.bootloader = StateMachine(
+            self, hex_file_path, self.node_id, on_progress, on_complete, on_message
+        )
+        return self.bootloader
+
+    def stop_bootloader(self):
+        if self.bootloader is not None:
+            self.bootloader.stop()
+            self.bootloader = None
+
+    def stop_tx(self):
+        """모든 주기 송신을 멈춥니다 (종료 시)."""
+        for name in list(self.tx_streams):
+            self.remove_tx_stream(name)
+        self.tx_scheduler.stop()
+
+    def close(self):
+        self.stop_bootloader()
+        self.stop_tx()
+        self.disconnect()
+
+
+if __name__ == "__main__":
+    # 사용법: python can_engine.py [노드 수] [시간(초)]
+    # GUI 없이 시뮬레이터에 연결해 보고를 켜고, 엔진이 디코딩한 프레임 수를 셉니다.
+    from PyQt5.QtCore import QCoreApplication
+
+    from simulator import SIM_CHANNEL, SIM_DBC_FILE, SIM_REPORTS, DriveSimulator
+
+    nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+
+    app = QCoreApplication(sys.argv[:1])  # CANReceiver(QThread)용
+    setup_logging()
+    engine = CanEngine()
+    engine.load_dbc(SIM_DBC_FILE)
+    decoded = [0]
+
+    def count(can_id, message, timestamps, columns):
+        decoded[0] += 1 if columns is None else len(timestamps)
+
+    engine.add_listener(count)
+    engine.simulator = DriveSimulator(range(1, nodes + 1))
+    engine.simulator.start()
+    engine.connect(dict(bustype="virtual", channel=SIM_CHANNEL))
+
+    report_en = engine.db.get_message_by_name("ID00_03_CMD_REPORT_EN")
+    values = {signal.name: 0 for signal in report_en.signals}
+    values.update({report: 1 for report in SIM_REPORTS})
+    for node_id in range(1, nodes + 1):
+        engine.send(
+            can.Message(
+                arbitration_id=(node_id << 6) | (report_en.frame_id & 0x3F),
+                data=report_en.encode(values),
+                is_extended_id=False,
+            )
+        )
+
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        engine.poll()
+        time.sleep(0.02)
+    engine.close()
+    shutdown_logging()
+    print(f"{nodes} nodes: {decoded[0] / duration:.0f} frames/s decoded headless")
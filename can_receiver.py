@@ -1,12 +1,72 @@
-from PyQt5.QtCore import QThread, pyqtSignal
-from queue import Queue, Empty, Full
+from PyQt5.QtCore import QThread
+from collections import deque
 import can
+import copy
+import logging
 import threading
 import time
+from app_log import limited, logger
+
+
+class Subscription:
+    """관심 있는 cmd ID의 프레임만 받는 소비자별 제한 큐."""
+
+    DROP_OLDEST = "drop_oldest"  # 가득 차면 가장 오래된 프레임을 버림
+    DROP_NEWEST = "drop_newest"  # 가득 차면 새로 들어온 프레임을 버림
+
+    def __init__(
+        self, name, cmd_ids=None, maxsize=1024, drop_policy=DROP_OLDEST, include_tx=False
+    ):
+        if drop_policy not in (self.DROP_OLDEST, self.DROP_NEWEST):
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+        self.name = name
+        # None이면 모든 프레임, 아니면 arbitration_id 하위 6비트(cmd ID) 집합
+        self.cmd_ids = frozenset(cmd_ids) if cmd_ids is not None else None
+        self.maxsize = maxsize
+        self.drop_policy = drop_policy
+        self.include_tx = include_tx  # True면 GUI가 송신한 프레임(is_rx=False)도 받음
+        self.queue = deque()
+        self.lock = threading.Lock()
+        self.delivered = 0
+        self.dropped = 0
+
+    def matches(self, msg):
+        return self.cmd_ids is None or (msg.arbitration_id & 0x3F) in self.cmd_ids
+
+    def put_many(self, messages):
+        with self.lock:
+            for msg in messages:
+                if len(self.queue) >= self.maxsize:
+                    self.dropped += 1
+                    if self.drop_policy == self.DROP_NEWEST:
+                        continue
+                    self.queue.popleft()
+                self.queue.append(msg)
+                self.delivered += 1
+
+    def get(self):
+        with self.lock:
+            if self.queue:
+                return self.queue.popleft()
+            return None
+
+    def drain(self):
+        """쌓인 프레임을 도착 순서대로 모두 꺼냅니다."""
+        with self.lock:
+            if not self.queue:
+                return []
+            messages = list(self.queue)
+            self.queue.clear()
+        return messages
+
+    def qsize(self):
+        return len(self.queue)
 
 
 class CANReceiver(QThread):
-    message_received = pyqtSignal(object)
+    RECV_TIMEOUT = 0.1  # 버스 대기 시간(초). stop() 응답 시간의 상한이기도 함
+    MAX_BATCH = 1024  # 한 번에 꺼내는 최대 프레임 수
+    RX_BUFFER_SIZE = 65536  # GUI가 가져가기 전까지 보관하는 최대 프레임 수
 
     def __init__(self, main_window):
         super().__init__()
@@ -14,58 +74,152 @@ class CANReceiver(QThread):
         self.running = False
         self.scanning = False
         self.detected_ids = set()
-        self.message_queue = Queue(maxsize=0)  # 무제한 큐
-        self.queue_lock = threading.Lock()
+
+        # 수신 프레임은 구독한 소비자에게만 전달되고, 아무도 원하지 않으면 버려짐.
+        # 수신 스레드가 순회하는 동안 안전하도록 튜플을 통째로 교체함.
+        self.subscriptions = ()
+        self.subscription_lock = threading.Lock()
+
+        # GUI 스레드가 디스플레이 주기로 가져가는 링 버퍼 (가득 차면 오래된 프레임부터 버림)
+        self.gui_subscription = self.subscribe("gui", maxsize=self.RX_BUFFER_SIZE)
+
+        # 수신 통계 (CPU 사용량 측정용)
+        self.frames_received = 0
+        self.batches_received = 0
+        self.cpu_time = 0.0
+
+        # 드라이버 시각(msg.timestamp)과 time.monotonic()의 차이. 첫 프레임 전에는 None
+        self.clock_offset = None
 
     def run(self):
-        print("[CANReceiver] Thread started")
+        logger.info("[CANReceiver] Thread started")
         self.running = True
+        cpu_start = time.thread_time()
         while self.running:
-            if self.main_window.bus is None:
+            bus = self.main_window.bus
+            if bus is None:
                 time.sleep(0.1)
                 continue
             try:
-                msg = self.main_window.bus.recv(timeout=0.0)
-                if msg is not None and msg.arbitration_id != 0:
-                    self.add_message(msg)
-                    self.message_received.emit(msg)
-                    # print(msg)
-                    if self.scanning:
-                        upper_5_bits_id = (msg.arbitration_id >> 6) & 0x1F
-                        self.detected_ids.add(upper_5_bits_id)
+                batch = self._recv_batch(bus)
+                if batch:
+                    self._dispatch_batch(batch)
             except can.CanError as e:
-                self.log_debug(f"CAN Error: {e}")
+                limited(logging.WARNING, ("CANReceiver: CAN Error",), "CANReceiver: CAN Error: %s", e)
+            self.cpu_time = time.thread_time() - cpu_start
+        logger.info(
+            "[CANReceiver] Thread stopped: %d frames, %.2f ms CPU / 1000 frames",
+            self.frames_received,
+            self.cpu_per_1000_frames(),
+        )
 
-    def add_message(self, msg):
-        with self.queue_lock:
-            before_size = self.message_queue.qsize()
-            try:
-                self.message_queue.put_nowait(msg)
-                after_size = self.message_queue.qsize()
-            except Full:
-                self.log_debug("Queue is full, message discarded")
-
-    def get_message(self):
-        with self.queue_lock:
-            if not self.message_queue.empty():
-                msg = self.message_queue.get_nowait()
-                size = self.message_queue.qsize()
-                return msg
+    def _recv_batch(self, bus):
+        """프레임이 올 때까지 블로킹 대기한 뒤, 이미 도착한 프레임을 한 번에 모두 꺼냅니다."""
+        msg = bus.recv(timeout=self.RECV_TIMEOUT)
+        if msg is None:
+            return None
+        # 블로킹 대기에서 막 깨어난 프레임이 수신 시각에 가장 가까움
+        self.clock_offset = time.monotonic() - msg.timestamp
+
+        batch = [msg]
+        while len(batch) < self.MAX_BATCH:
+            msg = bus.recv(timeout=0.0)
+            if msg is None:
+                break
+            batch.append(msg)
+        return batch
+
+    def _dispatch_batch(self, batch):
+        batch = [msg for msg in batch if msg.arbitration_id != 0]
+        if not batch:
+            return
+
+        self.frames_received += len(batch)
+        self.batches_received += 1
+
+        self.add_messages(batch)
+
+        if self.scanning:
+            for msg in batch:
+                upper_5_bits_id = (msg.arbitration_id >> 6) & 0x1F
+                self.detected_ids.add(upper_5_bits_id)
+
+    def subscribe(
+        self,
+        name,
+        cmd_ids=None,
+        maxsize=1024,
+        drop_policy=Subscription.DROP_OLDEST,
+        include_tx=False,
+    ):
+        """cmd_ids에 해당하는 프레임을 받을 제한 큐를 등록합니다. None이면 전체 프레임."""
+        subscription = Subscription(name, cmd_ids, maxsize, drop_policy, include_tx)
+        with self.subscription_lock:
+            self.subscriptions = self.subscriptions + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.subscription_lock:
+            self.subscriptions = tuple(
+                s for s in self.subscriptions if s is not subscription
+            )
+
+    def add_messages(self, messages):
+        for subscription in self.subscriptions:
+            if subscription.cmd_ids is None:
+                subscription.put_many(messages)
             else:
-                # self.log_debug("Queue is empty")
-                return None
+                wanted = [msg for msg in messages if subscription.matches(msg)]
+                if wanted:
+                    subscription.put_many(wanted)
+
+    def add_message(self, msg):
+        self.add_messages((msg,))
+
+    def add_sent(self, msg):
+        """GUI나 TX 스케줄러가 보낸 프레임을 송신 프레임을 원하는 구독자(녹화 등)에게만 전달합니다."""
+        subscribers = [s for s in self.subscriptions if s.include_tx and s.matches(msg)]
+        if not subscribers:
+            return
+        # 송신 프레임은 미리 인코딩해 반복해서 보내므로, 시각을 찍을 때는 복사본을 씀
+        msg = copy.copy(msg)
+        msg.is_rx = False
+        now = self.driver_time()
+        msg.timestamp = now if now is not None else time.time()
+        for subscription in subscribers:
+            subscription.put_many((msg,))
+
+    def drain(self):
+        """GUI용 링 버퍼에 쌓인 프레임을 도착 순서대로 모두 꺼냅니다."""
+        return self.gui_subscription.drain()
+
+    def pending_count(self):
+        """GUI가 아직 처리하지 않은 프레임 수."""
+        return self.gui_subscription.qsize()
+
+    @property
+    def frames_dropped(self):
+        return self.gui_subscription.dropped
+
+    def driver_time(self):
+        """현재 시각을 드라이버 시각(msg.timestamp) 기준으로 추정합니다. 수신 전이면 None."""
+        offset = self.clock_offset
+        if offset is None:
+            return None
+        return time.monotonic() - offset
 
-    def queue_size(self):
-        with self.queue_lock:
-            size = self.message_queue.qsize()
-            return size
+    def cpu_per_1000_frames(self):
+        """수신 스레드가 1000 프레임당 사용한 CPU 시간(ms)."""
+        if self.frames_received == 0:
+            return 0.0
+        return self.cpu_time * 1000.0 / self.frames_received * 1000.0
 
     def stop(self):
         self.running = False
         self.wait()
 
     def log_debug(self, message):
-        print(f"CANReceiver: {message}")
+        logger.debug("CANReceiver: %s", message)
 
     def start_scan(self):
         """CAN ID 스캔을 시작합니다."""
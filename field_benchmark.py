@@ -0,0 +1,136 @@
+# field_benchmark.py
+# 사용법: python field_benchmark.py [틱 수]
+# signal 100개짜리 64바이트 메시지를 Single 탭에 띄우고, 디스플레이 틱 하나에 드는 GUI 스레드 시간을 잽니다.
+# 프레임마다 findChild로 필드를 찾아 setText하던 방식(before)과 필드 맵을 두고 틱마다
+# 바뀐 필드만 한 번씩 갱신하는 방식(after)을 틱당 프레임 수별로 비교합니다.
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import random
+import sys
+import tempfile
+import time
+
+import can
+import numpy as np
+from PyQt5.QtWidgets import QApplication, QLineEdit
+
+import main_window_logic as logic
+from app_log import setup_logging, shutdown_logging
+from main_window import MainWindow
+
+BENCH_TICKS = 50
+BENCH_SIGNALS = 100
+BENCH_SIGNAL_BITS = 5  # 100 x 5비트 = 500비트로 64바이트 payload에 들어감
+BENCH_LENGTH = 64
+BENCH_FRAME_ID = 0x30
+BENCH_MESSAGE = "ID00_30_RSP_BENCH_FIELDS"
+BENCH_NODE = 1
+BENCH_FRAMES_PER_TICK = (20, 1)
+
+
+def bench_dbc():
+    """signal BENCH_SIGNALS개짜리 메시지 하나만 있는 DBC 텍스트."""
+    lines = [
+        'VERSION ""',
+        "",
+        "NS_ :",
+        "",
+        "BS_:",
+        "",
+        "BU_: NODE",
+        "",
+        f"BO_ {BENCH_FRAME_ID} {BENCH_MESSAGE}: {BENCH_LENGTH} NODE",
+    ]
+    for i in range(BENCH_SIGNALS):
+        # 절반은 스케일이 있는 float signal
+        scale = "0.1" if i % 2 else "1"
+        lines.append(
+            f" SG_ SIG_{i:03d} : {i * BENCH_SIGNAL_BITS}|{BENCH_SIGNAL_BITS}@1+ ({scale},0) "
+            f'[0|{(1 << BENCH_SIGNAL_BITS) - 1}] "" NODE'
+        )
+    lines.append("")
+    return "\n".join(lines)
+
+
+def bench_frames(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        can.Message(
+            arbitration_id=(BENCH_NODE << 6) | BENCH_FRAME_ID,
+            data=bytes(rng.getrandbits(8) for _ in range(BENCH_LENGTH)),
+            is_extended_id=False,
+            is_fd=True,
+            timestamp=time.monotonic(),
+        )
+        for _ in range(count)
+    ]
+
+
+def legacy_update_fields(window, message_name, node_id):
+    """이전 방식: 프레임마다 바뀐 signal의 필드를 findChild로 찾아 setText."""
+    store = window.signal_store
+    for signal_name in store.take_dirty(node_id, message_name):
+        field = window.findChild(QLineEdit, f"{message_name}.{signal_name}")
+        if field is not None:
+            field.setText(str(store.read(node_id, message_name, signal_name)))
+
+
+def time_ticks(app, window, tick, frames_per_tick, ticks):
+    """틱마다 새 프레임을 넣어 tick()의 시간을 잽니다. 화면 반영(processEvents)은 측정에서 뺌."""
+    frames = bench_frames(frames_per_tick * ticks)
+    window.payload_cache.clear()
+    samples = np.empty(ticks)
+    for i in range(ticks):
+        batch = frames[i * frames_per_tick:(i + 1) * frames_per_tick]
+        t0 = time.perf_counter()
+        tick(batch)
+        samples[i] = time.perf_counter() - t0
+        app.processEvents()
+    return samples
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else BENCH_TICKS
+
+    app = QApplication(sys.argv[:1])
+    setup_logging(console=False)
+    window = MainWindow()
+    # 측정 중에는 타이머 대신 직접 틱을 돌림
+    window.rx_drain_timer.stop()
+    window.graph_render_timer.stop()
+
+    with tempfile.NamedTemporaryFile("w", suffix=".dbc", delete=False) as f:
+        f.write(bench_dbc())
+    try:
+        logic.load_dbc(window, f.name)
+    finally:
+        os.remove(f.name)
+    window.id_input.setText(str(BENCH_NODE))
+    window.current_message_name = BENCH_MESSAGE
+    logic.update_data_display(window)
+
+    def before(batch):
+        for msg in batch:
+            window.engine.process_frame(msg)
+            legacy_update_fields(window, BENCH_MESSAGE, BENCH_NODE)
+
+    def after(batch):
+        logic.handle_received_messages(window, batch)
+
+    print(f"{BENCH_SIGNALS}-signal {BENCH_LENGTH}-byte message, offscreen, {ticks} ticks")
+    for frames_per_tick in BENCH_FRAMES_PER_TICK:
+        before_ms = time_ticks(app, window, before, frames_per_tick, ticks).mean() * 1e3
+        after_ms = time_ticks(app, window, after, frames_per_tick, ticks).mean() * 1e3
+        print(
+            f"  {frames_per_tick:>2} frames/tick: {before_ms:8.2f} -> {after_ms:6.2f} "
+            f"ms of GUI-thread time per tick"
+        )
+
+    window.close()
+    shutdown_logging()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ import sys
 from PyQt5.QtWidgets import QApplication
 from main_window import MainWindow
 import main_window_logic as logic
+from app_log import setup_logging, shutdown_logging
 
 import psutil
 import os
@@ -11,6 +12,7 @@ import sys
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    setup_logging()
     window = MainWindow()
     # 현재 프로세스 객체 가져오기
     p = psutil.Process(os.getpid())
@@ -39,9 +41,7 @@ if __name__ == "__main__":
         window, keyword
     )
     window.update_data_display = lambda: logic.update_data_display(window)
-    window.update_data_fields = lambda decoded_data: logic.update_data_fields(
-        window, decoded_data
-    )
+    window.update_data_fields = lambda: logic.update_data_fields(window)
     window.update_message_list = lambda: logic.update_message_list(window)
     window.update_graph_data_combo = lambda: logic.update_graph_data_combo(window)
     window.update_graph = lambda: logic.update_graph(window)
@@ -54,4 +54,6 @@ if __name__ == "__main__":
     )
 
     window.show()
-    sys.exit(app.exec_())
+    exit_code = app.exec_()
+    shutdown_logging()
+    sys.exit(exit_code)
@@ -5,7 +5,6 @@ import json
 import main_window_logic as logic
 import pyqtgraph as pg
 import time
-from collections import deque
 from PyQt5.QtWidgets import QMainWindow, QFileDialog, QMessageBox, QLabel
 from PyQt5.QtWidgets import QLineEdit, QPushButton, QVBoxLayout, QHBoxLayout
 from PyQt5.QtWidgets import QGridLayout, QScrollArea, QComboBox, QCheckBox
@@ -13,40 +12,73 @@ from PyQt5.QtWidgets import QListWidget, QListWidgetItem, QGroupBox, QWidget
 from PyQt5.QtWidgets import QProgressDialog, QProgressBar, QSplitter
 from PyQt5.QtWidgets import QTabWidget, QSizePolicy, QCompleter
 from PyQt5.QtWidgets import QFormLayout
-from PyQt5.QtWidgets import QSpinBox
+from PyQt5.QtWidgets import QSpinBox, QDoubleSpinBox, QPlainTextEdit
 from PyQt5.QtCore import QTimer, Qt
-from can_receiver import CANReceiver
+from app_log import LOG_VIEW_LINES, dropped_records, ring_handler
+from can_engine import CanEngine
+from rx_engine import EngineBus
+from replay import REPLAY_SPEEDS, ReplayBus
+from simulator import SIM_REPORT_HZ
+from plot_buffer import GRAPH_RENDER_HZ, GRAPH_TIME_WINDOW, MULTI_SLOT_CAPACITY, RingBuffer
 from main_window_logic import handle_received_message
-from bootloader_update import ProgressThread, StateMachine
-from PyQt5.QtGui import QIcon
+from bootloader_update import ProgressThread
+from PyQt5.QtGui import QIcon, QFontDatabase
 from custom_viewbox import ZoomableViewBox
 
+RX_DISPLAY_HZ = 50  # 수신 프레임을 GUI에 반영하는 주기 (30~60Hz 권장)
+LOG_VIEW_HZ = 5  # Log 탭에 새 로그 줄을 붙이는 주기
+
+
+def _engine_attribute(name):
+    """CanEngine이 가진 상태를 기존 이름(window.bus, window.db 등)으로 읽고 쓰게 합니다."""
+    return property(
+        lambda self: getattr(self.engine, name),
+        lambda self, value: setattr(self.engine, name, value),
+    )
+
 
 class MainWindow(QMainWindow):
+    bus = _engine_attribute("bus")
+    db = _engine_attribute("db")
+    db_filename = _engine_attribute("db_filename")
+    codec = _engine_attribute("codec")
+    signal_store = _engine_attribute("signal_store")
+    payload_cache = _engine_attribute("payload_cache")
+    message_data = _engine_attribute("message_data")
+    uses_adjusted_id = _engine_attribute("uses_adjusted_id")
+    can_receiver = _engine_attribute("can_receiver")
+    simulator = _engine_attribute("simulator")
+    debug_output = _engine_attribute("debug_output")
+
     def __init__(self):
         super().__init__()
-        self.db = None
-        self.message_data = {}
-        self.bus = None
-        self.graph_data = {}
+        # bus/DBC/디코딩/송신은 엔진이 맡고, 창은 디코딩 결과를 받아 그리기만 함
+        self.engine = CanEngine()
+        self.engine.add_listener(
+            lambda *frames: logic.on_frames_decoded(self, *frames)
+        )
+        self.data_fields = {}  # 현재 메시지의 signal 이름 -> 값 표시 QLineEdit
+        self.graph_data = {}  # "메시지.signal" -> RingBuffer
+        self.graph_time_window = GRAPH_TIME_WINDOW
+        self.graph_dirty = set()  # 새 샘플이 들어와 다시 그려야 하는 key
+        self.graph_ranges = {}  # key -> RangeTracker
+        self.graph_applied_ranges = {}  # key -> 마지막으로 적용한 (low, high)
+        self.render_frames = 0
+        self.render_fps = 0.0
+        self.render_fps_since = time.monotonic()
+        self.rx_latency_ms = 0.0  # 수신 → 화면 반영 지연 (마지막 배치의 최대값)
+        self.recorder = None  # 녹화 중이면 FrameRecorder
         self.pause_time_axis = False
         self.time_axis_timer = QTimer()
-        self.message_data_dicts = {i: {} for i in range(32)}
         self.current_message_name = None
-        self.debug_output = False
         self.mouse_pressed = False
         self.disconnecting = False
-        self.can_receiver = CANReceiver(self)
-        self.can_receiver.message_received.connect(self.handle_received_message)
-        self.can_receiver.start()
-        self.bus = None
-        self.state_machine = None
         self.progress_thread = None
         self.update_in_progress = False
         self.progress_dialog = None
-        self.uses_adjusted_id = False
         self.graph_plot_items = {}  # 시그널별 PlotDataItem 객체 저장용
         self.graph_start_time = None  # 상대 시간 기준 (0부터 시작)
+        self.graph_selections = ["", ""]  # graph_data_combo, graph_data_combo2 선택 (변경 시에만 갱신)
         self.pause_can_updates = False
 
         self.active_tab = "single"
@@ -57,6 +89,7 @@ class MainWindow(QMainWindow):
         self._multi_active_slot_index = None
         self._multi_common_values = {}
         self.multi_common_message_name = None
+        self.multi_common_applied = None  # Send로 적용한 (메시지 이름, 값). 주기 송신에 사용
         self.multi_auto_width_enabled = False
 
         self.initUI()
@@ -77,6 +110,8 @@ class MainWindow(QMainWindow):
             checkbox.blockSignals(True)
             checkbox.setChecked(False)
             checkbox.blockSignals(False)
+        # 다른 체크박스는 신호 없이 해제되므로 엔진의 제어 모드를 여기서 다시 맞춤
+        logic.control_mode_changed(self)
 
     def initUI(self):
         if getattr(sys, "frozen", False):
@@ -95,15 +130,17 @@ class MainWindow(QMainWindow):
         self.setup_tabs(main_layout)
         self.setCentralWidget(central_widget)
         central_widget.setLayout(main_layout)
+        self.setup_status_bar()
 
-        self.send_timer = QTimer()
-        self.send_timer.timeout.connect(lambda: logic.send_messages(self))
+        # 수신 프레임은 디스플레이 주기로 한 번에 처리
+        self.rx_drain_timer = QTimer()
+        self.rx_drain_timer.timeout.connect(self.drain_received_messages)
+        self.rx_drain_timer.start(int(1000 / RX_DISPLAY_HZ))
 
-        self.multi_send_timer = QTimer()
-        self.multi_send_timer.timeout.connect(lambda: logic.send_multi_messages(self))
-
-        self.statemachine_timer = QTimer()
-        self.statemachine_timer.timeout.connect(self.run_next_state)
+        # 그래프는 수신과 별개로 고정 주기로 다시 그림
+        self.graph_render_timer = QTimer()
+        self.graph_render_timer.timeout.connect(self._on_render_tick)
+        self.graph_render_timer.start(int(1000 / GRAPH_RENDER_HZ))
 
     def setup_tabs(self, layout):
         self.tabs = QTabWidget()
@@ -135,14 +172,48 @@ class MainWindow(QMainWindow):
         self.bcu_tab.setLayout(self.bcu_tab_layout)
         self.tabs.addTab(self.bcu_tab, "BCU")
 
+        self.log_tab = QWidget()
+        log_layout = QVBoxLayout()
+        self.log_tab.setLayout(log_layout)
+        self.setup_log_panel(log_layout)
+        self.tabs.addTab(self.log_tab, "Log")
+
         layout.addWidget(self.tabs)
 
+    def setup_log_panel(self, layout):
+        self.log_view = QPlainTextEdit()
+        self.log_view.setReadOnly(True)
+        self.log_view.setMaximumBlockCount(LOG_VIEW_LINES)
+        self.log_view.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        layout.addWidget(self.log_view)
+
+        self.log_status_label = QLabel()
+        layout.addWidget(self.log_status_label)
+        self.log_view_total = 0
+
+        # 로그 줄은 백그라운드 스레드가 링 버퍼에 쌓고, 보이는 동안만 주기적으로 붙임
+        self.log_view_timer = QTimer()
+        self.log_view_timer.timeout.connect(self.refresh_log_view)
+        self.log_view_timer.start(int(1000 / LOG_VIEW_HZ))
+
+    def refresh_log_view(self):
+        if self.tabs.currentWidget() is not self.log_tab:
+            return
+        lines, self.log_view_total = ring_handler.since(self.log_view_total)
+        if lines:
+            self.log_view.appendPlainText("\n".join(lines))
+        self.log_status_label.setText(
+            f"{self.log_view_total} lines | dropped: {dropped_records()}"
+        )
+
     def on_tab_changed(self, index: int):
         label = self.tabs.tabText(index).lower()
         if "multi" in label:
             self.active_tab = "multi"
         elif "bcu" in label:
             self.active_tab = "bcu"
+        elif "log" in label:
+            self.active_tab = "log"
         else:
             self.active_tab = "single"
 
@@ -157,6 +228,8 @@ class MainWindow(QMainWindow):
             logic.update_graph(self)
         if self.multi_graph_active:
             self.refresh_multi_graphs()
+        if self.active_tab == "log":
+            self.refresh_log_view()
 
     def _move_single_like_panel_to_active_tab(self):
         if not hasattr(self, "single_like_panel"):
@@ -184,20 +257,20 @@ class MainWindow(QMainWindow):
         if hasattr(self, "torq_checkbox"):
             self.torq_checkbox.setVisible(not is_bcu)
 
-        if is_bcu and hasattr(self, "send_timer"):
-            self.send_timer.stop()
+        if is_bcu and hasattr(self, "torq_checkbox"):
             for checkbox in (getattr(self, "pos_checkbox", None), getattr(self, "vel_checkbox", None), getattr(self, "torq_checkbox", None)):
                 if checkbox is None:
                     continue
                 checkbox.blockSignals(True)
                 checkbox.setChecked(False)
                 checkbox.blockSignals(False)
+            logic.control_mode_changed(self)
 
     def setup_top_bar(self, layout):
         top_layout = QHBoxLayout()
 
         self.device_combo = QComboBox()
-        self.device_combo.addItems(["kvaser", "pcan"])
+        self.device_combo.addItems(["kvaser", "pcan", "simulator"])
         top_layout.addWidget(QLabel("CAN Device:"))
         top_layout.addWidget(self.device_combo)
 
@@ -207,6 +280,25 @@ class MainWindow(QMainWindow):
         top_layout.addWidget(QLabel("Baudrate:"))
         top_layout.addWidget(self.bitrate_combo)
 
+        # device가 simulator일 때만 사용
+        top_layout.addWidget(QLabel("Sim nodes:"))
+        self.sim_nodes_spin = QSpinBox()
+        self.sim_nodes_spin.setRange(1, 31)
+        self.sim_nodes_spin.setValue(8)
+        top_layout.addWidget(self.sim_nodes_spin)
+        top_layout.addWidget(QLabel("Report Hz:"))
+        self.sim_rate_spin = QSpinBox()
+        self.sim_rate_spin.setRange(1, 1000)
+        self.sim_rate_spin.setValue(SIM_REPORT_HZ)
+        top_layout.addWidget(self.sim_rate_spin)
+
+        self.rx_process_checkbox = QCheckBox("Driver RX in separate process")
+        self.rx_process_checkbox.setToolTip(
+            "Drain the driver on a separate process so GUI stalls do not drop frames at the"
+            " driver.\nDecoding and plotting still run in the GUI process."
+        )
+        top_layout.addWidget(self.rx_process_checkbox)
+
         self.connect_button = QPushButton("Connect")
         self.connect_button.clicked.connect(lambda: logic.connect_device(self))
         top_layout.addWidget(self.connect_button)
@@ -215,16 +307,43 @@ class MainWindow(QMainWindow):
         self.disconnect_button.clicked.connect(lambda: logic.disconnect_device(self))
         top_layout.addWidget(self.disconnect_button)
 
+        self.record_button = QPushButton("Record")
+        self.record_button.setCheckable(True)
+        self.record_button.clicked.connect(lambda: logic.toggle_recording(self))
+        top_layout.addWidget(self.record_button)
+
+        self.replay_button = QPushButton("Replay Log")
+        self.replay_button.clicked.connect(lambda: logic.start_replay(self))
+        top_layout.addWidget(self.replay_button)
+
+        self.replay_speed_combo = QComboBox()
+        self.replay_speed_combo.addItems(list(REPLAY_SPEEDS))
+        self.replay_speed_combo.currentTextChanged.connect(
+            lambda _text: logic.set_replay_speed(self)
+        )
+        top_layout.addWidget(self.replay_speed_combo)
+
+        top_layout.addWidget(QLabel("Seek (s):"))
+        self.replay_seek_spin = QDoubleSpinBox()
+        self.replay_seek_spin.setRange(0.0, 86400.0)
+        self.replay_seek_spin.setDecimals(1)
+        self.replay_seek_spin.editingFinished.connect(lambda: logic.seek_replay(self))
+        top_layout.addWidget(self.replay_seek_spin)
+
         layout.addLayout(top_layout)
 
+    def setup_status_bar(self):
+        self.rx_status_label = QLabel("RX pending: 0")
+        self.statusBar().addPermanentWidget(self.rx_status_label)
+
     def setup_multi_panel(self, layout):
         top = QHBoxLayout()
 
-        top.addWidget(QLabel("Period (ms):"))
+        # 새 슬롯의 기본 주기. 슬롯마다 카드에서 따로 바꿀 수 있음
+        top.addWidget(QLabel("Default Period (ms):"))
         self.multi_period_ms = QSpinBox()
         self.multi_period_ms.setRange(1, 1000)
         self.multi_period_ms.setValue(10)
-        self.multi_period_ms.valueChanged.connect(self._on_multi_period_changed)
         top.addWidget(self.multi_period_ms)
 
         self.multi_start_button = QPushButton("Start")
@@ -232,6 +351,10 @@ class MainWindow(QMainWindow):
         self.multi_start_button.toggled.connect(self._toggle_multi_sending)
         top.addWidget(self.multi_start_button)
 
+        self.multi_bus_load_label = QLabel("Bus load: -")
+        top.addWidget(self.multi_bus_load_label)
+        self.bitrate_combo.currentTextChanged.connect(lambda _: logic.refresh_multi_stream(self))
+
         self.multi_add_slot_button = QPushButton("+ Add Slot")
         self.multi_add_slot_button.clicked.connect(self.add_multi_slot)
         top.addWidget(self.multi_add_slot_button)
@@ -256,7 +379,7 @@ class MainWindow(QMainWindow):
         top.addStretch(1)
         layout.addLayout(top)
 
-        self.multi_common_group = QGroupBox("Common (send once to all slot IDs)")
+        self.multi_common_group = QGroupBox("Common (send to all slot IDs)")
         common_layout = QVBoxLayout()
         common_row = QHBoxLayout()
         common_row.addWidget(QLabel("Message:"))
@@ -271,6 +394,15 @@ class MainWindow(QMainWindow):
         )
         common_row.addWidget(self.multi_common_message_combo, 1)
 
+        common_row.addWidget(QLabel("Period (ms):"))
+        self.multi_common_period_ms = QSpinBox()
+        self.multi_common_period_ms.setRange(0, 1000)
+        self.multi_common_period_ms.setSpecialValueText("Once")  # 0이면 Send 때 한 번만
+        self.multi_common_period_ms.valueChanged.connect(
+            lambda _: logic.refresh_multi_stream(self)
+        )
+        common_row.addWidget(self.multi_common_period_ms)
+
         self.multi_common_send_button = QPushButton("Send")
         self.multi_common_send_button.clicked.connect(self._multi_common_send)
         common_row.addWidget(self.multi_common_send_button)
@@ -346,16 +478,12 @@ class MainWindow(QMainWindow):
 
         self.multi_editor.setLayout(layout)
 
-    def _on_multi_period_changed(self, value: int):
-        self.multi_send_timer.setInterval(value)
-
     def _toggle_multi_sending(self, checked: bool):
         if checked:
             self.multi_start_button.setText("Stop")
-            self.multi_send_timer.start(self.multi_period_ms.value())
         else:
             self.multi_start_button.setText("Start")
-            self.multi_send_timer.stop()
+        logic.refresh_multi_stream(self)
 
     def _rebuild_multi_cards(self):
         while self.multi_cards_layout.count():
@@ -371,6 +499,8 @@ class MainWindow(QMainWindow):
 
         self.multi_cards_layout.addStretch(1)
         self.multi_add_slot_button.setEnabled(len(self.multi_slots) < 8)
+        logic.apply_bus_filters(self)
+        logic.refresh_multi_stream(self)
 
         self.refresh_multi_message_list()
         if self.multi_graph_active:
@@ -411,6 +541,28 @@ class MainWindow(QMainWindow):
         id_spin.valueChanged.connect(lambda v, i=slot_index: self._multi_set_slot_id(i, v))
         row.addWidget(id_spin)
 
+        row.addWidget(QLabel("Period:"))
+        period_spin = QSpinBox()
+        period_spin.setRange(1, 1000)
+        period_spin.setSuffix(" ms")
+        period_spin.setValue(int(slot.get("period_ms", 10)))
+        period_spin.valueChanged.connect(
+            lambda v, i=slot_index: self._multi_set_slot_period(i, v)
+        )
+        row.addWidget(period_spin)
+
+        row.addWidget(QLabel("Offset:"))
+        offset_spin = QSpinBox()
+        offset_spin.setRange(-1, 999)
+        offset_spin.setSuffix(" ms")
+        offset_spin.setSpecialValueText("Auto")  # -1: 타이밍 휠이 빈 tick을 골라 줌
+        offset = slot.get("offset_ms")
+        offset_spin.setValue(-1 if offset is None else int(offset))
+        offset_spin.valueChanged.connect(
+            lambda v, i=slot_index: self._multi_set_slot_offset(i, v)
+        )
+        row.addWidget(offset_spin)
+
         delete_btn = QPushButton("-")
         delete_btn.clicked.connect(lambda _, i=slot_index: self._multi_delete_slot(i))
         row.addWidget(delete_btn)
@@ -565,6 +717,8 @@ class MainWindow(QMainWindow):
         slot["tx_pending_values"] = {}
         slot["tx_applied_values"] = {}
         slot["tx_ready"] = False
+        slot["tx_frame"] = None
+        logic.refresh_multi_stream(self)
         self._multi_rebuild_slot_tx_ui(slot_index)
 
     def _multi_graph_item_edit_finished(self, slot_index: int):
@@ -607,8 +761,8 @@ class MainWindow(QMainWindow):
             slot["graph_message_name"] = None
             slot["graph_signal"] = None
             slot["graph_cmd_id"] = None
-            slot["time"].clear()
-            slot["values"].clear()
+            slot["buffer"].clear()
+            slot["dirty"] = True
             slot["start"] = None
             return
         if "." not in text:
@@ -623,8 +777,8 @@ class MainWindow(QMainWindow):
         slot["graph_message_name"] = msg_name
         slot["graph_signal"] = sig_name
         slot["graph_cmd_id"] = message.frame_id & 0x3F
-        slot["time"].clear()
-        slot["values"].clear()
+        slot["buffer"].clear()
+        slot["dirty"] = True
         slot["start"] = None
 
     def _multi_rebuild_slot_tx_ui(self, slot_index: int):
@@ -678,6 +832,9 @@ class MainWindow(QMainWindow):
         slot["tx_applied_values"] = {**slot.get("tx_applied_values", {}), **new_values}
         slot["tx_pending_values"] = {**slot.get("tx_pending_values", {}), **new_values}
         slot["tx_ready"] = True
+        # 주기 송신 틱에서는 인코딩하지 않도록 적용 시점에 한 번만 인코딩
+        logic.encode_multi_slot_frame(self, slot)
+        logic.refresh_multi_stream(self)
 
     def add_multi_slot(self):
         if len(self.multi_slots) >= 8:
@@ -690,11 +847,14 @@ class MainWindow(QMainWindow):
             "tx_pending_values": {},
             "tx_applied_values": {},
             "tx_ready": False,
+            "tx_frame": None,  # 적용된 값으로 인코딩해 둔 송신 can.Message
+            "period_ms": int(self.multi_period_ms.value()),
+            "offset_ms": None,  # None이면 타이밍 휠이 자동으로 위상을 정함
             "graph_message_name": None,
             "graph_signal": None,
             "graph_cmd_id": None,
-            "time": deque(maxlen=500),
-            "values": deque(maxlen=500),
+            "buffer": RingBuffer(MULTI_SLOT_CAPACITY),
+            "dirty": False,
             "start": None,
         }
         self.multi_slots.append(slot)
@@ -703,10 +863,25 @@ class MainWindow(QMainWindow):
     def _multi_set_slot_enabled(self, slot_index: int, enabled: bool):
         if 0 <= slot_index < len(self.multi_slots):
             self.multi_slots[slot_index]["enabled"] = enabled
+            logic.refresh_multi_stream(self)
+
+    def _multi_set_slot_period(self, slot_index: int, value: int):
+        if 0 <= slot_index < len(self.multi_slots):
+            self.multi_slots[slot_index]["period_ms"] = value
+            logic.refresh_multi_stream(self)
+
+    def _multi_set_slot_offset(self, slot_index: int, value: int):
+        if 0 <= slot_index < len(self.multi_slots):
+            self.multi_slots[slot_index]["offset_ms"] = None if value < 0 else value
+            logic.refresh_multi_stream(self)
 
     def _multi_set_slot_id(self, slot_index: int, value: int):
         if 0 <= slot_index < len(self.multi_slots):
             self.multi_slots[slot_index]["id"] = value
+            # 노드 ID가 arbitration ID에 들어가므로 송신 프레임을 다시 인코딩
+            logic.encode_multi_slot_frame(self, self.multi_slots[slot_index])
+            logic.refresh_multi_stream(self)
+            logic.apply_bus_filters(self)
 
     def _multi_set_graph_signal(self, slot_index: int, text: str):
         self._multi_set_slot_graph_item(slot_index, text)
@@ -784,6 +959,9 @@ class MainWindow(QMainWindow):
             return
 
         logic.send_common_message_to_ids(self, message_name, values, target_ids)
+        # Period가 Once가 아니면 이 값으로 주기 송신
+        self.multi_common_applied = (message_name, values)
+        logic.refresh_multi_stream(self)
 
     def _collect_common_signal_values(self) -> dict:
         values = {}
@@ -815,16 +993,19 @@ class MainWindow(QMainWindow):
                     "id": int(slot.get("id", 1)),
                     "tx_message_name": slot.get("tx_message_name"),
                     "tx_applied_values": dict(slot.get("tx_applied_values") or {}),
+                    "period_ms": int(slot.get("period_ms", 10)),
+                    "offset_ms": slot.get("offset_ms"),
                     "graph_item": graph_item,
                 }
             )
 
         return {
-            "version": 1,
+            "version": 2,
             "period_ms": int(self.multi_period_ms.value()),
             "common": {
                 "message_name": common_message,
                 "signal_values": common_values,
+                "period_ms": int(self.multi_common_period_ms.value()),
             },
             "slots": slots,
         }
@@ -838,6 +1019,8 @@ class MainWindow(QMainWindow):
 
         common = template.get("common") or {}
         self._multi_common_values = dict(common.get("signal_values") or {})
+        self.multi_common_applied = None
+        self.multi_common_period_ms.setValue(int(common.get("period_ms", 0)))
         common_message = common.get("message_name")
         if hasattr(self, "multi_common_message_combo"):
             self.multi_common_message_combo.setCurrentText(common_message or "")
@@ -862,11 +1045,15 @@ class MainWindow(QMainWindow):
                     "tx_pending_values": {},
                     "tx_applied_values": dict(raw.get("tx_applied_values") or {}),
                     "tx_ready": False,
+                    "tx_frame": None,
+                    # version 1 템플릿은 모든 슬롯이 공통 주기를 씀
+                    "period_ms": int(raw.get("period_ms", period_ms)),
+                    "offset_ms": raw.get("offset_ms"),
                     "graph_message_name": graph_message_name,
                     "graph_signal": graph_signal,
                     "graph_cmd_id": None,
-                    "time": deque(maxlen=500),
-                    "values": deque(maxlen=500),
+                    "buffer": RingBuffer(MULTI_SLOT_CAPACITY),
+                    "dirty": False,
                     "start": None,
                 }
             )
@@ -1051,12 +1238,23 @@ class MainWindow(QMainWindow):
         if not self.multi_graph_active:
             return
         for slot in self.multi_slots:
+            slot["dirty"] = True
+        self.render_multi_graphs()
+
+    def render_multi_graphs(self):
+        """새 샘플이 들어온(dirty) 슬롯의 곡선만 다시 그립니다."""
+        if not self.multi_graph_active:
+            return
+        for slot in self.multi_slots:
+            if not slot["dirty"]:
+                continue
             ui = slot.get("_ui")
             if not ui:
                 continue
-            ui["curve"].setData(list(slot["time"]), list(slot["values"]))
+            ui["curve"].setData(*slot["buffer"].view())
+            slot["dirty"] = False
 
-    def multi_graph_on_rx(self, can_id: int, decoded_data: dict):
+    def multi_graph_on_rx(self, can_id: int, timestamp: float):
         node_id = (int(can_id) >> 6) & 0x1F
         cmd_id = int(can_id) & 0x3F
         for slot in self.multi_slots:
@@ -1068,20 +1266,39 @@ class MainWindow(QMainWindow):
                 continue
 
             signal_name = slot.get("graph_signal")
-            if not signal_name or signal_name not in decoded_data:
+            if not signal_name:
+                continue
+            try:
+                value = self.signal_store.read(
+                    node_id, slot.get("graph_message_name"), signal_name
+                )
+            except KeyError:
                 continue
 
-            now = time.monotonic()
             if slot["start"] is None:
-                slot["start"] = now
-            t = now - slot["start"]
-            slot["time"].append(t)
-            slot["values"].append(decoded_data[signal_name])
+                slot["start"] = timestamp
+            slot["buffer"].append(timestamp - slot["start"], value)
+            slot["dirty"] = True
 
-            if self.multi_graph_active:
-                ui = slot.get("_ui")
-                if ui:
-                    ui["curve"].setData(list(slot["time"]), list(slot["values"]))
+    def multi_graph_on_rx_columns(self, can_id: int, columns: dict, timestamps):
+        node_id = (int(can_id) >> 6) & 0x1F
+        cmd_id = int(can_id) & 0x3F
+        for slot in self.multi_slots:
+            if int(slot.get("id", 0)) != int(node_id):
+                continue
+            if slot.get("graph_cmd_id") is None:
+                continue
+            if int(slot.get("graph_cmd_id")) != int(cmd_id):
+                continue
+
+            signal_name = slot.get("graph_signal")
+            if not signal_name or signal_name not in columns:
+                continue
+
+            if slot["start"] is None:
+                slot["start"] = timestamps[0]
+            slot["buffer"].extend(timestamps - slot["start"], columns[signal_name])
+            slot["dirty"] = True
 
     def setup_main_panel(self, layout):
         splitter = QSplitter(Qt.Horizontal)
@@ -1168,9 +1385,30 @@ class MainWindow(QMainWindow):
         )
         graph_layout.addWidget(self.toggle_time_axis_button)
 
+        window_layout = QHBoxLayout()
+        window_layout.addWidget(QLabel("Time Window (s)"))
+        self.graph_window_spin = QSpinBox()
+        self.graph_window_spin.setRange(1, 120)
+        self.graph_window_spin.setValue(int(self.graph_time_window))
+        self.graph_window_spin.valueChanged.connect(self._on_graph_window_changed)
+        window_layout.addWidget(self.graph_window_spin)
+        window_layout.addWidget(QLabel("Render (Hz)"))
+        self.graph_render_spin = QSpinBox()
+        self.graph_render_spin.setRange(20, 60)
+        self.graph_render_spin.setValue(GRAPH_RENDER_HZ)
+        self.graph_render_spin.valueChanged.connect(self._on_graph_render_rate_changed)
+        window_layout.addWidget(self.graph_render_spin)
+        graph_layout.addLayout(window_layout)
+
         self.graph_data_combo = QComboBox()
+        self.graph_data_combo.currentTextChanged.connect(
+            lambda text: self._on_graph_selection_changed(0, text)
+        )
         graph_layout.addWidget(self.graph_data_combo)
         self.graph_data_combo2 = QComboBox()
+        self.graph_data_combo2.currentTextChanged.connect(
+            lambda text: self._on_graph_selection_changed(1, text)
+        )
         graph_layout.addWidget(self.graph_data_combo2)
 
         self.pos_checkbox = QCheckBox("Position Control")
@@ -1185,6 +1423,7 @@ class MainWindow(QMainWindow):
 
         self.id_input = QLineEdit()
         self.id_input.setPlaceholderText("Enter ID (1-31)")
+        self.id_input.textChanged.connect(self._on_id_input_changed)
         graph_layout.addWidget(self.id_input)
 
         self.scan_button = QPushButton("Scan CAN Bus")
@@ -1235,35 +1474,116 @@ class MainWindow(QMainWindow):
             lambda checked: self._set_control_mode_exclusive(self.torq_checkbox, checked)
         )
 
+    def _on_graph_window_changed(self, value):
+        # 버퍼 용량은 고정이므로 표시 구간만 바뀜
+        self.graph_time_window = float(value)
+
+    def _on_graph_selection_changed(self, index, text):
+        # 수신/렌더 경로는 콤보 대신 이 값을 읽음
+        self.graph_selections[index] = text
+
+    def _on_render_tick(self):
+        logic.render_graph(self)
+        self.render_multi_graphs()
+
+    def _on_graph_render_rate_changed(self, value):
+        self.graph_render_timer.setInterval(int(1000 / value))
+
+    def _on_id_input_changed(self, _text):
+        # 수신/송신 경로는 입력창 대신 엔진의 node_id를 읽음
+        try:
+            self.engine.set_node_id(int(_text))
+        except ValueError:
+            self.engine.set_node_id(None)
+        logic.apply_bus_filters(self)
+        # 새 노드의 값을 다음 디스플레이 주기에 필드에 반영
+        node_id = self.engine.node_id
+        if self.signal_store is not None and self.current_message_name and node_id is not None:
+            self.signal_store.mark_dirty(node_id, self.current_message_name)
+
     def start_bootstrap_update(self):
         hex_file_path, _ = QFileDialog.getOpenFileName(
             self, "Open Hex File", "", "Hex Files (*.hex)"
         )
         if hex_file_path:
-            self.pause_can_updates = True
-            self.state_machine = StateMachine(self, hex_file_path)
-            self.create_progress_dialog()
-            self.state_machine.start_bootstrap()
-            self.statemachine_timer.start(10)
+            self._create_bootloader(hex_file_path).start_bootstrap()
 
     def start_normalboot_update(self):
         hex_file_path, _ = QFileDialog.getOpenFileName(
             self, "Open Hex File", "", "Hex Files (*.hex)"
         )
         if hex_file_path:
-            self.pause_can_updates = True
-            self.state_machine = StateMachine(self, hex_file_path)
-            self.create_progress_dialog()
-            self.state_machine.start_normalboot()
-            self.statemachine_timer.start(10)
-
-    def run_next_state(self):
-        if self.state_machine:
-            self.state_machine.run_next_state()
+            self._create_bootloader(hex_file_path).start_normalboot()
+
+    def _create_bootloader(self, hex_file_path):
+        """엔진에 부트로더를 만들고, 수신 필터 해제와 진행 창을 준비합니다."""
+        self.pause_can_updates = True
+        state_machine = self.engine.create_bootloader(
+            hex_file_path,
+            on_progress=lambda line: self.progress_thread.update_progress(line),
+            on_complete=self.statemachine_completed,
+            on_message=lambda title, text: QMessageBox.information(self, title, text),
+        )
+        logic.apply_bus_filters(self)
+        self.create_progress_dialog()
+        return state_machine
 
     def handle_received_message(self, msg):
         logic.handle_received_message(self, msg)
 
+    def handle_received_messages(self, batch):
+        logic.handle_received_messages(self, batch)
+
+    def drain_received_messages(self):
+        pending = self.can_receiver.pending_count()
+        batch = self.can_receiver.drain()
+        if batch:
+            logic.handle_received_messages(self, batch)
+            # 가장 오래 기다린 프레임 기준: 드라이버 수신 시각 ~ 화면 반영까지
+            now = self.can_receiver.driver_time()
+            if now is not None:
+                self.rx_latency_ms = (now - batch[0].timestamp) * 1000.0
+        status = (
+            f"RX pending: {pending} | dropped: {self.can_receiver.frames_dropped}"
+            f" | unchanged: {self.payload_cache.hit_rate():.0%}"
+            f" | render: {self.render_fps:.0f} fps"
+            f" | latency: {self.rx_latency_ms:.0f} ms"
+        )
+        for tx in self.engine.tx_stream_stats():
+            if tx.get("native"):
+                status += f" | {tx['name']} {tx['period_ms']:.0f} ms (driver)"
+                continue
+            if tx["buckets"] > 1:
+                # 타이밍 휠: 한 바퀴에 여러 tick으로 나눠 보냄
+                status += (
+                    f" | {tx['name']} {tx['buckets']} ticks/{tx['period_ms']:.0f} ms"
+                    f" p99 ±{tx['jitter_p99_ms']:.2f} ms, missed {tx['missed']}"
+                )
+                continue
+            status += (
+                f" | {tx['name']} {tx['mean_period_ms']:.1f} ms"
+                f" p99 ±{tx['jitter_p99_ms']:.2f} ms, missed {tx['missed']}"
+            )
+        if isinstance(self.bus, EngineBus):
+            self.bus.collect_engine_errors()
+            status += (
+                f" | engine overflow: {self.bus.overflow}, errors: {self.bus.engine_errors}"
+            )
+        if isinstance(self.bus, ReplayBus):
+            status += (
+                f" | replay {self.bus.position:.1f} s"
+                f", {self.bus.frames_replayed} frames"
+                f", {self.bus.frames_per_second():.0f} fps"
+                + (" (done)" if self.bus.finished else "")
+            )
+        if self.recorder is not None:
+            status += (
+                f" | REC {self.recorder.frames_written} frames"
+                f", {self.recorder.bytes_per_second / 1024:.0f} kB/s"
+                f", dropped {self.recorder.frames_dropped}"
+            )
+        self.rx_status_label.setText(status)
+
     def _on_scan_can_bus_clicked(self):
         if getattr(self, "active_tab", "single") == "bcu":
             logic.scan_can_bus_bcu(self)
@@ -1281,7 +1601,7 @@ class MainWindow(QMainWindow):
         self.progress_dialog.canceled.connect(self.cancel_update)
         self.progress_dialog.show()
 
-        self.progress_thread = ProgressThread(self.state_machine.total_lines)
+        self.progress_thread = ProgressThread(self.engine.bootloader.total_lines)
         self.progress_thread.progress_updated.connect(self.update_progress_window)
         self.progress_thread.start()
         self.update_in_progress = True
@@ -1303,19 +1623,15 @@ class MainWindow(QMainWindow):
         self.pause_can_updates = False
 
     def statemachine_completed(self):
-        self.statemachine_timer.stop()
-        if self.state_machine:
-            self.state_machine.stop()
-        self.state_machine = None
+        self.engine.stop_bootloader()
+        logic.apply_bus_filters(self)
         self.finish_update()
 
     def cancel_update(self):
         if self.update_in_progress:
             self.update_in_progress = False
-            if self.state_machine:
-                self.state_machine.stop()
-            self.statemachine_timer.stop()
-            self.state_machine = None
+            self.engine.stop_bootloader()
+            logic.apply_bus_filters(self)
             if self.progress_dialog:
                 self.progress_dialog.close()
             if self.progress_thread:
@@ -1361,9 +1677,13 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event):
         self.time_axis_timer.stop()
-        self.send_timer.stop()
-        if self.state_machine:
-            self.state_machine.stop()
+        self.rx_drain_timer.stop()
+        self.graph_render_timer.stop()
+        self.log_view_timer.stop()
+        self.engine.stop_tx()
+        if self.recorder is not None:
+            self.recorder.stop()
+        self.engine.stop_bootloader()
         if self.progress_dialog:
             self.progress_dialog.close()
         if not self.disconnecting:
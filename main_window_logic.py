@@ -1,5 +1,5 @@
 import can
-import cantools
+import logging
 from PyQt5.QtWidgets import QFileDialog, QMessageBox, QLineEdit, QListWidgetItem
 from PyQt5.QtWidgets import (
     QLabel,
@@ -12,32 +12,19 @@ from PyQt5.QtCore import QThread, QMutex, QMutexLocker, pyqtSignal, pyqtSlot
 from PyQt5.QtGui import QWheelEvent, QMouseEvent
 from PyQt5.QtWidgets import QMessageBox, QLineEdit
 from intelhex import IntelHex
-from bootloader_update import StateMachine
+import app_log
+from app_log import limited, logger
+from can_engine import MULTI_TX_STREAM
+from tx_scheduler import TimingWheel
+from plot_buffer import RangeTracker, RingBuffer
+from recorder import FrameRecorder
+from replay import REPLAY_SPEEDS, ReplayBus
+from simulator import SIM_CHANNEL, DriveSimulator
 from PyQt5.QtCore import QTimer, Qt
 import re
 import time
-import os
 import pyqtgraph as pg
 
-
-def parse_dbc_to_dict(dbc_file):
-    db = cantools.database.load_file(dbc_file)
-    message_data = {}
-
-    for message in db.messages:
-        message_id = message.frame_id
-        message_name = message.name
-
-        signals = {}
-        for signal in message.signals:
-            signal_name = signal.name
-            signals[signal_name] = 0
-
-        message_data[f"{message_name}"] = signals
-
-    return message_data
-
-
 def connect_device(window):
     device_type = window.device_combo.currentText()
     selected_bitrate = int(window.bitrate_combo.currentText())
@@ -52,21 +39,34 @@ def connect_device(window):
 
     try:
         if device_type == "kvaser":
-            window.bus = can.interface.Bus(
-                bustype="kvaser", channel=0, bitrate=selected_bitrate
-            )
+            bus_kwargs = dict(bustype="kvaser", channel=0, bitrate=selected_bitrate)
         elif device_type == "pcan":
-            window.bus = can.interface.Bus(
+            bus_kwargs = dict(
                 bustype="pcan", channel="PCAN_USBBUS1", bitrate=selected_bitrate
             )
-        window.can_receiver.start()
+        elif device_type == "simulator":
+            bus_kwargs = dict(bustype="virtual", channel=SIM_CHANNEL)
+            window.engine.simulator = DriveSimulator(
+                range(1, window.sim_nodes_spin.value() + 1),
+                report_hz=window.sim_rate_spin.value(),
+                bitrate=selected_bitrate,
+            )
+            window.engine.simulator.start()
+        # virtual 버스는 프로세스 안에서만 공유되므로 시뮬레이터는 항상 같은 프로세스에서 수신
+        window.engine.connect(
+            bus_kwargs,
+            separate_process=window.rx_process_checkbox.isChecked()
+            and device_type != "simulator",
+        )
+        apply_bus_filters(window)
         show_message(
             window,
             "Connected",
             f"Connected to {device_type} at {selected_bitrate} bps.",
         )
     except can.CanError as e:
-        window.bus = None  # 연결 실패 시 bus를 None으로 설정
+        window.engine.bus = None  # 연결 실패 시 bus를 None으로 설정
+        window.engine.stop_simulator()
         show_message(
             window,
             "Connection Error",
@@ -90,11 +90,8 @@ def disconnect_device(window):
 
     window.disconnecting = True
     try:
-        window.can_receiver.stop()
-        if window.bus:
-            window.bus.shutdown()
-            window.bus = None  # shutdown 후 window.bus를 None으로 설정
-            # show_message(window, "Disconnected", "CAN device disconnected.")
+        window.engine.disconnect()
+        # show_message(window, "Disconnected", "CAN device disconnected.")
     except can.CanError as e:
         show_message(
             window,
@@ -105,6 +102,134 @@ def disconnect_device(window):
         window.disconnecting = False
 
 
+def toggle_recording(window):
+    if window.recorder is not None:
+        window.recorder.stop()
+        window.recorder = None
+        window.record_button.setText("Record")
+        window.record_button.setChecked(False)
+        return
+
+    file_name, _ = QFileDialog.getSaveFileName(
+        window,
+        "Record CAN Log",
+        time.strftime("can_%Y%m%d_%H%M%S.blf"),
+        "BLF Files (*.blf);;ASC Files (*.asc)",
+    )
+    if not file_name:
+        window.record_button.setChecked(False)
+        return
+    try:
+        window.recorder = FrameRecorder(window.can_receiver, file_name)
+    except (OSError, ValueError) as e:
+        window.record_button.setChecked(False)
+        show_message(window, "Record Error", f"Failed to open {file_name}.\nError: {e}")
+        return
+    window.recorder.start()
+    window.record_button.setText("Stop Recording")
+    window.record_button.setChecked(True)
+
+
+def start_replay(window):
+    """로그 파일을 열어 연결된 장치 대신 재생합니다. 멈추려면 Disconnect."""
+    file_name, _ = QFileDialog.getOpenFileName(
+        window, "Replay CAN Log", "", "CAN Logs (*.blf *.asc *.csv);;All Files (*)"
+    )
+    if not file_name:
+        return
+    disconnect_device(window)
+
+    speed = REPLAY_SPEEDS[window.replay_speed_combo.currentText()]
+    receiver = window.can_receiver
+    try:
+        # 최대 속도일 때는 GUI가 밀린 만큼 기다려 수신 버퍼가 넘치지 않게 함
+        window.engine.bus = ReplayBus(
+            file_name,
+            speed=speed,
+            throttle=lambda: receiver.pending_count() >= receiver.RX_BUFFER_SIZE // 2,
+        )
+    except (OSError, ValueError) as e:
+        show_message(window, "Replay Error", f"Failed to open {file_name}.\nError: {e}")
+        return
+    clear_replayed_graphs(window)
+    window.can_receiver.start()
+    apply_bus_filters(window)
+
+
+def set_replay_speed(window):
+    if isinstance(window.bus, ReplayBus):
+        window.bus.set_speed(REPLAY_SPEEDS[window.replay_speed_combo.currentText()])
+
+
+def seek_replay(window):
+    if isinstance(window.bus, ReplayBus):
+        window.bus.seek(window.replay_seek_spin.value())
+        # 시간이 되돌아가면 링 버퍼의 시간 순서가 깨지므로 그래프를 비움
+        clear_replayed_graphs(window)
+
+
+def clear_replayed_graphs(window):
+    clear_graph(window)
+    for slot in window.multi_slots:
+        slot["buffer"].clear()
+        slot["start"] = None
+        slot["dirty"] = True
+
+
+def monitored_node_ids(window):
+    """Single 탭 ID 입력과 Multi 슬롯에서 현재 보고 있는 노드 ID 집합."""
+    node_ids = set()
+    if window.engine.node_id is not None:
+        node_ids.add(window.engine.node_id)
+    for slot in getattr(window, "multi_slots", []):
+        node_ids.add(int(slot.get("id", 0)) & 0x1F)
+    return node_ids
+
+
+def apply_bus_filters(window):
+    """수신 필터를 버스에 다시 적용합니다. 스캔/펌웨어 업데이트 중에는 필터를 해제합니다."""
+    if window.bus is None:
+        return
+
+    if window.can_receiver.scanning or window.engine.bootloader is not None:
+        filters = None
+    else:
+        filters = window.engine.build_bus_filters(monitored_node_ids(window))
+
+    try:
+        window.bus.set_filters(filters)
+    except can.CanError as e:
+        logger.error("[FILTER] Failed to apply filters: %s", e)
+        return
+
+    if getattr(window, "debug_output", False):
+        if filters is None:
+            logger.debug("[FILTER] Receiving all frames")
+        else:
+            logger.debug(
+                "[FILTER] %s",
+                ", ".join(
+                    f"0x{f['can_id']:03X}/0x{f['can_mask']:03X}" for f in filters
+                )
+            )
+
+
+def load_dbc(window, file_name):
+    """DBC를 읽어 디코더/저장소와 화면 목록을 다시 만듭니다. 실패하면 예외를 그대로 올립니다."""
+    window.engine.load_dbc(file_name)
+    for slot in getattr(window, "multi_slots", []):
+        slot["tx_frame"] = None
+    # 새 DBC에 없는 메시지일 수 있으므로 Common은 다시 Send해야 주기 송신
+    window.multi_common_applied = None
+    if hasattr(window, "multi_start_button"):
+        refresh_multi_stream(window)
+    update_message_list(window)
+    update_graph_data_combo(window)
+    apply_bus_filters(window)
+    if hasattr(window, "refresh_multi_message_list"):
+        window.refresh_multi_message_list()
+
+
 def load_dbc_file(window):
     options = QFileDialog.Options()
     file_name, _ = QFileDialog.getOpenFileName(
@@ -112,19 +237,12 @@ def load_dbc_file(window):
     )
     if file_name:
         try:
-            window.db = cantools.database.load_file(file_name)
-            window.db_filename = os.path.basename(file_name)
-            window.message_data = parse_dbc_to_dict(file_name)
-            update_message_list(window)
-            update_graph_data_combo(window)
-            detect_dbc_structure(window)
-            if hasattr(window, "refresh_multi_message_list"):
-                window.refresh_multi_message_list()
+            load_dbc(window, file_name)
             show_message(
                 window, "DBC File Loaded", f"DBC file {file_name} loaded successfully."
             )
         except Exception as e:
-            window.db = None
+            window.engine.unload_dbc()
             show_message(window, "Error", f"Failed to load DBC file.\nError: {e}")
 
 
@@ -143,6 +261,7 @@ def scan_can_bus(window):
         return
 
     window.can_receiver.start_scan()
+    apply_bus_filters(window)
 
     # Get_MotState 메시지 송신
     for i in range(16):
@@ -160,11 +279,11 @@ def scan_can_bus(window):
                 message.frame_id & 0x3F
             )  # 상위 5비트를 입력 ID로 설정
             msg = can.Message(arbitration_id=frame_id, data=data, is_extended_id=False)
-            window.bus.send(msg)
+            window.engine.send(msg)
             if window.debug_output:
-                print(f"GET_SRV_STATE message sent with ID: {hex(frame_id)}")
+                logger.debug("GET_SRV_STATE message sent with ID: 0x%X", frame_id)
         except Exception as e:
-            print(f"Failed to send GET_SRV_STATE message: {e}")
+            logger.error("Failed to send GET_SRV_STATE message: %s", e)
             return
 
     # ID 17번에 대해 BRAKE_STATUS 요청 메시지 송신
@@ -176,11 +295,11 @@ def scan_can_bus(window):
         data = message.encode(data_dict)
         frame_id = (17 << 6) | (message.frame_id & 0x3F)
         msg = can.Message(arbitration_id=frame_id, data=data, is_extended_id=False)
-        window.bus.send(msg)
+        window.engine.send(msg)
         if window.debug_output:
-            print(f"ID17_BRAKE_STATUS message sent with ID: {hex(frame_id)}")
+            logger.debug("ID17_BRAKE_STATUS message sent with ID: 0x%X", frame_id)
     except Exception as e:
-        print(f"Failed to send ID17_BRAKE_STATUS message: {e}")
+        logger.error("Failed to send ID17_BRAKE_STATUS message: %s", e)
 
     # 1초 동안 응답 대기
     QTimer.singleShot(1000, lambda: finish_scan(window))
@@ -188,6 +307,7 @@ def scan_can_bus(window):
 
 def finish_scan(window):
     detected_ids = window.can_receiver.stop_scan()
+    apply_bus_filters(window)
     detected_ids_str = "\n".join(f"ID: {did}" for did in detected_ids)
     show_message(window, "Detected CAN IDs", detected_ids_str)
 
@@ -212,11 +332,12 @@ def scan_can_bus_bcu(window):
         return
 
     window.can_receiver.start_scan()
+    apply_bus_filters(window)
 
     try:
-        window.bus.send(msg)
+        window.engine.send(msg)
         if getattr(window, "debug_output", False):
-            print(f"[BCU][SCAN] REPORT_EN STATUS=1 sent: {hex(frame_id)}")
+            logger.debug("[BCU][SCAN] REPORT_EN STATUS=1 sent: 0x%X", frame_id)
     except Exception as e:
         show_message(window, "Error", f"Failed to send REPORT_EN enable.\nError: {e}")
         return
@@ -226,6 +347,7 @@ def scan_can_bus_bcu(window):
 
 def finish_scan_bcu(window):
     detected_ids = window.can_receiver.stop_scan()
+    apply_bus_filters(window)
     detected_ids_str = "\n".join(f"ID: {did}" for did in detected_ids)
     show_message(window, "Detected CAN IDs", detected_ids_str)
 
@@ -239,202 +361,155 @@ def finish_scan_bcu(window):
         data = message.encode(data_dict)
         frame_id = (17 << 6) | (message.frame_id & 0x3F)
         msg = can.Message(arbitration_id=frame_id, data=data, is_extended_id=False)
-        window.bus.send(msg)
+        window.engine.send(msg)
         if getattr(window, "debug_output", False):
-            print(f"[BCU][SCAN] REPORT_EN STATUS=0 sent: {hex(frame_id)}")
+            logger.debug("[BCU][SCAN] REPORT_EN STATUS=0 sent: 0x%X", frame_id)
     except Exception as e:
-        print(f"[BCU][SCAN] Failed to send REPORT_EN disable: {e}")
+        logger.error("[BCU][SCAN] Failed to send REPORT_EN disable: %s", e)
 
 
 def update_message(window):
     if window.bus is None:
         show_message(window, "Error", "CAN bus is not connected.")
         return
-    user_id = int(window.id_input.text()) & 0x1F
-    if window.current_message_name not in window.message_data_dicts[user_id]:
-        window.message_data_dicts[user_id][window.current_message_name] = {}
-
-    message_data = window.message_data_dicts[user_id][window.current_message_name]
-    for signal_name in window.db.get_message_by_name(
-        window.current_message_name
-    ).signals:
-        object_name = f"{window.current_message_name}.{signal_name.name}"
-        field = window.findChild(QLineEdit, object_name)
-        if field is not None:
-            try:
-                value = field.text()
-                if "." in value:
-                    message_data[signal_name.name] = float(value)
-                else:
-                    message_data[signal_name.name] = int(value)
-            except ValueError:
-                print(f"Invalid value for signal {signal_name.name}")
-
-    # 업데이트된 메시지 데이터를 다시 저장
-    window.message_data_dicts[user_id][window.current_message_name] = message_data
-    send_message(window, window.current_message_name)
-
-
-def _build_raw_payload(message, message_data):
-    """Convert physical signal values to raw values before encoding."""
-    raw_payload = {}
-
-    for signal in message.signals:
-        if signal.name not in message_data:
-            continue
-
-        value = message_data[signal.name]
-        # Convert textual choice labels back to their numeric representation.
-        if signal.choices and isinstance(value, str):
-            reversed_choices = {v: k for k, v in signal.choices.items()}
-            value = reversed_choices.get(value, value)
-
-        scale = getattr(signal, "scale", None)
-        offset = getattr(signal, "offset", 0)
+    user_id = window.engine.node_id
+    if user_id is None:
+        return
 
+    message_data = {}
+    for signal_name, field in window.data_fields.items():
         try:
-            if scale in (None, 0):
-                # For zero scale signals, fall back to the initial value (or 0)
-                # because any raw value maps to the same physical value.
-                if signal.initial is not None:
-                    raw_value = signal.initial
-                else:
-                    raw_value = value if scale is None else 0
+            value = field.text()
+            if "." in value:
+                message_data[signal_name] = float(value)
             else:
-                raw_value = (value - offset) / scale
-        except ZeroDivisionError:
-            raw_value = signal.initial if signal.initial is not None else 0
+                message_data[signal_name] = int(value)
+        except ValueError:
+            logger.warning("Invalid value for signal %s", signal_name)
 
-        if not signal.is_float and isinstance(raw_value, float):
-            raw_value = int(round(raw_value))
+    # 업데이트된 메시지 데이터를 다시 저장 (인코딩해 둔 송신 프레임도 무효화)
+    window.engine.set_message_values(user_id, window.current_message_name, message_data)
+    send_message(window, window.current_message_name)
 
-        raw_payload[signal.name] = raw_value
 
-    return raw_payload
+def _stop_control_on_bus_lost(window):
+    """bus가 없으면 제어 모드 주기 송신을 멈추고 오류를 한 번만 알립니다."""
+    if (
+        window.pos_checkbox.isChecked()
+        or window.vel_checkbox.isChecked()
+        or window.torq_checkbox.isChecked()
+    ):
+        window.pos_checkbox.setChecked(False)
+        window.vel_checkbox.setChecked(False)
+        window.torq_checkbox.setChecked(False)
+
+    if not hasattr(window, '_bus_error_shown') or not window._bus_error_shown:
+        window._bus_error_shown = True
+        show_message(window, 'Error', 'CAN bus is not connected.')
 
 
 def send_message(window, message_name):
     if window.bus is None:
-        if (
-            window.pos_checkbox.isChecked()
-            or window.vel_checkbox.isChecked()
-            or window.torq_checkbox.isChecked()
-        ):
-            window.send_timer.stop()
-            window.pos_checkbox.setChecked(False)
-            window.vel_checkbox.setChecked(False)
-            window.torq_checkbox.setChecked(False)
-
-        if not hasattr(window, '_bus_error_shown') or not window._bus_error_shown:
-            window._bus_error_shown = True
-            show_message(window, 'Error', 'CAN bus is not connected.')
-
+        _stop_control_on_bus_lost(window)
         return
-
-    user_id = int(window.id_input.text()) & 0x1F
-    message = window.db.get_message_by_name(message_name)
-    if not message:
+    if window.engine.node_id is None:
         return
-
-    user_messages = window.message_data_dicts[user_id]
-    message_data = user_messages.get(message_name)
-    if message_data is None:
-        message_data = {signal.name: 0 for signal in message.signals}
-        user_messages[message_name] = message_data
-    else:
-        for signal in message.signals:
-            message_data.setdefault(signal.name, 0)
-
-    try:
-        raw_payload = _build_raw_payload(message, message_data)
-        encoded_data = message.encode(raw_payload, scaling=False)
-        frame_id = (user_id << 6) | (message.frame_id & 0x3F)
-        msg = can.Message(
-            arbitration_id=frame_id, data=encoded_data, is_extended_id=False
-        )
-        window.bus.send(msg)
-        if getattr(window, "debug_output", False):
-            hex_payload = " ".join(f"{byte:02X}" for byte in msg.data)
-            print(
-                f"[TX] {message.name} (0x{frame_id:03X}) :: {hex_payload} | raw={raw_payload}"
-            )
-    except (ValueError, KeyError, cantools.database.errors.EncodeError) as e:
-        print(f"Failed to send message: {e}")
+    window.engine.send_message(message_name, window.engine.node_id)
 
 def control_mode_changed(window):
-    if (
-        window.pos_checkbox.isChecked()
-        or window.vel_checkbox.isChecked()
-        or window.torq_checkbox.isChecked()
-    ):
-        print("send_timer start")
-        window.send_timer.start(10)  # 10ms 간격으로 메시지 전송 시작
-    else:
-        window.send_timer.stop()  # 메시지 전송 중지
-        print("send_timer stop")
-
-
-def send_messages(window):
+    # 주기 송신은 엔진의 TX 스케줄러가 맡으므로 선택된 모드만 넘겨 줌
     if window.pos_checkbox.isChecked():
-        send_messages_containing(window, "CTRL_POS")
+        keyword = "CTRL_POS"
     elif window.vel_checkbox.isChecked():
-        send_messages_containing(window, "CTRL_VEL")
+        keyword = "CTRL_VEL"
     elif window.torq_checkbox.isChecked():
-        send_messages_containing(window, "CTRL_TORQ")
-
-
-def send_messages_containing(window, keyword):
-    if hasattr(window, "db_filename") and "common" in window.db_filename.lower():
-        # DBC 이름에 common 포함 → 전체 메시지
-        for message_name in window.message_data.keys():
-            if keyword in message_name:
-                send_message(window, message_name)
+        keyword = "CTRL_TORQ"
     else:
-        # ID 기반 필터링
-        user_id = int(window.id_input.text()) & 0x1F
-        for message_name in window.message_data.keys():
-            if keyword in message_name and f"ID{user_id:02d}_" in message_name:
-                send_message(window, message_name)
+        keyword = None
 
+    if keyword is not None and window.bus is None:
+        _stop_control_on_bus_lost(window)
+        return
+    window.engine.set_control_keyword(keyword)
+    logger.info("control stream %s", keyword or "stop")
 
-def send_multi_messages(window):
-    if window.bus is None or window.db is None:
+
+def send_messages(window):
+    if window.bus is None:
+        _stop_control_on_bus_lost(window)
         return
-    if not hasattr(window, "multi_slots"):
+    window.engine.send_control_messages()
+
+
+def send_messages_containing(window, keyword):
+    if window.bus is None:
+        _stop_control_on_bus_lost(window)
         return
+    window.engine.send_messages_containing(keyword)
+
+
+def refresh_multi_stream(window):
+    """Multi 슬롯과 주기 송신하는 Common 메시지를 타이밍 휠로 묶어 TX 스케줄러에 넣습니다.
+
+    슬롯마다 주기와 위상이 다르므로, 위상이 Auto인 슬롯은 휠이 빈 tick을 골라 프레임이
+    한 tick에 몰리지 않게 합니다. Start 전에도 버스 부하 추정을 갱신하고, Start가 꺼져
+    있으면 스트림을 뺍니다. 슬롯 값, 활성화, ID, 메시지, 주기/위상이나 DBC가 바뀔 때마다 부릅니다.
+    """
+    engine = window.engine
+    entries = []
+    if window.db is not None:
+        for slot in window.multi_slots:
+            if not slot.get("enabled", False):
+                continue
+            if not slot.get("tx_ready", False):
+                continue
+
+            # 값을 적용할 때 인코딩해 둔 프레임을 그대로 보냄 (DBC를 다시 읽었으면 여기서 다시 인코딩)
+            frame = slot.get("tx_frame")
+            if frame is None:
+                frame = encode_multi_slot_frame(window, slot)
+                if frame is None:
+                    continue
+            period = slot.get("period_ms", 10) / 1000.0
+            offset = slot.get("offset_ms")
+            entries.append((frame, period, None if offset is None else offset / 1000.0))
+
+        common_period = window.multi_common_period_ms.value()
+        if common_period > 0 and window.multi_common_applied is not None:
+            message_name, values = window.multi_common_applied
+            target_ids = sorted(
+                {int(s.get("id", 0)) & 0x1F for s in window.multi_slots if s.get("enabled", False)}
+            )
+            for frame in engine.encode_for_nodes(message_name, values, target_ids):
+                entries.append((frame, common_period / 1000.0, None))
 
-    for slot in window.multi_slots:
-        if not slot.get("enabled", False):
-            continue
-        if not slot.get("tx_ready", False):
-            continue
+    try:
+        wheel = TimingWheel(entries)
+    except ValueError as e:
+        window.multi_bus_load_label.setText(f"Bus load: {e}")
+        engine.remove_tx_stream(MULTI_TX_STREAM)
+        return
+    bitrate = int(window.bitrate_combo.currentText())
+    window.multi_bus_load_label.setText(
+        f"Bus load: {wheel.bus_load(bitrate):.1%} (peak {wheel.peak} frames/tick)"
+    )
 
-        message_name = slot.get("tx_message_name")
-        if not message_name:
-            continue
+    if window.multi_start_button.isChecked():
+        engine.set_tx_schedule(MULTI_TX_STREAM, wheel)
+    else:
+        engine.remove_tx_stream(MULTI_TX_STREAM)
 
-        slot_id = int(slot.get("id", 0)) & 0x1F
-        message = window.db.get_message_by_name(message_name)
-        if not message:
-            continue
 
-        message_data = {sig.name: 0 for sig in message.signals}
-        message_data.update(slot.get("tx_applied_values") or {})
-        try:
-            raw_payload = _build_raw_payload(message, message_data)
-            encoded_data = message.encode(raw_payload, scaling=False)
-            frame_id = (slot_id << 6) | (message.frame_id & 0x3F)
-            msg = can.Message(
-                arbitration_id=frame_id, data=encoded_data, is_extended_id=False
-            )
-            window.bus.send(msg)
-            if getattr(window, "debug_output", False):
-                hex_payload = " ".join(f"{byte:02X}" for byte in msg.data)
-                print(
-                    f"[TX][MULTI] id={slot_id} {message.name} (0x{frame_id:03X}) :: {hex_payload} | raw={raw_payload}"
-                )
-        except (ValueError, KeyError, cantools.database.errors.EncodeError) as e:
-            print(f"[TX][MULTI] Failed to send {message_name}: {e}")
+def encode_multi_slot_frame(window, slot):
+    """Multi 슬롯의 적용된 값으로 송신 프레임을 인코딩해 slot["tx_frame"]에 보관합니다."""
+    slot["tx_frame"] = None
+    message_name = slot.get("tx_message_name")
+    if window.db is None or not message_name or not slot.get("tx_ready", False):
+        return None
+    slot["tx_frame"] = window.engine.encode_frame(
+        message_name, slot.get("tx_applied_values"), slot.get("id", 0), "TX/MULTI"
+    )
+    return slot["tx_frame"]
 
 
 def send_common_message_to_ids(window, message_name: str, signal_values: dict, target_ids):
@@ -443,43 +518,17 @@ def send_common_message_to_ids(window, message_name: str, signal_values: dict, t
     if not message_name:
         return
 
-    message = window.db.get_message_by_name(message_name)
-    if not message:
-        return
-
-    message_data = {sig.name: 0 for sig in message.signals}
-    message_data.update(signal_values or {})
-
-    try:
-        raw_payload = _build_raw_payload(message, message_data)
-        encoded_data = message.encode(raw_payload, scaling=False)
-    except (ValueError, KeyError, cantools.database.errors.EncodeError) as e:
-        print(f"[TX][COMMON] Failed to encode {message_name}: {e}")
-        return
-
-    for target_id in target_ids:
-        slot_id = int(target_id) & 0x1F
-        frame_id = (slot_id << 6) | (message.frame_id & 0x3F)
-        msg = can.Message(arbitration_id=frame_id, data=encoded_data, is_extended_id=False)
-        try:
-            window.bus.send(msg)
-            if getattr(window, "debug_output", False):
-                hex_payload = " ".join(f"{byte:02X}" for byte in msg.data)
-                print(
-                    f"[TX][COMMON] id={slot_id} {message.name} (0x{frame_id:03X}) :: {hex_payload} | raw={raw_payload}"
-                )
-        except Exception as e:
-            print(f"[TX][COMMON] Failed to send id={slot_id} {message_name}: {e}")
+    window.engine.send_to_nodes(message_name, signal_values, target_ids)
 
 
 def update_data_display(window):
-    user_id = int(window.id_input.text()) & 0x1F
-    if window.current_message_name in window.message_data_dicts[user_id]:
-        message_data = window.message_data_dicts[user_id][window.current_message_name]
-    else:
-        message_data = {}
+    user_id = window.engine.node_id
+    message_data = {}
+    if window.signal_store is not None and window.current_message_name and user_id is not None:
+        message_data = window.signal_store.read_message(user_id, window.current_message_name)
 
     # 기존 위젯 제거
+    window.data_fields = {}
     while window.data_layout.count():
         child = window.data_layout.takeAt(0)
         if child.widget():
@@ -495,14 +544,30 @@ def update_data_display(window):
             value.setObjectName(object_name)
             window.data_layout.addWidget(label, i, 0)
             window.data_layout.addWidget(value, i, 1)
+            window.data_fields[signal.name] = value
+
+        # 방금 표시한 값은 다시 반영할 필요 없음
+        if window.signal_store is not None and user_id is not None:
+            window.signal_store.take_dirty(user_id, window.current_message_name)
 
 
-def update_data_fields(window, message_name, decoded_data):
-    for signal_name, signal_value in decoded_data.items():
-        object_name = f"{message_name}.{signal_name}"
-        field = window.findChild(QLineEdit, object_name)
+def update_data_fields(window):
+    """현재 메시지에서 값이 바뀐(dirty) signal만 화면 필드에 반영합니다.
+
+    디스플레이 주기마다 한 번 호출되므로, 그 사이에 여러 프레임이 와도 필드마다
+    최신 값으로 setText가 한 번만 일어납니다.
+    """
+    store = window.signal_store
+    message_name = window.current_message_name
+    user_id = window.engine.node_id
+    if store is None or not message_name or not window.data_fields or user_id is None:
+        return
+
+    fields = window.data_fields
+    for signal_name in store.take_dirty(user_id, message_name):
+        field = fields.get(signal_name)
         if field is not None:
-            field.setText(str(signal_value))
+            field.setText(str(store.read(user_id, message_name, signal_name)))
 
 
 def update_message_list(window):
@@ -561,80 +626,146 @@ def update_graph_data_combo(window):
         window.graph_data_combo2.addItem(item)
 
 
-def update_graph(window):
+def update_graph(window, samples=None):
+    """선택된 signal의 새 샘플을 그래프 버퍼에 추가합니다.
+
+    samples는 (message_name, timestamps, columns)이고, 선택된 signal 중 이 메시지에 속한
+    것만 샘플을 받습니다. 그래서 버퍼마다 한 메시지의 시각 순서만 지키면 됩니다.
+    columns가 None이면 프레임 하나(timestamps는 float)이고 값은 signal store에서 읽습니다.
+    시각은 모두 드라이버 수신 시각(msg.timestamp)입니다.
+    실제 그리기는 render_graph()가 렌더 타이머 주기로 수행합니다.
+    """
     if not getattr(window, "single_graph_active", True):
         return
+    if samples is None:
+        # 수신 프레임 없이 호출되면 추가할 샘플이 없음 (표시는 render_graph()가 담당)
+        return
 
-    selected = window.graph_data_combo.currentText()
-    selected2 = window.graph_data_combo2.currentText()
-
-    # 둘 다 비었거나 "None" 선택이면 return
-    if (not selected or selected == "None") and (not selected2 or selected2 == "None"):
+    message_name, timestamps, columns = samples
+    selections = [
+        selection
+        for selection in window.graph_selections
+        if selection and selection.startswith(message_name + ".")
+    ]
+    if not selections:
         return
 
-    now = time.time()
+    # 첫 샘플의 드라이버 시각을 세션 기준(0초)으로 사용
     if window.graph_start_time is None:
-        window.graph_start_time = now
-    timestamp = now - window.graph_start_time
-    time_window = 10.0
-
-    def process_signal(selection, color, use_right_yaxis=False):
-        if not selection or selection == "None":
-            return
+        window.graph_start_time = timestamps if columns is None else timestamps[0]
+    epoch = window.graph_start_time
 
+    for selection in selections:
         try:
-            msg_name, sig_name = selection.split(".")
-            user_id = int(window.id_input.text()) & 0x1F
-            value = window.message_data_dicts[user_id][msg_name][sig_name]
-            key = f"{msg_name}.{sig_name}"
-
-            if key not in window.graph_data:
-                window.graph_data[key] = ([], [])
-
-            x_data, y_data = window.graph_data[key]
-            x_data.append(timestamp)
-            y_data.append(value)
-
-            while x_data and (timestamp - x_data[0]) > time_window:
-                x_data.pop(0)
-                y_data.pop(0)
-
-            if key not in window.graph_plot_items:
-                if use_right_yaxis:
-                    plot_item = pg.PlotCurveItem(pen=color, name=key)
-                    window.right_viewbox.addItem(plot_item)
-                else:
-                    plot_item = window.graph_widget.plot(
-                        [], [], pen=color, name=key, symbol=None
-                    )
-                window.graph_plot_items[key] = plot_item
-
-            plot_item = window.graph_plot_items[key]
-            plot_item.setData(x_data, y_data)
-            plot_item.show()  # 다시 표시
+            sig_name = selection[len(message_name) + 1:]
+            buffer = window.graph_data.get(selection)
+            if buffer is None:
+                buffer = window.graph_data[selection] = RingBuffer()
+
+            if columns is None:
+                value = window.signal_store.read(window.engine.node_id, message_name, sig_name)
+                buffer.append(timestamps - epoch, value)
+            elif sig_name in columns:
+                buffer.extend(timestamps - epoch, columns[sig_name])
+            else:
+                continue
+            window.graph_dirty.add(selection)
 
             if window.debug_output:
-                print(
-                    f"[GRAPH] key={key}, value={value}, timestamp={timestamp:.2f}, points={len(x_data)}"
+                limited(
+                    logging.DEBUG,
+                    ("[GRAPH] key=%s", selection),
+                    "[GRAPH] key=%s, points=%d",
+                    selection,
+                    len(buffer),
                 )
 
         except Exception as e:
-            print(f"[GRAPH] Failed to process {selection}: {e}")
+            limited(
+                logging.ERROR,
+                ("[GRAPH] Failed to process %s", selection),
+                "[GRAPH] Failed to process %s: %s",
+                selection,
+                e,
+            )
 
-    # ✅ 그래프 초기화 또는 숨김 처리
-    for key, plot_item in window.graph_plot_items.items():
-        plot_item.hide()  # 전부 숨겨놓고, 필요한 것만 다시 표시
 
-    # 선택된 신호만 다시 그리기
-    process_signal(selected, "b", use_right_yaxis=False)
-    process_signal(selected2, "r", use_right_yaxis=True)
+def _graph_plot_item(window, key, color, use_right_yaxis):
+    plot_item = window.graph_plot_items.get(key)
+    if plot_item is None:
+        plot_item = pg.PlotDataItem(pen=color, name=key)
+        # 보이는 구간만 그리고, 화면 폭에 맞게 min/max로 줄여 스파이크를 유지
+        plot_item.setClipToView(True)
+        plot_item.setDownsampling(auto=True, method="peak")
+        if use_right_yaxis:
+            window.right_viewbox.addItem(plot_item)
+        else:
+            window.graph_widget.addItem(plot_item)
+        window.graph_plot_items[key] = plot_item
+    return plot_item
+
+
+def render_graph(window):
+    """렌더 타이머 주기로 호출됩니다. 새 샘플이 들어온(dirty) 곡선만 다시 그립니다."""
+    if not getattr(window, "single_graph_active", True):
+        window.graph_dirty.clear()
+        return
+    now = window.can_receiver.driver_time()
+    if window.graph_start_time is None or now is None:
+        return
+
+    timestamp = now - window.graph_start_time
+    since = timestamp - window.graph_time_window
+    selections = (
+        (window.graph_selections[0], "b", window.graph_widget.getViewBox(), False),
+        (window.graph_selections[1], "r", window.right_viewbox, True),
+    )
+    visible = set()
+    drawn = False
+    for key, color, viewbox, use_right_yaxis in selections:
+        buffer = window.graph_data.get(key)
+        if buffer is None:
+            continue
+        visible.add(key)
+        plot_item = _graph_plot_item(window, key, color, use_right_yaxis)
+        if not plot_item.isVisible():
+            plot_item.show()
+            window.graph_dirty.add(key)
+
+        if key in window.graph_dirty:
+            x_data, y_data = buffer.view(since=since)
+            plot_item.setData(x_data, y_data)
+            drawn = True
+
+        # y축: 보이는 구간의 최소/최대만 추적해 범위가 바뀔 때만 갱신
+        if use_right_yaxis or window.auto_scale_button.isChecked():
+            tracker = window.graph_ranges.setdefault(key, RangeTracker())
+            y_range = tracker.update(buffer, since)
+            if y_range is not None and window.graph_applied_ranges.get(key) != y_range:
+                low, high = y_range
+                if low == high:
+                    low, high = low - 0.5, high + 0.5
+                viewbox.setYRange(low, high, padding=0.05)
+                window.graph_applied_ranges[key] = y_range
+
+    for key, plot_item in window.graph_plot_items.items():
+        if key not in visible and plot_item.isVisible():
+            plot_item.hide()
+    window.graph_dirty.clear()
 
-    # x축 고정 범위
-    window.graph_widget.setXRange(timestamp - time_window, timestamp)
+    # x축은 시간 축을 멈추지 않았을 때만 현재 시각을 따라감
+    if not window.pause_time_axis:
+        window.graph_widget.setXRange(since, timestamp, padding=0)
+        drawn = True
 
-    # y축 오토스케일
-    window.graph_widget.enableAutoRange(axis="y", enable=True)
-    window.right_viewbox.enableAutoRange(axis="y", enable=True)
+    if drawn:
+        window.render_frames += 1
+    now = time.monotonic()
+    elapsed = now - window.render_fps_since
+    if elapsed >= 1.0:
+        window.render_fps = window.render_frames / elapsed
+        window.render_frames = 0
+        window.render_fps_since = now
 
 
 def toggle_time_axis(window):
@@ -648,6 +779,9 @@ def toggle_time_axis(window):
 def clear_graph(window):
     # 데이터, PlotItem 관리 dict 초기화
     window.graph_data.clear()
+    window.graph_dirty.clear()
+    window.graph_ranges.clear()
+    window.graph_applied_ranges.clear()
 
     # PlotItem 제거
     for key, plot_item in window.graph_plot_items.items():
@@ -666,13 +800,13 @@ def clear_graph(window):
     window.graph_start_time = None
 
     if window.debug_output:
-        print("[GRAPH] Graph cleared and time reset")
+        logger.debug("[GRAPH] Graph cleared and time reset")
 
 
 def toggle_auto_scale(window):
-    if window.auto_scale_button.isChecked():
-        window.graph_widget.enableAutoRange(axis="y")
-    else:
+    # 켜져 있으면 render_graph()가 보이는 구간의 최소/최대로 y축을 맞춤
+    window.graph_applied_ranges.clear()
+    if not window.auto_scale_button.isChecked():
         window.graph_widget.disableAutoRange(axis="y")
 
 
@@ -718,69 +852,52 @@ def mouseMoved(window, evt):
 
 
 def handle_received_message(window, msg):
-
     if getattr(window, "pause_can_updates", False):
         return
 
     if window.db is None:
-        print("[handle_received_message] DBC not loaded.")
+        limited(logging.WARNING, ("DBC not loaded",), "[handle_received_message] DBC not loaded.")
         return
 
-    try:
-        # DBC 구조에 따라 frame_id를 결정
-        can_id = msg.arbitration_id
-        frame_id = can_id & 0x3F if window.uses_adjusted_id else can_id
-        try:
-            message = window.db.get_message_by_frame_id(frame_id)
+    window.engine.process_frame(msg)
 
-        except KeyError:
-            print(
-                f"[handle_received_message] No DBC message for frame ID: {hex(frame_id)}"
-            )
-            return
 
-        try:
-            decoded_data = window.db.decode_message(
-                frame_id, msg.data, decode_choices=False
-            )
-
-        except Exception as e:
-            print(
-                f"[handle_received_message] Decode Error: ID: {hex(frame_id)}, len: {len(msg.data)}, error: {e}"
-            )
-            return
+def handle_received_messages(window, batch):
+    """수신 스레드가 모아 둔 프레임 묶음을 엔진으로 디코딩하고 화면 필드를 갱신합니다."""
+    if getattr(window, "pause_can_updates", False):
+        return
 
-        message_name = message.name
-        upper_5_bits_id = (can_id >> 6) & 0x1F
-        user_id = None
-        try:
-            user_id = int(window.id_input.text()) & 0x1F
-        except Exception:
-            user_id = None
+    if window.db is None:
+        limited(logging.WARNING, ("DBC not loaded",), "[handle_received_messages] DBC not loaded.")
+        return
 
-        full_message_name = message.name
+    window.engine.process(batch)
+    update_data_fields(window)
 
-        if hasattr(window, "multi_graph_on_rx"):
-            window.multi_graph_on_rx(can_id, decoded_data)
 
-        if user_id is None:
-            return
-
-        if upper_5_bits_id == user_id:
-            if full_message_name not in window.message_data_dicts[user_id]:
-                window.message_data_dicts[user_id][full_message_name] = {}
+def on_frames_decoded(window, can_id, message, timestamps, columns):
+    """엔진 관찰자: 디코딩된 프레임을 Multi 슬롯과 Single 그래프에 반영합니다."""
+    if columns is None:
+        window.multi_graph_on_rx(can_id, timestamps)
+    else:
+        window.multi_graph_on_rx_columns(can_id, columns, timestamps)
 
-            window.message_data_dicts[user_id][full_message_name].update(decoded_data)
-            update_data_fields(window, full_message_name, decoded_data)
-            update_graph(window)
-            # print(full_message_name)
-        else:
-            print(
-                f"[handle_received_message] ID mismatch: message from node {upper_5_bits_id}, expected {user_id}"
-            )
+    user_id = window.engine.node_id
+    if user_id is None:
+        return
 
-    except Exception as e:
-        print(f"[handle_received_message] Exception: {e}")
+    upper_5_bits_id = (can_id >> 6) & 0x1F
+    if upper_5_bits_id != user_id:
+        limited(
+            logging.INFO,
+            ("ID mismatch from node %d", upper_5_bits_id),
+            "[on_frames_decoded] ID mismatch: message from node %d, expected %d",
+            upper_5_bits_id,
+            user_id,
+        )
+    else:
+        # 화면 필드는 디스플레이 주기마다 update_data_fields()에서 한 번에 갱신
+        update_graph(window, (message.name, timestamps, columns))
 
 
 def select_message(main_window, item):
@@ -818,15 +935,4 @@ def select_message(main_window, item):
 
 def toggle_debug_output(main_window, state):
     main_window.debug_output = state == Qt.Checked
-
-
-def detect_dbc_structure(window):
-    """DBC 메시지 이름을 분석해 ID00_만 있는지 확인하여 uses_adjusted_id 설정"""
-    all_message_names = [msg.name for msg in window.db.messages]
-    has_multiple_ids = any(
-        name.startswith("ID") and not name.startswith("ID00_")
-        for name in all_message_names
-    )
-    window.uses_adjusted_id = not has_multiple_ids
-    # print(f"[DBC] Adjusted ID mode: {window.uses_adjusted_id}")
-    # print("detect_dbc_structure : ", has_multiple_ids, window.uses_adjusted_id)
+    app_log.set_debug(main_window.debug_output)
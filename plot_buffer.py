@@ -0,0 +1,123 @@
+# plot_buffer.py
+import numpy as np
+
+GRAPH_TIME_WINDOW = 10.0  # 그래프에 보여 주는 기본 시간 구간(초)
+GRAPH_BUFFER_CAPACITY = 50000  # signal당 보관하는 최대 샘플 수 (10초 x 5kHz)
+GRAPH_RENDER_HZ = 30  # 그래프 다시 그리기 주기 (20~60Hz)
+MULTI_SLOT_CAPACITY = 500  # Multi 슬롯 그래프당 보관하는 최근 샘플 수
+
+
+class RingBuffer:
+    """고정 크기 (시간, 값) 원형 버퍼.
+
+    각 샘플을 i와 i + capacity 두 곳에 기록하므로, 최근 N개는 항상 연속된 구간이라
+    복사 없이 NumPy view로 pyqtgraph에 넘길 수 있습니다. 메모리와 추가 비용은
+    세션 길이와 무관하게 일정합니다.
+    """
+
+    def __init__(self, capacity=GRAPH_BUFFER_CAPACITY):
+        self.capacity = capacity
+        self.times = np.zeros(2 * capacity)
+        self.values = np.zeros(2 * capacity)
+        self.head = 0  # 다음에 기록할 위치 (0 ~ capacity-1)
+        self.count = 0
+        self.total = 0  # 지금까지 기록한 샘플 수 (새 샘플 판별용)
+
+    def __len__(self):
+        return self.count
+
+    def append(self, t, value):
+        head = self.head
+        self.times[head] = self.times[head + self.capacity] = t
+        self.values[head] = self.values[head + self.capacity] = value
+        self.head = (head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.total += 1
+
+    def extend(self, times, values):
+        """NumPy 배열로 여러 샘플을 한 번에 추가합니다."""
+        n = len(times)
+        if n == 0:
+            return
+        if n > self.capacity:
+            times = times[-self.capacity:]
+            values = values[-self.capacity:]
+            n = self.capacity
+
+        capacity = self.capacity
+        head = self.head
+        first = min(n, capacity - head)
+        for offset in (0, capacity):
+            self.times[head + offset : head + offset + first] = times[:first]
+            self.values[head + offset : head + offset + first] = values[:first]
+            if first < n:
+                self.times[offset : offset + n - first] = times[first:]
+                self.values[offset : offset + n - first] = values[first:]
+        self.head = (head + n) % capacity
+        self.count = min(self.count + n, capacity)
+        self.total += n
+
+    def view(self, since=None):
+        """(times, values) 연속 view. since가 있으면 그 시각 이후 샘플만."""
+        end = self.head + self.capacity
+        start = end - self.count
+        times = self.times[start:end]
+        values = self.values[start:end]
+        if since is not None and self.count:
+            first = int(np.searchsorted(times, since, side="left"))
+            times = times[first:]
+            values = values[first:]
+        return times, values
+
+    def last(self):
+        """가장 최근 (시간, 값). 비어 있으면 None."""
+        if not self.count:
+            return None
+        index = self.head - 1 + self.capacity
+        return self.times[index], self.values[index]
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+        self.total = 0
+
+
+class RangeTracker:
+    """보이는 구간의 최소/최대값을 점진적으로 계산합니다.
+
+    새 샘플만 보고 갱신하고, 최소/최대값이 구간 밖으로 밀려났을 때만 전체를 다시 계산합니다.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.low = self.high = None
+        self.low_time = self.high_time = None
+        self.seen_total = 0
+
+    def update(self, buffer, since):
+        """(low, high) 또는 보이는 샘플이 없으면 None."""
+        times, values = buffer.view(since)
+        new = min(buffer.total - self.seen_total, len(values))
+        self.seen_total = buffer.total
+        if not len(values):
+            self.low = self.high = None
+            return None
+
+        if self.low is None or self.low_time < since or self.high_time < since:
+            start = 0
+            self.low = self.high = None
+        elif new:
+            start = len(values) - new
+        else:
+            return self.low, self.high
+
+        tail = values[start:]
+        i = int(np.argmin(tail))
+        if self.low is None or tail[i] <= self.low:
+            self.low, self.low_time = float(tail[i]), times[start + i]
+        i = int(np.argmax(tail))
+        if self.high is None or tail[i] >= self.high:
+            self.high, self.high_time = float(tail[i]), times[start + i]
+        return self.low, self.high
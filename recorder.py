@@ -0,0 +1,87 @@
+# recorder.py
+import os
+import time
+
+import can
+from PyQt5.QtCore import QThread
+from app_log import logger
+from can_receiver import Subscription
+
+RECORD_BUFFER_SIZE = 262144  # 파일에 쓰기 전까지 보관하는 최대 프레임 수 (1Mbit/s에서 약 30초)
+RECORD_FLUSH_INTERVAL = 0.05  # 버퍼를 비워 파일에 쓰는 주기(초)
+
+
+def open_log_writer(file_name):
+    """확장자에 맞는 python-can writer를 엽니다. BLF는 압축해서 기록합니다."""
+    suffix = os.path.splitext(file_name)[1].lower()
+    if suffix == ".blf":
+        return can.BLFWriter(file_name, compression_level=6)
+    if suffix == ".asc":
+        return can.ASCWriter(file_name)
+    raise ValueError(f"Unsupported log format: {suffix}")
+
+
+class FrameRecorder(QThread):
+    """수신/송신 프레임을 별도 스레드에서 BLF/ASC 파일로 기록합니다.
+
+    수신 스레드는 제한된 구독 큐에 넣기만 하고 파일 쓰기는 이 스레드가 하므로
+    RX 경로가 디스크 속도에 묶이지 않습니다. 큐가 가득 차면 새 프레임을 버리고 셉니다.
+    GUI 이벤트 루프와 무관하게 동작해 창이 최소화되거나 다른 탭에 있어도 계속 기록합니다.
+    """
+
+    def __init__(self, can_receiver, file_name, maxsize=RECORD_BUFFER_SIZE):
+        super().__init__()
+        self.can_receiver = can_receiver
+        self.file_name = file_name
+        self.writer = open_log_writer(file_name)
+        self.subscription = can_receiver.subscribe(
+            "recorder",
+            maxsize=maxsize,
+            drop_policy=Subscription.DROP_NEWEST,
+            include_tx=True,
+        )
+        self.running = False
+        self.frames_written = 0
+        self.bytes_written = 0
+        self.bytes_per_second = 0.0
+
+    @property
+    def frames_dropped(self):
+        return self.subscription.dropped
+
+    def run(self):
+        self.running = True
+        rate_since = time.monotonic()
+        rate_bytes = 0
+        while self.running:
+            time.sleep(RECORD_FLUSH_INTERVAL)
+            self._write_pending()
+
+            now = time.monotonic()
+            if now - rate_since >= 1.0:
+                self.bytes_per_second = (self.bytes_written - rate_bytes) / (now - rate_since)
+                rate_since = now
+                rate_bytes = self.bytes_written
+
+        # 구독을 끊은 뒤 남은 프레임까지 기록하고 닫음
+        self.can_receiver.unsubscribe(self.subscription)
+        self._write_pending()
+        self.writer.stop()
+        self.bytes_written = os.path.getsize(self.file_name)
+        logger.info(
+            "[Recorder] %s: %d frames, %d bytes, %d dropped",
+            self.file_name,
+            self.frames_written,
+            self.bytes_written,
+            self.frames_dropped,
+        )
+
+    def _write_pending(self):
+        for msg in self.subscription.drain():
+            self.writer.on_message_received(msg)
+            self.frames_written += 1
+        self.bytes_written = self.writer.file.tell()
+
+    def stop(self):
+        self.running = False
+        self.wait()
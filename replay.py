@@ -0,0 +1,126 @@
+# replay.py
+import sys
+import threading
+import time
+
+import can
+
+REPLAY_SPEEDS = {"1x": 1.0, "2x": 2.0, "5x": 5.0, "10x": 10.0, "Max": None}
+
+
+class ReplayBus(can.BusABC):
+    """BLF/ASC/CSV 로그를 실제 bus처럼 재생하는 bus.
+
+    window.bus 자리에 두면 CANReceiver가 그대로 읽어 가므로, 재생한 프레임은 실기와
+    같은 수신/디코딩/그래프 경로를 탑니다. speed가 None이면 최대 속도로 재생하며,
+    throttle()이 True를 반환하는 동안(소비자가 밀려 있을 때)은 잠시 기다립니다.
+    """
+
+    def __init__(self, file_name, speed=1.0, throttle=None, **kwargs):
+        self.file_name = file_name
+        self.speed = speed
+        self.throttle = throttle
+        self.lock = threading.Lock()
+        self.reader = None
+        self.next_msg = None
+        self.log_start = None
+        self.position = 0.0  # 로그 시작 기준 재생 위치(초)
+        self.frames_replayed = 0
+        self.replay_started = None  # 첫 프레임을 내보낸 시각 (처리량 측정용)
+        self.replay_finished = None
+        self._open(0.0)
+        super().__init__(channel=file_name, **kwargs)
+
+    def _open(self, position):
+        """로그를 처음부터 다시 열고 position(초) 위치까지 건너뜁니다."""
+        if self.reader is not None:
+            self.reader.stop()
+        self.reader = can.LogReader(self.file_name)
+        self.frames = iter(self.reader)
+        self.next_msg = self._next_rx()
+        if self.next_msg is not None and self.log_start is None:
+            self.log_start = self.next_msg.timestamp
+        while self.next_msg is not None and self.next_msg.timestamp - self.log_start < position:
+            self.next_msg = self._next_rx()
+        self.position = position
+        self._anchor()
+
+    def _next_rx(self):
+        # GUI가 보낸 프레임은 실기에서도 수신되지 않으므로 건너뜀
+        for msg in self.frames:
+            if msg.is_rx:
+                return msg
+        return None
+
+    def _anchor(self):
+        """현재 프레임을 기준으로 재생 시계를 다시 맞춥니다 (시작, 탐색, 속도 변경 시)."""
+        self.anchor_log = self.next_msg.timestamp if self.next_msg is not None else 0.0
+        self.anchor_wall = time.monotonic()
+
+    def _recv_internal(self, timeout):
+        with self.lock:
+            msg = self.next_msg
+            if msg is None:
+                # 재생이 끝나면 실기에서 프레임이 안 오는 것처럼 대기만 함
+                wait = timeout if timeout is not None else 0.1
+            elif self.speed is None:
+                wait = 0.001 if self.throttle is not None and self.throttle() else 0.0
+            else:
+                due = self.anchor_wall + (msg.timestamp - self.anchor_log) / self.speed
+                wait = due - time.monotonic()
+            if msg is not None and wait <= 0:
+                self.next_msg = self._next_rx()
+                self.position = msg.timestamp - self.log_start
+                self.frames_replayed += 1
+                if self.replay_started is None:
+                    self.replay_started = time.perf_counter()
+                if self.next_msg is None:
+                    self.replay_finished = time.perf_counter()
+                return msg, False
+
+        # seek()가 기다리지 않도록 잠금을 푼 뒤 대기
+        if timeout is not None:
+            wait = min(wait, timeout)
+        if wait:
+            time.sleep(wait)
+        return None, False
+
+    @property
+    def finished(self):
+        return self.next_msg is None
+
+    def frames_per_second(self):
+        """지금까지의 재생 처리량(프레임/초)."""
+        if self.replay_started is None:
+            return 0.0
+        end = self.replay_finished or time.perf_counter()
+        elapsed = end - self.replay_started
+        return self.frames_replayed / elapsed if elapsed > 0 else 0.0
+
+    def seek(self, position):
+        with self.lock:
+            self._open(max(0.0, position))
+
+    def set_speed(self, speed):
+        with self.lock:
+            self.speed = speed
+            self._anchor()
+
+    def send(self, msg, timeout=None):
+        # 재생 중에는 버스로 보내지 않음
+        pass
+
+    def shutdown(self):
+        with self.lock:
+            self.reader.stop()
+            self.next_msg = None
+        super().shutdown()
+
+
+if __name__ == "__main__":
+    # 사용법: python replay.py <로그 파일> — 최대 속도로 읽기만 해서 로그 재생 자체의 처리량 측정
+    bus = ReplayBus(sys.argv[1], speed=None)
+    while bus.recv(timeout=0.0) is not None:
+        pass
+    print(f"{bus.frames_replayed} frames, {bus.frames_per_second():.0f} frames/s")
+    bus.shutdown()
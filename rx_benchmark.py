@@ -0,0 +1,182 @@
+# rx_benchmark.py
+# 사용법: python rx_benchmark.py [결과 JSON 파일] [시나리오당 프레임 수]
+# 실제 MainWindow를 offscreen Qt로 띄우고, 기본 DBC로 만든 합성 프레임을 수신 경로에 넣어
+# 시나리오별 처리량, 프레임당 지연(p50/p99), 최대 RSS를 측정해 JSON으로 저장합니다.
+# 프레임 단위 경로와 디스플레이 틱마다 묶어 처리하는 drain 경로를 모두 잽니다.
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import json
+import platform
+import random
+import sys
+import time
+
+import can
+import numpy as np
+import psutil
+from PyQt5.QtWidgets import QApplication
+
+import main_window_logic as logic
+from app_log import setup_logging, shutdown_logging
+from main_window import RX_DISPLAY_HZ, MainWindow
+from simulator import SIM_DBC_FILE
+
+BENCH_FRAMES = 20000  # 시나리오당 기본 프레임 수
+BENCH_BUS_FPS = 8000  # 1Mbit/s 포화 시 초당 프레임 수. 디스플레이 틱당 프레임 수 계산에 사용
+BENCH_MESSAGES = ("ID00_21_RSP_PVT_REPORT", "ID00_22_RSP_IDQ_REPORT", "ID00_23_RSP_VDQ_REPORT")
+BENCH_NODES = (1, 8, 31)
+# (활성 탭, 그래프에 올릴 signal 수). Single 탭은 콤보가 2개라 최대 2개
+BENCH_VIEWS = (("single", 0), ("single", 2), ("multi", 0), ("multi", 2), ("multi", 8))
+# frame: 프레임마다 handle_received_message (프레임 단위 디코딩)
+# drain: 디스플레이 틱마다 drain_received_messages로 묶음 처리 (실제 GUI 수신 경로)
+BENCH_PATHS = ("frame", "drain")
+
+
+def synthetic_frames(db, nodes, count, seed=0):
+    """노드 1..nodes의 PVT/IDQ/VDQ 보고를 돌아가며 만든 무작위 payload 프레임."""
+    rng = random.Random(seed)
+    messages = [db.get_message_by_name(name) for name in BENCH_MESSAGES]
+    frames = []
+    for i in range(count):
+        node_id = i % nodes + 1
+        message = messages[(i // nodes) % len(messages)]
+        frames.append(
+            can.Message(
+                arbitration_id=(node_id << 6) | (message.frame_id & 0x3F),
+                data=bytes(rng.getrandbits(8) for _ in range(message.length)),
+                is_extended_id=False,
+            )
+        )
+    return frames
+
+
+def graph_items(db, count):
+    items = []
+    for name in BENCH_MESSAGES:
+        message = db.get_message_by_name(name)
+        items.extend(f"{name}.{signal.name}" for signal in message.signals)
+    return items[:count]
+
+
+def configure_view(window, tab, signals, nodes):
+    """탭을 바꾸고 Single 콤보 또는 Multi 슬롯에 signal을 올립니다."""
+    logic.clear_graph(window)
+    window.multi_slots = []
+    window._rebuild_multi_cards()
+    window.payload_cache.clear()
+    items = graph_items(window.db, signals)
+
+    if tab == "multi":
+        window.tabs.setCurrentWidget(window.multi_tab)
+        for index, item in enumerate(items):
+            window.add_multi_slot()
+            window.multi_slots[index]["id"] = index % nodes + 1
+            window._multi_set_slot_graph_item(index, item)
+    else:
+        window.tabs.setCurrentWidget(window.single_tab)
+        window.graph_data_combo.setCurrentText(items[0] if len(items) > 0 else "None")
+        window.graph_data_combo2.setCurrentText(items[1] if len(items) > 1 else "None")
+
+
+def run_scenario(app, window, nodes, tab, signals, frame_count, path):
+    configure_view(window, tab, signals, nodes)
+    frames = synthetic_frames(window.db, nodes, frame_count)
+    frames_per_tick = max(1, BENCH_BUS_FPS // RX_DISPLAY_HZ)
+    process = psutil.Process()
+    peak_rss = process.memory_info().rss
+    latencies = np.empty(len(frames))
+
+    # 다른 노드 프레임의 "ID mismatch" 로그도 실제 비용이므로 포함 (로그는 링 버퍼에만 기록)
+    start = time.perf_counter()
+    if path == "drain":
+        # 실제 수신 경로: 수신 스레드가 링 버퍼에 쌓고, 디스플레이 틱마다
+        # drain_received_messages → handle_received_messages → CanEngine.process 로 한 번에 처리.
+        # 지연은 프레임이 속한 묶음의 처리 시간(틱을 기다리는 시간은 제외)
+        subscription = window.can_receiver.gui_subscription
+        for first in range(0, len(frames), frames_per_tick):
+            batch = frames[first:first + frames_per_tick]
+            now = time.monotonic()
+            for msg in batch:
+                msg.timestamp = now
+            subscription.put_many(batch)
+            t0 = time.perf_counter()
+            window.drain_received_messages()
+            latencies[first:first + len(batch)] = time.perf_counter() - t0
+            window._on_render_tick()
+            app.processEvents()
+            peak_rss = max(peak_rss, process.memory_info().rss)
+    else:
+        for i, msg in enumerate(frames):
+            msg.timestamp = time.monotonic()
+            t0 = time.perf_counter()
+            logic.handle_received_message(window, msg)
+            latencies[i] = time.perf_counter() - t0
+            if (i + 1) % frames_per_tick == 0:
+                # 디스플레이 틱: 필드 갱신과 그래프 렌더까지 포함해 처리량을 잼
+                logic.update_data_fields(window)
+                window._on_render_tick()
+                app.processEvents()
+                peak_rss = max(peak_rss, process.memory_info().rss)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "path": path,
+        "nodes": nodes,
+        "tab": tab,
+        "signals": signals,
+        "frames": len(frames),
+        "frames_per_s": round(len(frames) / elapsed, 1),
+        "p50_us": round(float(np.percentile(latencies, 50)) * 1e6, 2),
+        "p99_us": round(float(np.percentile(latencies, 99)) * 1e6, 2),
+        "peak_rss_mb": round(peak_rss / 2**20, 1),
+    }
+
+
+def main():
+    output = sys.argv[1] if len(sys.argv) > 1 else "rx_benchmark.json"
+    frame_count = int(sys.argv[2]) if len(sys.argv) > 2 else BENCH_FRAMES
+
+    app = QApplication(sys.argv[:1])
+    setup_logging(console=False)
+    window = MainWindow()
+    # 측정 중에는 타이머 대신 직접 틱을 돌림
+    window.rx_drain_timer.stop()
+    window.graph_render_timer.stop()
+    logic.load_dbc(window, SIM_DBC_FILE)
+    window.id_input.setText("1")
+    window.current_message_name = BENCH_MESSAGES[0]
+    logic.update_data_display(window)
+    # 합성 프레임의 timestamp가 time.monotonic()이므로 드라이버 시각도 같은 기준으로 맞춤
+    window.can_receiver.clock_offset = 0.0
+
+    results = []
+    for path in BENCH_PATHS:
+        for nodes in BENCH_NODES:
+            for tab, signals in BENCH_VIEWS:
+                result = run_scenario(app, window, nodes, tab, signals, frame_count, path)
+                results.append(result)
+                print(
+                    f"path={path:<5} nodes={nodes:<2} tab={tab:<6} signals={signals}: "
+                    f"{result['frames_per_s']:>9.0f} frames/s, "
+                    f"p50 {result['p50_us']:6.1f} us, p99 {result['p99_us']:7.1f} us, "
+                    f"RSS {result['peak_rss_mb']:.0f} MB"
+                )
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "frames_per_scenario": frame_count,
+        "results": results,
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved {output}")
+    window.close()
+    shutdown_logging()
+
+
+if __name__ == "__main__":
+    main()
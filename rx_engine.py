@@ -0,0 +1,372 @@
+# rx_engine.py
+# 별도 프로세스 수신 엔진. 범위는 "드라이버 수신"까지입니다: 엔진 프로세스는 bus를 열어
+# 드라이버 버퍼를 계속 비우고 원시 프레임을 공유 메모리 링에 기록할 뿐이고,
+# CANReceiver, 디코딩, signal 저장소, 그래프는 모두 GUI 프로세스에 남습니다.
+# 그래서 GUI가 멈춰도 드라이버 단에서 프레임을 잃지 않지만, 디코딩 비용은 여전히 GUI
+# 프로세스(GIL)에서 듭니다. 디코딩된 signal 열을 엔진에서 만들어 공유하는 기능은 없습니다.
+import logging
+import multiprocessing as mp
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from multiprocessing import shared_memory
+
+import can
+import numpy as np
+
+from app_log import LOG_QUEUE_SIZE, forward_records, limited, logger, setup_child_logging
+
+ENGINE_RING_CAPACITY = 65536  # 공유 메모리 링 버퍼 프레임 수 (1Mbit/s 포화 시 약 7초)
+ENGINE_START_TIMEOUT = 10.0  # 엔진 프로세스가 bus를 여는 데 기다리는 최대 시간(초)
+ENGINE_MAX_BATCH = 1024  # 엔진이 한 번에 꺼내 기록하는 최대 프레임 수
+
+FRAME_DATA_SIZE = 64  # CAN FD 최대 payload
+FRAME_DTYPE = np.dtype(
+    [
+        ("timestamp", "<f8"),
+        ("arbitration_id", "<u4"),
+        ("flags", "u1"),
+        ("dlc", "u1"),  # 프레임의 DLC (remote frame은 요청한 길이)
+        ("length", "u1"),  # data에 실제로 든 바이트 수
+        ("data", "u1", (FRAME_DATA_SIZE,)),
+    ]
+)
+FLAG_EXTENDED = 0x01
+FLAG_REMOTE = 0x02
+FLAG_ERROR = 0x04
+FLAG_FD = 0x08
+FLAG_BRS = 0x10
+FLAG_ESI = 0x20
+
+# 헤더 (uint64 x 8): 기록한 프레임 수, 읽은 프레임 수, 링이 가득 차 버린 프레임 수
+HEADER_WRITE, HEADER_READ, HEADER_OVERFLOW = 0, 1, 2
+HEADER_SIZE = 8 * 8
+
+
+class SharedFrameRing:
+    """프로세스 간 단일 생산자/단일 소비자 CAN 프레임 링 버퍼.
+
+    엔진 프로세스가 기록하고 GUI 프로세스가 읽습니다. 기록/읽기 카운터는 계속
+    증가만 하므로 각 쪽은 자기 카운터만 씁니다. 가득 차면 새 프레임을 버리고 overflow를 셉니다.
+    """
+
+    def __init__(self, shm, capacity, owner):
+        self.shm = shm
+        self.capacity = capacity
+        self.owner = owner  # 공유 메모리를 만든 쪽이 unlink 함
+        self.header = np.ndarray((8,), dtype=np.uint64, buffer=shm.buf)
+        self.records = np.ndarray(
+            (capacity,), dtype=FRAME_DTYPE, buffer=shm.buf, offset=HEADER_SIZE
+        )
+
+    @classmethod
+    def create(cls, capacity=ENGINE_RING_CAPACITY):
+        shm = shared_memory.SharedMemory(
+            create=True, size=HEADER_SIZE + capacity * FRAME_DTYPE.itemsize
+        )
+        ring = cls(shm, capacity, owner=True)
+        ring.header[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name, capacity):
+        return cls(shared_memory.SharedMemory(name=name), capacity, owner=False)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def overflow(self):
+        return int(self.header[HEADER_OVERFLOW])
+
+    def pending(self):
+        return int(self.header[HEADER_WRITE] - self.header[HEADER_READ])
+
+    def write(self, messages):
+        """프레임 목록을 기록하고, 자리가 없어 버린 프레임 수를 반환합니다."""
+        write = int(self.header[HEADER_WRITE])
+        free = self.capacity - (write - int(self.header[HEADER_READ]))
+        n = min(len(messages), free)
+        if n:
+            kept = messages[:n]
+            rows = np.zeros(n, dtype=FRAME_DTYPE)
+            rows["timestamp"] = [msg.timestamp for msg in kept]
+            rows["arbitration_id"] = [msg.arbitration_id for msg in kept]
+            rows["flags"] = [
+                (FLAG_EXTENDED if msg.is_extended_id else 0)
+                | (FLAG_REMOTE if msg.is_remote_frame else 0)
+                | (FLAG_ERROR if msg.is_error_frame else 0)
+                | (FLAG_FD if msg.is_fd else 0)
+                | (FLAG_BRS if msg.bitrate_switch else 0)
+                | (FLAG_ESI if msg.error_state_indicator else 0)
+                for msg in kept
+            ]
+            rows["dlc"] = [msg.dlc for msg in kept]
+            rows["length"] = [len(msg.data) for msg in kept]
+            payload = b"".join(bytes(msg.data).ljust(FRAME_DATA_SIZE, b"\0") for msg in kept)
+            rows["data"] = np.frombuffer(payload, dtype=np.uint8).reshape(n, FRAME_DATA_SIZE)
+
+            start = write % self.capacity
+            first = min(n, self.capacity - start)
+            self.records[start : start + first] = rows[:first]
+            if first < n:
+                self.records[: n - first] = rows[first:]
+            # 레코드를 모두 쓴 뒤에 카운터를 올려야 읽는 쪽이 덜 쓴 레코드를 보지 않음
+            self.header[HEADER_WRITE] = write + n
+
+        dropped = len(messages) - n
+        if dropped:
+            self.header[HEADER_OVERFLOW] += dropped
+        return dropped
+
+    def read(self, max_frames):
+        """쌓인 프레임을 최대 max_frames개 꺼내 can.Message 목록으로 반환합니다."""
+        read = int(self.header[HEADER_READ])
+        n = min(int(self.header[HEADER_WRITE]) - read, max_frames)
+        if n <= 0:
+            return []
+        start = read % self.capacity
+        first = min(n, self.capacity - start)
+        chunk = self.records[start : start + first]
+        if first < n:
+            chunk = np.concatenate((chunk, self.records[: n - first]))
+        else:
+            chunk = chunk.copy()
+        self.header[HEADER_READ] = read + n
+
+        messages = []
+        for timestamp, arbitration_id, flags, dlc, length, data in chunk.tolist():
+            messages.append(
+                can.Message(
+                    timestamp=timestamp,
+                    arbitration_id=arbitration_id,
+                    is_extended_id=bool(flags & FLAG_EXTENDED),
+                    is_remote_frame=bool(flags & FLAG_REMOTE),
+                    is_error_frame=bool(flags & FLAG_ERROR),
+                    is_fd=bool(flags & FLAG_FD),
+                    bitrate_switch=bool(flags & FLAG_BRS),
+                    error_state_indicator=bool(flags & FLAG_ESI),
+                    dlc=dlc,
+                    data=bytes(data[:length]),
+                )
+            )
+        return messages
+
+    def close(self):
+        # numpy view가 버퍼를 잡고 있으면 close()가 실패하므로 먼저 놓음
+        self.header = self.records = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _engine_main(
+    bus_kwargs, ring_name, capacity, commands, status, ready, log_queue, log_level, load_rate=None
+):
+    """엔진 프로세스 본체. bus를 열고 수신 프레임을 공유 메모리 링에 계속 기록합니다."""
+    # spawn된 프로세스에는 GUI의 로그 설정이 없으므로 레코드를 GUI 프로세스로 보냄
+    setup_child_logging(log_queue, log_level)
+    try:
+        bus = can.Bus(**bus_kwargs)
+    except Exception as e:  # 드라이버마다 예외 종류가 달라 모두 GUI에 전달
+        status.put(("error", str(e)))
+        return
+    ring = SharedFrameRing.attach(ring_name, capacity)
+    running = threading.Event()
+    running.set()
+
+    def command_loop():
+        # 송신/필터 요청은 수신 루프와 별개 스레드에서 처리해 수신 대기에 묶이지 않게 함
+        while running.is_set():
+            try:
+                command = commands.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            try:
+                if command[0] == "send":
+                    bus.send(command[1])
+                elif command[0] == "filters":
+                    bus.set_filters(command[1])
+                elif command[0] == "stop":
+                    running.clear()
+            except can.CanError as e:
+                # 송신은 GUI 쪽에서 기다리지 않으므로 실패를 상태 큐로 돌려보냄
+                status.put(("error", f"{command[0]} failed: {e}"))
+
+    threading.Thread(target=command_loop, daemon=True).start()
+    if load_rate:
+        threading.Thread(
+            target=_generate_load, args=(bus_kwargs, load_rate, running), daemon=True
+        ).start()
+    status.put(("ok", None))
+
+    try:
+        while running.is_set():
+            try:
+                msg = bus.recv(timeout=0.1)
+                if msg is None:
+                    continue
+                batch = [msg]
+                while len(batch) < ENGINE_MAX_BATCH:
+                    msg = bus.recv(timeout=0.0)
+                    if msg is None:
+                        break
+                    batch.append(msg)
+            except can.CanError as e:
+                limited(logging.ERROR, ("[RxEngine] CAN error",), "[RxEngine] CAN error: %s", e)
+                continue
+            ring.write(batch)
+            # recv()에서 기다리는 GUI 쪽을 깨움
+            ready.set()
+    finally:
+        bus.shutdown()
+        ring.close()
+        limited.flush(force=True)
+
+
+def _generate_load(bus_kwargs, rate, running):
+    """벤치마크용: 같은 가상 채널에 순번이 담긴 프레임을 rate(프레임/초)로 보냅니다."""
+    bus = can.Bus(**bus_kwargs)
+    sequence = 0
+    start = time.perf_counter()
+    while running.is_set():
+        due = int((time.perf_counter() - start) * rate)
+        while sequence < due:
+            bus.send(
+                can.Message(
+                    arbitration_id=0x061,
+                    is_extended_id=False,
+                    data=sequence.to_bytes(8, "little"),
+                )
+            )
+            sequence += 1
+        time.sleep(0.001)
+    bus.shutdown()
+
+
+class EngineBus:
+    """별도 프로세스의 수신 엔진에 연결된 bus 대리 객체.
+
+    window.bus 자리에 그대로 쓰며, recv()는 공유 메모리 링에서 원시 프레임을 읽고 send()와
+    set_filters()는 엔진 프로세스로 전달합니다. GUI가 멈춰 있어도 엔진은 드라이버
+    버퍼를 계속 비우므로, 링이 넘치기 전까지는 프레임을 잃지 않습니다.
+    디코딩은 하지 않습니다 (CANReceiver와 CanEngine이 GUI 프로세스에서 처리).
+    """
+
+    def __init__(self, capacity=ENGINE_RING_CAPACITY, load_rate=None, **bus_kwargs):
+        self.ring = SharedFrameRing.create(capacity)
+        self.pending = deque()
+        # Windows와 같은 방식(spawn)으로 띄워 PyQt 상태를 물려받지 않게 함
+        context = mp.get_context("spawn")
+        self.commands = context.Queue()
+        self.ready = context.Event()  # 엔진이 링에 프레임을 기록하면 set
+        self.status = status = context.Queue()  # 시작 결과, 이후에는 송신/필터 실패
+        self.engine_errors = 0  # 엔진 프로세스에서 실패한 송신/필터 요청 수
+        log_queue = context.Queue(LOG_QUEUE_SIZE)
+        self.log_listener = forward_records(log_queue)
+        self.process = context.Process(
+            target=_engine_main,
+            args=(
+                bus_kwargs, self.ring.name, capacity, self.commands, status, self.ready,
+                log_queue, logger.getEffectiveLevel(), load_rate,
+            ),
+            daemon=True,
+        )
+        self.process.start()
+
+        try:
+            result, error = status.get(timeout=ENGINE_START_TIMEOUT)
+        except queue.Empty:
+            result, error = "error", "RX engine did not start"
+        if result != "ok":
+            self.process.join(timeout=1.0)
+            if self.process.is_alive():
+                self.process.terminate()
+            self.ring.close()
+            self.log_listener.stop()
+            raise can.CanError(error)
+
+    @property
+    def overflow(self):
+        """링이 가득 차 엔진이 버린 프레임 수."""
+        return self.ring.overflow
+
+    def recv(self, timeout=None):
+        if not self.pending:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while True:
+                # 읽기 전에 지워야, 읽은 뒤 엔진이 기록한 프레임의 알림을 놓치지 않음
+                self.ready.clear()
+                self.pending.extend(self.ring.read(ENGINE_MAX_BATCH))
+                if self.pending:
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self.ready.wait(remaining)
+        return self.pending.popleft()
+
+    def collect_engine_errors(self):
+        """엔진 프로세스가 보고한 송신/필터 실패를 세고 로그로 남깁니다."""
+        while True:
+            try:
+                _, error = self.status.get_nowait()
+            except queue.Empty:
+                return
+            self.engine_errors += 1
+            limited(logging.ERROR, ("[RxEngine] Command failed",), "[RxEngine] %s", error)
+
+    def send(self, msg, timeout=None):
+        self.commands.put(("send", msg))
+        # 엔진 쪽 송신은 비동기이므로 이전 요청의 실패는 여기서 기록만 함 (이번 요청은 그대로 보냄)
+        self.collect_engine_errors()
+
+    def set_filters(self, filters=None):
+        self.commands.put(("filters", filters))
+        self.collect_engine_errors()
+
+    def shutdown(self):
+        self.commands.put(("stop",))
+        self.process.join(timeout=2.0)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.ring.close()
+        # 엔진이 끝나며 보낸 레코드까지 옮긴 뒤 멈춤
+        self.log_listener.stop()
+
+
+if __name__ == "__main__":
+    # 사용법: python rx_engine.py [GUI 정지 시간(초)] [프레임/초]
+    # 1Mbit/s에서 8바이트 표준 프레임(스터핑 포함 약 125비트)은 초당 약 8000개
+    stall = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    rate = float(sys.argv[2]) if len(sys.argv) > 2 else 8000.0
+
+    bus = EngineBus(
+        interface="virtual", channel="rx_engine_bench", bitrate=1000000, load_rate=rate
+    )
+    time.sleep(0.5)
+    print(f"GUI blocked for {stall:.1f} s at {rate:.0f} frames/s ...")
+    time.sleep(stall)
+    backlog = bus.ring.pending()
+
+    received = []
+    start = time.perf_counter()
+    while True:
+        msg = bus.recv(timeout=0.2)
+        if msg is None:
+            break
+        received.append(int.from_bytes(msg.data, "little"))
+        if len(received) >= backlog:
+            break
+    drain_s = time.perf_counter() - start
+    overflow = bus.overflow
+    bus.shutdown()
+
+    gaps = sum(1 for a, b in zip(received, received[1:]) if b != a + 1)
+    print(f"  backlog after stall : {backlog} frames")
+    print(f"  drained             : {len(received)} frames in {drain_s * 1000:.1f} ms")
+    print(f"  sequence gaps       : {gaps}")
+    print(f"  ring overflow       : {overflow}")
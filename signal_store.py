@@ -0,0 +1,155 @@
+# signal_store.py
+from array import array
+
+from can_codec import compile_message_decoder, signal_extract_source
+
+NODE_COUNT = 32  # 노드 ID 0~31
+
+
+def compile_message_writer(message, columns):
+    """payload를 디코딩해 값 행(row)에 바로 기록하는 함수를 생성합니다.
+
+    값이 바뀐 signal만 기록하고 dirty 비트를 세웁니다. 생성할 수 없으면 None.
+    """
+    if compile_message_decoder(message) is None:
+        return None
+
+    length = message.length
+    body = [
+        "def write(data, row, dirty):",
+        f"    if len(data) != {length}:",
+        "        return False",
+    ]
+    if any(s.byte_order == "little_endian" for s in message.signals):
+        body.append("    le = from_bytes(data, 'little')")
+    if any(s.byte_order == "big_endian" for s in message.signals):
+        body.append("    be = from_bytes(data, 'big')")
+
+    for index, (signal, column) in enumerate(zip(message.signals, columns)):
+        lines, value = signal_extract_source(signal, length, index)
+        body.extend(lines)
+        body.append(f"    v = {value}")
+        body.append(f"    if row[{column}] != v:")
+        body.append(f"        row[{column}] = v")
+        body.append(f"        dirty[{column}] = 1")
+    body.append("    return True")
+
+    namespace = {"from_bytes": int.from_bytes}
+    exec("\n".join(body), namespace)
+    return namespace["write"]
+
+
+class SignalStore:
+    """(노드, signal) 값 행렬. DBC 로드 시 한 번 만들고 수신 중에는 새로 할당하지 않습니다.
+
+    values[node]는 array('d') 한 행이고, 열은 DBC의 모든 signal을 메시지 순서대로 나열한
+    것입니다. dirty[node]는 같은 열 순서의 bytearray로, 값이 바뀐 signal을 표시합니다.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.columns = {}  # (message_name, signal_name) -> 열 번호
+        self.message_columns = {}  # message_name -> (signal 이름 목록, 열 번호 목록)
+        self.message_index = {}  # message_name -> 메시지 번호 (seen 행렬용)
+        self.int_columns = bytearray()  # 스케일 없는 정수 signal이면 1
+        self.writers = {}  # frame_id -> (message_name, writer 또는 None)
+
+        for message in db.messages:
+            names = []
+            cols = []
+            for signal in message.signals:
+                column = len(self.int_columns)
+                self.columns[(message.name, signal.name)] = column
+                names.append(signal.name)
+                cols.append(column)
+                is_int = (
+                    not signal.is_float
+                    and type(signal.scale) is int
+                    and type(signal.offset) is int
+                )
+                self.int_columns.append(1 if is_int else 0)
+            self.message_columns[message.name] = (names, cols)
+            self.message_index[message.name] = len(self.message_index)
+            self.writers[message.frame_id] = (
+                message.name,
+                compile_message_writer(message, cols),
+            )
+
+        width = len(self.int_columns)
+        self.width = width
+        self.values = [array("d", bytes(8 * width)) for _ in range(NODE_COUNT)]
+        self.dirty = [bytearray(width) for _ in range(NODE_COUNT)]
+        # 노드별로 한 번이라도 값이 기록된 메시지
+        self.seen = [bytearray(len(self.message_index)) for _ in range(NODE_COUNT)]
+
+    def _to_python(self, column, value):
+        if self.int_columns[column] and value.is_integer():
+            return int(value)
+        return value
+
+    def write_frame(self, node, frame_id, data):
+        """수신 payload를 디코딩해 기록합니다. DBC에 없거나 디코딩할 수 없으면 False."""
+        entry = self.writers.get(frame_id)
+        if entry is None:
+            return False
+        message_name, writer = entry
+        if writer is not None and writer(data, self.values[node], self.dirty[node]):
+            self.seen[node][self.message_index[message_name]] = 1
+            return True
+
+        message = self.db.get_message_by_frame_id(frame_id)
+        self.write_message(node, message_name, message.decode(data, decode_choices=False))
+        return True
+
+    def write_message(self, node, message_name, values):
+        """signal 이름 -> 값 dict를 기록합니다 (배치 디코딩 결과, 사용자 입력 등)."""
+        row = self.values[node]
+        dirty = self.dirty[node]
+        for signal_name, value in values.items():
+            column = self.columns.get((message_name, signal_name))
+            if column is None:
+                continue
+            if row[column] != value:
+                row[column] = value
+                dirty[column] = 1
+        self.seen[node][self.message_index[message_name]] = 1
+
+    def has_message(self, node, message_name):
+        index = self.message_index.get(message_name)
+        return index is not None and bool(self.seen[node][index])
+
+    def read(self, node, message_name, signal_name):
+        """signal 값 하나. 해당 노드에서 아직 값이 없는 메시지면 KeyError."""
+        if not self.has_message(node, message_name):
+            raise KeyError(message_name)
+        column = self.columns[(message_name, signal_name)]
+        return self._to_python(column, self.values[node][column])
+
+    def read_message(self, node, message_name):
+        """메시지의 모든 signal 값 dict. 아직 값이 없으면 빈 dict."""
+        if not self.has_message(node, message_name):
+            return {}
+        row = self.values[node]
+        names, cols = self.message_columns[message_name]
+        return {
+            name: self._to_python(column, row[column]) for name, column in zip(names, cols)
+        }
+
+    def take_dirty(self, node, message_name):
+        """값이 바뀐 signal 이름 목록을 돌려주고 dirty 비트를 지웁니다."""
+        dirty = self.dirty[node]
+        names, cols = self.message_columns.get(message_name, ((), ()))
+        changed = []
+        for name, column in zip(names, cols):
+            if dirty[column]:
+                dirty[column] = 0
+                changed.append(name)
+        return changed
+
+    def mark_dirty(self, node, message_name):
+        """메시지의 모든 signal을 다시 표시하도록 표시합니다 (보는 노드가 바뀐 경우 등)."""
+        if not self.has_message(node, message_name):
+            return
+        dirty = self.dirty[node]
+        for column in self.message_columns[message_name][1]:
+            dirty[column] = 1
@@ -0,0 +1,225 @@
+# simulator.py
+import logging
+import math
+import os
+import random
+import sys
+import threading
+import time
+
+import can
+import cantools
+
+from app_log import limited
+
+SIM_CHANNEL = "mstg_sim"  # 시뮬레이터와 GUI가 공유하는 python-can virtual 채널
+SIM_DBC_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "dist", "CAN_MSTG_Rev.2.14_common_onlyVEL.dbc"
+)
+SIM_REPORT_HZ = 1000  # RSP_PVT/IDQ/VDQ 기본 송신 주기
+SIM_FRAME_BITS = 125  # 8바이트 표준 프레임의 평균 비트 수 (스터핑 포함)
+SIM_TICK = 0.0005  # 스케줄러 확인 간격(초)
+
+# CMD_REPORT_EN 플래그 -> 스트리밍할 응답 메시지
+SIM_REPORTS = {
+    "PVT": "ID00_21_RSP_PVT_REPORT",
+    "IDQ": "ID00_22_RSP_IDQ_REPORT",
+    "VDQ": "ID00_23_RSP_VDQ_REPORT",
+}
+
+
+def _clamp(value, low, high):
+    return max(low, min(high, value))
+
+
+class SimulatedDrive:
+    """MSTG 드라이브 노드 하나의 상태. 속도 명령을 1차 지연으로 따라갑니다."""
+
+    TIME_CONSTANT = 0.05  # 속도 응답 시정수(초)
+    PULSES_PER_REV = 4096
+    KE = 0.01  # V/RPM
+    KT = 0.5  # Nm/A
+
+    def __init__(self, node_id):
+        self.node_id = node_id
+        self.enabled = False
+        self.cmd_vel = 0.0
+        self.vel = 0.0
+        self.pos = 0.0
+        self.torque = 0.0
+        self.reports = set()  # CMD_REPORT_EN으로 켜진 보고 (SIM_REPORTS의 key)
+        self.next_due = {}  # 보고 이름 -> 다음 송신 시각
+
+    def step(self, dt):
+        target = self.cmd_vel if self.enabled else 0.0
+        accel = (target - self.vel) * (1.0 - math.exp(-dt / self.TIME_CONSTANT))
+        self.vel += accel
+        self.pos += self.vel / 60.0 * self.PULSES_PER_REV * dt
+        self.torque = accel / dt * 0.001 + random.gauss(0.0, 0.05) if dt > 0 else 0.0
+
+    def signals(self, report):
+        iq = self.torque / self.KT
+        iq = round(_clamp(iq, -327.68, 327.67), 2)
+        if report == "PVT":
+            return {
+                "Apos": (int(self.pos) + 2**31) % 2**32 - 2**31,  # 32비트 카운터처럼 wrap
+                "Avel": int(_clamp(self.vel, -32768, 32767)),
+                "Atorq": round(_clamp(self.torque, -3276.8, 3276.7), 1),
+            }
+        if report == "IDQ":
+            return {"T_Id": 0.0, "T_Iq": iq, "A_Id": 0.0, "A_Iq": iq}
+        return {
+            "Vd": round(_clamp(-iq * 0.1, -327.68, 327.67), 2),
+            "Vq": round(_clamp(self.vel * self.KE, -327.68, 327.67), 2),
+            "Rsv32": 0,
+        }
+
+
+class DriveSimulator(threading.Thread):
+    """virtual 버스에서 여러 MSTG 노드를 흉내 내는 스레드.
+
+    ID00_04_CMD_FUNC_EN(GET_SRV_STATE)에 RSP_SRV_STATE로 답하고, CMD_REPORT_EN으로
+    켜진 PVT/IDQ/VDQ 보고를 report_hz 주기로 보냅니다. 전체 송신량은 bitrate로 제한해
+    실제 버스가 낼 수 있는 부하를 넘지 않습니다.
+    """
+
+    def __init__(
+        self,
+        node_ids=range(1, 9),
+        report_hz=SIM_REPORT_HZ,
+        bitrate=1000000,
+        dbc_file=SIM_DBC_FILE,
+        channel=SIM_CHANNEL,
+    ):
+        super().__init__(daemon=True)
+        self.db = cantools.database.load_file(dbc_file)
+        self.bus = can.Bus(interface="virtual", channel=channel)
+        self.nodes = {}
+        for node_id in node_ids:
+            node_id = int(node_id) & 0x1F
+            self.nodes[node_id] = SimulatedDrive(node_id)
+        self.period = 1.0 / report_hz
+        self.frame_budget = bitrate / SIM_FRAME_BITS  # 초당 보낼 수 있는 최대 프레임 수
+        self.running = False
+        self.frames_sent = 0
+        self.frames_deferred = 0  # 버스 대역폭이 모자라 보고를 다음 틱으로 미룬 횟수
+
+        self.report_messages = {
+            report: self.db.get_message_by_name(name) for report, name in SIM_REPORTS.items()
+        }
+        self.srv_state_message = self.db.get_message_by_name("ID00_19_RSP_SRV_STATE")
+        self.commands = {}  # cmd ID -> (message, 처리 함수)
+        for name, handler in (
+            ("ID00_04_CMD_FUNC_EN", self._on_func_en),
+            ("ID00_03_CMD_REPORT_EN", self._on_report_en),
+            ("ID00_01_CMD_CTRL_VEL", self._on_ctrl_vel),
+        ):
+            message = self.db.get_message_by_name(name)
+            self.commands[message.frame_id & 0x3F] = (message, handler)
+
+    def run(self):
+        self.running = True
+        last = time.perf_counter()
+        tokens = 0.0
+        while self.running:
+            msg = self.bus.recv(timeout=SIM_TICK)
+            while msg is not None:
+                self._handle_command(msg)
+                msg = self.bus.recv(timeout=0.0)
+
+            now = time.perf_counter()
+            dt = now - last
+            last = now
+            tokens = min(tokens + dt * self.frame_budget, self.frame_budget * SIM_TICK * 4)
+            for node in self.nodes.values():
+                node.step(dt)
+                for report in node.reports:
+                    due = node.next_due.get(report, now)
+                    if due > now:
+                        continue
+                    if tokens < 1.0:
+                        self.frames_deferred += 1
+                        continue
+                    tokens -= 1.0
+                    self._send(node.node_id, self.report_messages[report], node.signals(report))
+                    # 밀린 주기는 한 번만 보내고 현재 시각 기준으로 다시 맞춤
+                    node.next_due[report] = max(due + self.period, now)
+        self.bus.shutdown()
+
+    def _send(self, node_id, message, values):
+        data = message.encode(values, strict=False)
+        frame_id = (node_id << 6) | (message.frame_id & 0x3F)
+        self.bus.send(can.Message(arbitration_id=frame_id, data=data, is_extended_id=False))
+        self.frames_sent += 1
+
+    def _handle_command(self, msg):
+        command = self.commands.get(msg.arbitration_id & 0x3F)
+        node = self.nodes.get((msg.arbitration_id >> 6) & 0x1F)
+        if command is None or node is None:
+            return
+        message, handler = command
+        try:
+            values = message.decode(msg.data, decode_choices=False)
+        except Exception as e:
+            limited(
+                logging.WARNING,
+                ("[Simulator] Decode error for 0x%X", msg.arbitration_id),
+                "[Simulator] Decode error for 0x%X: %s",
+                msg.arbitration_id,
+                e,
+            )
+            return
+        handler(node, values)
+
+    def _on_func_en(self, node, values):
+        if values.get("GET_SRV_STATE"):
+            state = {signal.name: 0 for signal in self.srv_state_message.signals}
+            state["SRV_State"] = 2 if node.enabled else 1
+            self._send(node.node_id, self.srv_state_message, state)
+
+    def _on_report_en(self, node, values):
+        node.reports = {report for report in SIM_REPORTS if values.get(report)}
+        node.next_due = {}
+
+    def _on_ctrl_vel(self, node, values):
+        node.enabled = bool(values.get("EN"))
+        node.cmd_vel = float(values.get("CMD_VEL", 0))
+
+    def stop(self):
+        self.running = False
+        self.join(timeout=1.0)
+
+
+if __name__ == "__main__":
+    # 사용법: python simulator.py [노드 수] [보고 주기 Hz] [시간(초)]
+    # GUI 없이 모든 노드의 PVT/IDQ/VDQ 보고를 켜고 버스 부하를 측정합니다.
+    nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    report_hz = float(sys.argv[2]) if len(sys.argv) > 2 else SIM_REPORT_HZ
+    duration = float(sys.argv[3]) if len(sys.argv) > 3 else 5.0
+
+    simulator = DriveSimulator(range(1, nodes + 1), report_hz)
+    simulator.start()
+    host = can.Bus(interface="virtual", channel=SIM_CHANNEL)
+    report_en = simulator.db.get_message_by_name("ID00_03_CMD_REPORT_EN")
+    values = {signal.name: 0 for signal in report_en.signals}
+    values.update({report: 1 for report in SIM_REPORTS})
+    for node_id in range(1, nodes + 1):
+        host.send(
+            can.Message(
+                arbitration_id=(node_id << 6) | (report_en.frame_id & 0x3F),
+                data=report_en.encode(values),
+                is_extended_id=False,
+            )
+        )
+
+    received = 0
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        if host.recv(timeout=0.1) is not None:
+            received += 1
+    simulator.stop()
+    host.shutdown()
+    print(
+        f"{nodes} nodes @ {report_hz:.0f} Hz: {received / duration:.0f} frames/s received, "
+        f"{simulator.frames_deferred} report deferrals due to bus bandwidth"
+    )
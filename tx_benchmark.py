@@ -0,0 +1,85 @@
+# tx_benchmark.py
+# 사용법: python tx_benchmark.py [틱 수]
+# 주기 송신 틱 하나의 비용을 잽니다. Multi 슬롯 8개와 Single 제어 모드 각각에 대해
+# 틱마다 인코딩하던 방식(before)과 값 적용 시 인코딩해 둔 프레임을 보내는 방식(after)을 비교합니다.
+import sys
+import time
+
+import numpy as np
+from PyQt5.QtCore import QCoreApplication
+
+from can_engine import CanEngine
+from simulator import SIM_DBC_FILE
+
+BENCH_TICKS = 5000
+BENCH_SLOTS = 8
+BENCH_CHANNEL = "tx_bench"  # 수신 측이 없는 virtual 채널 (송신 비용만 측정)
+BENCH_MESSAGE = "ID00_01_CMD_CTRL_VEL"
+BENCH_VALUES = {"EN": 1, "CMD_VEL": 1500}
+
+
+def time_ticks(tick, ticks):
+    samples = np.empty(ticks)
+    for i in range(ticks):
+        t0 = time.perf_counter()
+        tick()
+        samples[i] = time.perf_counter() - t0
+    return samples
+
+
+def report(label, samples):
+    print(
+        f"{label:<24} mean {samples.mean() * 1e6:7.1f} us/tick, "
+        f"p99 {np.percentile(samples, 99) * 1e6:7.1f} us"
+    )
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else BENCH_TICKS
+
+    engine = CanEngine()
+    engine.load_dbc(SIM_DBC_FILE)
+    engine.connect(dict(bustype="virtual", channel=BENCH_CHANNEL))
+    node_ids = range(1, BENCH_SLOTS + 1)
+
+    # Multi: 슬롯마다 signal dict → raw 변환 → encode → can.Message 생성 (이전 방식)
+    def multi_encode_every_tick():
+        for node_id in node_ids:
+            frame = engine.encode_frame(BENCH_MESSAGE, BENCH_VALUES, node_id)
+            engine.send_frame(frame)
+
+    frames = [engine.encode_frame(BENCH_MESSAGE, BENCH_VALUES, node_id) for node_id in node_ids]
+
+    def multi_cached():
+        for frame in frames:
+            engine.send_frame(frame)
+
+    # Single 제어 모드: 보관한 프레임을 매 틱 버리면 이전 방식과 같음
+    engine.set_node_id(1)
+    engine.control_keyword = "CTRL_VEL"
+
+    def single_encode_every_tick():
+        engine.tx_frames.clear()
+        engine.send_control_messages()
+
+    # 제어 모드 메시지 찾기: 매번 이름을 훑기(이전 방식) vs DBC 로드 때 만든 인덱스 조회
+    def lookup_scan():
+        return [
+            engine.db.get_message_by_name(name)
+            for name in engine.message_data
+            if engine.control_keyword in name
+        ]
+
+    report(f"multi x{BENCH_SLOTS} before", time_ticks(multi_encode_every_tick, ticks))
+    report(f"multi x{BENCH_SLOTS} after", time_ticks(multi_cached, ticks))
+    report("single before", time_ticks(single_encode_every_tick, ticks))
+    report("single after", time_ticks(engine.send_control_messages, ticks))
+    report("control lookup scan", time_ticks(lookup_scan, ticks))
+    report("control lookup index", time_ticks(engine.control_messages, ticks))
+    engine.close()
+
+
+if __name__ == "__main__":
+    # CanEngine의 CANReceiver(QThread)가 쓰는 Qt 앱. main()이 끝날 때까지 참조를 유지해야 함
+    app = QCoreApplication(sys.argv[:1])
+    main()
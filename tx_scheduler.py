@@ -0,0 +1,458 @@
+# tx_scheduler.py
+import ctypes
+import logging
+import math
+import sys
+import threading
+import time
+from collections import deque
+
+import can
+import numpy as np
+
+from app_log import limited
+
+TX_STATS_WINDOW = 1000  # 주기/지터 통계에 쓰는 최근 송신 간격 수
+TX_WHEEL_TICK = 0.001  # 타이밍 휠 버킷 하나의 길이(초). 주기와 위상은 이 단위로 반올림
+TX_WHEEL_MAX_TICKS = 60000  # 휠 한 바퀴(모든 주기의 최소공배수)의 최대 tick 수
+
+# 마감을 한 주기 이상 놓쳤을 때의 처리
+CATCH_UP_SKIP = "skip"  # 놓친 주기는 건너뛰고 원래 위상의 다음 마감에 보냄
+CATCH_UP_BURST = "burst"  # 놓친 주기만큼 바로 몰아서 보냄
+CATCH_UP_RESET = "reset"  # 지금 보내고 지금부터 다시 주기를 셈 (위상이 밀림)
+CATCH_UP_POLICIES = (CATCH_UP_SKIP, CATCH_UP_BURST, CATCH_UP_RESET)
+
+
+def _set_timer_resolution(enable):
+    """Windows에서 타이머 해상도를 1ms로 올리고 현재 스레드 우선순위를 한 단계 높입니다.
+
+    기본 해상도(약 15.6ms)로는 10ms 주기를 지킬 수 없습니다. 송신 스레드가 도는 동안만
+    켜 둡니다. 다른 OS에서는 아무것도 하지 않습니다.
+    """
+    if sys.platform != "win32":
+        return
+    winmm = ctypes.WinDLL("winmm")
+    if enable:
+        winmm.timeBeginPeriod(1)
+        kernel32 = ctypes.WinDLL("kernel32")
+        kernel32.SetThreadPriority(kernel32.GetCurrentThread(), 1)  # ABOVE_NORMAL
+    else:
+        winmm.timeEndPeriod(1)
+
+
+def frame_bits(msg):
+    """비트 스터핑 최악의 경우를 포함한 프레임 하나의 비트 수 (CAN 2.0, ISO 11898)."""
+    header = 54 if msg.is_extended_id else 34
+    data = 8 * len(msg.data)
+    return header + data + 13 + (header + data - 1) // 4
+
+
+class TimingWheel:
+    """주기와 위상이 제각각인 프레임을 휠 한 바퀴 동안의 tick 버킷에 나눠 둔 송신표.
+
+    entries는 (frame, 주기(초), 위상(초) 또는 None) 목록입니다. 한 바퀴(cycle)는 모든
+    주기의 최소공배수이고, 위상이 None이면 이미 배치된 프레임이 가장 적은 tick을 골라
+    같은 주기의 프레임이 한 tick에 몰리지 않고 고르게 퍼지게 합니다.
+    schedule에는 비어 있지 않은 버킷만 (바퀴 안의 시각, 프레임들)로 남기므로 송신 스레드는
+    보낼 프레임이 있는 tick에만 깨어납니다.
+    """
+
+    def __init__(self, entries, tick=TX_WHEEL_TICK):
+        entries = list(entries)
+        periods = [max(1, round(period / tick)) for _, period, _ in entries]
+        cycle = 1
+        for period in periods:
+            cycle = math.lcm(cycle, period)
+        if cycle > TX_WHEEL_MAX_TICKS:
+            raise ValueError(
+                f"TX periods repeat only every {cycle * tick:.0f} s; "
+                "use periods that are multiples of each other"
+            )
+
+        load = [0] * cycle
+        buckets = {}
+        self.entries = []  # (frame, 주기(초), 정해진 위상(초))
+        # 위상이 정해진 프레임을 먼저 놓고, 자동 위상은 짧은 주기부터 빈 tick에 채움
+        order = sorted(range(len(entries)), key=lambda i: (entries[i][2] is None, periods[i]))
+        for i in order:
+            frame, _, offset = entries[i]
+            period = periods[i]
+            if offset is None:
+                offset = min(range(period), key=lambda o: (max(load[o::period]), o))
+            else:
+                offset = round(offset / tick) % period
+            for t in range(offset, cycle, period):
+                load[t] += 1
+                buckets.setdefault(t, []).append((i, frame))
+            self.entries.append((frame, period * tick, offset * tick))
+
+        self.tick = tick
+        self.cycle = cycle * tick
+        self.peak = max(load) if entries else 0  # 한 tick에 몰리는 최대 프레임 수
+        # 같은 tick 안에서는 entries 순서대로 보냄
+        self.schedule = [
+            (t * tick, tuple(frame for _, frame in sorted(buckets[t], key=lambda b: b[0])))
+            for t in sorted(buckets)
+        ]
+
+    @classmethod
+    def uniform(cls, period, frames):
+        """모든 프레임을 같은 주기, 같은 tick에 보내는 휠 (버킷 하나)."""
+        return cls([(frame, period, 0.0) for frame in frames])
+
+    @property
+    def shape(self):
+        """프레임 내용만 다른 휠은 shape가 같아 위상을 유지한 채 바꿔 넣을 수 있습니다."""
+        return self.cycle, tuple((offset, len(frames)) for offset, frames in self.schedule)
+
+    def bus_load(self, bitrate):
+        """이 휠이 차지하는 버스 대역폭 비율 (최악의 비트 스터핑 기준)."""
+        bits = sum(frame_bits(frame) / period for frame, period, _ in self.entries)
+        return bits / bitrate
+
+
+class TxStream:
+    """TimingWheel 하나를 보내는 스트림과 그 송신 통계."""
+
+    def __init__(self, name, wheel, catch_up=CATCH_UP_SKIP):
+        if catch_up not in CATCH_UP_POLICIES:
+            raise ValueError(f"Unknown catch-up policy: {catch_up}")
+        self.name = name
+        self.wheel = wheel
+        self.catch_up = catch_up
+        self.index = 0  # 다음에 보낼 schedule 항목
+        self.cycle_start = None  # 현재 바퀴가 시작된 시각
+        self.next_deadline = None  # 첫 송신 전에는 None (스케줄러가 현재 시각으로 맞춤)
+        self.last_sent = None
+        self.last_deadline = None
+        # 실제 송신 간격 - 예정 간격(초). 버킷 하나짜리 스트림이면 |값|이 명목 주기와의 차이
+        self.deviations = deque(maxlen=TX_STATS_WINDOW)
+        self.sent = 0
+        self.missed = 0  # 늦어서 같은 프레임의 주기를 놓친 횟수
+        self.errors = 0
+
+    def start(self, now):
+        self.index = 0
+        self.cycle_start = now - self.wheel.schedule[0][0]
+        self.next_deadline = now
+
+    def frames_due(self):
+        return self.wheel.schedule[self.index][1]
+
+    def advance(self):
+        self.index += 1
+        if self.index == len(self.wheel.schedule):
+            self.index = 0
+            self.cycle_start += self.wheel.cycle
+        self.next_deadline = self.cycle_start + self.wheel.schedule[self.index][0]
+
+    def stats(self):
+        """실제 주기 평균, p99 지터(예정 간격과의 차이), 놓친 마감 수 (ms 단위)."""
+        deviations = np.array(list(self.deviations))
+        buckets = len(self.wheel.schedule)
+        if len(deviations) == 0:
+            mean = jitter = 0.0
+        else:
+            mean = self.wheel.cycle / buckets + float(deviations.mean())
+            jitter = float(np.percentile(np.abs(deviations), 99))
+        return {
+            "name": self.name,
+            "catch_up": self.catch_up,
+            "period_ms": self.wheel.cycle * 1000.0,
+            "buckets": buckets,
+            "mean_period_ms": mean * 1000.0,
+            "jitter_p99_ms": jitter * 1000.0,
+            "missed": self.missed,
+            "sent": self.sent,
+            "errors": self.errors,
+        }
+
+
+class TxScheduler:
+    """주기 송신 전용 스레드.
+
+    마감 시각을 anchor + n × period로 절대값으로 계산하므로 sleep 오차가 쌓이지 않고
+    (drift 보정), GUI 이벤트 루프가 멈춰도 송신은 계속됩니다. 마감까지는 Event에서 잠들어
+    있으므로 바쁜 대기가 없고, 스레드는 스트림이 있는 동안만 돌고 마지막 스트림이 빠지면
+    끝납니다. 스트림의 프레임은 GUI 스레드가 미리 인코딩해 통째로 바꿔 넣습니다.
+    """
+
+    def __init__(self, send):
+        self.send = send  # send(frame, 스트림 이름) — CanEngine.send_frame (이름은 로그 태그)
+        self.streams = {}
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.thread = None  # 스트림이 있을 때만 도는 송신 스레드
+
+    def set_stream(self, name, period, frames, catch_up=CATCH_UP_SKIP):
+        """name 스트림이 frames를 모두 period마다 보내게 합니다."""
+        self.set_schedule(name, TimingWheel.uniform(period, frames), catch_up)
+
+    def set_schedule(self, name, wheel, catch_up=CATCH_UP_SKIP):
+        """name 스트림의 송신표를 바꿉니다. 프레임 내용만 바뀌면 위상과 통계를 유지합니다."""
+        if catch_up not in CATCH_UP_POLICIES:
+            raise ValueError(f"Unknown catch-up policy: {catch_up}")
+        if not wheel.schedule:
+            self.remove_stream(name)
+            return
+        with self.lock:
+            stream = self.streams.get(name)
+            if stream is not None and stream.wheel.shape == wheel.shape:
+                stream.wheel = wheel
+                stream.catch_up = catch_up
+            else:
+                self.streams = {**self.streams, name: TxStream(name, wheel, catch_up)}
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+        self.wake.set()
+
+    def remove_stream(self, name):
+        with self.lock:
+            if name not in self.streams:
+                return
+            self.streams = {key: s for key, s in self.streams.items() if key != name}
+        self.wake.set()
+
+    def stats(self):
+        return [stream.stats() for stream in self.streams.values()]
+
+    def _run(self):
+        _set_timer_resolution(True)
+        try:
+            while True:
+                with self.lock:
+                    streams = self.streams
+                    if not streams:
+                        # 스레드를 끝내는 것도 lock 안에서 해, set_schedule이 새로 띄울 수 있게 함
+                        self.thread = None
+                        return
+                    self.wake.clear()
+
+                now = time.perf_counter()
+                for stream in streams.values():
+                    if stream.next_deadline is None:
+                        stream.start(now)
+                stream = min(streams.values(), key=lambda s: s.next_deadline)
+                # 기다리는 동안 스트림이 바뀌면 다시 고름
+                if self._wait_until(stream.next_deadline) and self.streams is streams:
+                    self._fire(stream)
+        finally:
+            _set_timer_resolution(False)
+
+    def _wait_until(self, deadline):
+        """deadline까지 잠듭니다. 스트림이 바뀌어 일찍 깨면 False."""
+        remaining = deadline - time.perf_counter()
+        if remaining > 0 and self.wake.wait(remaining):
+            return False
+        return True
+
+    def _fire(self, stream):
+        now = time.perf_counter()
+        deadline = stream.next_deadline
+        frames = stream.frames_due()
+        stream.advance()
+        index, cycle_start = stream.index, stream.cycle_start
+        # 이미 마감이 지난 버킷은 이번에 함께 보냄. 휠에서는 바로 다음 tick의 다른 프레임이
+        # 조금 늦었을 뿐인 경우가 대부분이므로, 같은 프레임이 두 번 겹칠 때만 놓친 주기로 셈
+        sending = {id(frame) for frame in frames}
+        overdue = []
+        while stream.next_deadline <= now:
+            bucket = stream.frames_due()
+            if any(id(frame) in sending for frame in bucket):
+                stream.missed += 1
+            sending.update(id(frame) for frame in bucket)
+            overdue.append(bucket)
+            stream.advance()
+
+        if stream.catch_up == CATCH_UP_BURST:
+            for bucket in overdue:
+                frames = frames + bucket
+        elif stream.catch_up == CATCH_UP_SKIP:
+            # 놓친 주기의 프레임은 한 번씩만 지금 보내고 원래 위상으로 돌아감
+            sent = {id(frame) for frame in frames}
+            for bucket in overdue:
+                for frame in bucket:
+                    if id(frame) not in sent:
+                        sent.add(id(frame))
+                        frames += (frame,)
+        else:
+            # 놓친 버킷도 건너뛰지 않고, 바퀴 전체를 늦은 만큼 밀어 지금부터 다시 셈
+            stream.index = index
+            stream.cycle_start = cycle_start + (now - deadline)
+            stream.next_deadline = stream.cycle_start + stream.wheel.schedule[index][0]
+            deadline = now
+
+        for frame in frames:
+            try:
+                self.send(frame, stream.name)
+            except Exception as e:
+                stream.errors += 1
+                limited(
+                    logging.ERROR,
+                    ("[TxScheduler] %s send failed", stream.name),
+                    "[TxScheduler] %s send failed: %s",
+                    stream.name,
+                    e,
+                )
+
+        if stream.last_sent is not None:
+            stream.deviations.append((now - stream.last_sent) - (deadline - stream.last_deadline))
+        stream.last_sent = now
+        stream.last_deadline = deadline
+        stream.sent += 1
+
+    def stop(self):
+        """모든 스트림을 빼고 송신 스레드가 끝날 때까지 기다립니다."""
+        with self.lock:
+            self.streams = {}
+            thread = self.thread
+        self.wake.set()
+        if thread is not None:
+            thread.join(timeout=1.0)
+
+
+def has_native_periodic(bus):
+    """bus가 드라이버/커널 주기 송신(socketcan BCM, IXXAT 등)을 직접 구현하는지.
+
+    python-can 기본 구현은 파이썬 스레드로 보내므로, 그 경우에는 통계와 catch-up 정책이
+    있는 TxScheduler를 쓰는 편이 낫습니다.
+    """
+    internal = getattr(type(bus), "_send_periodic_internal", None)
+    return internal is not None and internal is not can.BusABC._send_periodic_internal
+
+
+class CyclicTaskStreams:
+    """스트림을 bus.send_periodic() 작업으로 보내는 TxScheduler 대체.
+
+    주기 송신이 드라이버 안에서 일어나므로 파이썬이 10ms 루프에서 완전히 빠집니다.
+    python-can 작업은 arbitration ID 하나만 가질 수 있어 프레임마다 작업을 하나씩 만들고,
+    값만 바뀌면 modify_data로 타이밍을 유지한 채 payload를 바꿉니다.
+    드라이버 작업의 시작 위상은 정할 수 없어 휠의 위상은 쓰지 않고 주기만 따릅니다.
+    마감을 놓치는 일도 드라이버가 처리하므로 catch_up은 받기만 하고 쓰지 않습니다.
+    녹화의 송신 프레임과 지터 통계는 드라이버가 보내는 프레임에는 남지 않습니다.
+    """
+
+    def __init__(self, bus):
+        self.bus = bus
+        self.tasks = {}  # 스트림 이름 -> {arbitration ID: (작업, 주기)}
+        self.periods = {}  # 스트림 이름 -> 가장 짧은 주기 (표시용)
+
+    def set_stream(self, name, period, frames, catch_up=CATCH_UP_SKIP):
+        self.set_schedule(name, TimingWheel.uniform(period, frames), catch_up)
+
+    def set_schedule(self, name, wheel, catch_up=CATCH_UP_SKIP):
+        tasks = self.tasks.get(name, {})
+        updated = {}
+        for frame, period, _ in wheel.entries:
+            # 같은 ID가 여러 번 있으면 마지막 프레임만 보냄 (작업 하나 = ID 하나)
+            task, task_period = tasks.pop(frame.arbitration_id, None) or updated.get(
+                frame.arbitration_id, (None, None)
+            )
+            if task is not None and task_period == period and hasattr(task, "modify_data"):
+                task.modify_data(frame)
+            else:
+                if task is not None:
+                    task.stop()
+                task = self.bus.send_periodic(frame, period)
+            updated[frame.arbitration_id] = (task, period)
+        self._stop_tasks(tasks)
+        if updated:
+            self.tasks[name] = updated
+            self.periods[name] = min(period for _, period in updated.values())
+        else:
+            self.remove_stream(name)
+
+    def remove_stream(self, name):
+        self._stop_tasks(self.tasks.pop(name, {}))
+        self.periods.pop(name, None)
+
+    def stats(self):
+        """드라이버가 보내므로 명목 주기만 알 수 있습니다."""
+        return [
+            {"name": name, "period_ms": self.periods[name] * 1000.0, "native": True}
+            for name in self.tasks
+        ]
+
+    def stop(self):
+        for name in list(self.tasks):
+            self.remove_stream(name)
+
+    @staticmethod
+    def _stop_tasks(tasks):
+        for task, _ in tasks.values():
+            try:
+                task.stop()
+            except Exception as e:
+                limited(
+                    logging.WARNING,
+                    ("[CyclicTask] stop failed",),
+                    "[CyclicTask] stop failed: %s",
+                    e,
+                )
+
+
+def _block_gui(seconds):
+    """GUI 스레드가 파이썬 코드로 바쁜 상황(큰 다시 그리기, 카드 재구성 등)을 흉내 냅니다."""
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += sum(range(1000))
+    return total
+
+
+if __name__ == "__main__":
+    # 사용법: python tx_scheduler.py [시간(초)] [GUI 정지 시간(초)]
+    # 10ms 제어 스트림을 QTimer(이전 방식)와 TxScheduler로 각각 보내면서, GUI 스레드를
+    # 1초마다 지정한 시간만큼 막아 실제 송신 간격의 지터와 놓친 주기를 비교합니다.
+    from PyQt5.QtCore import QCoreApplication, QTimer
+
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    block = float(sys.argv[2]) if len(sys.argv) > 2 else 0.1
+    period = 0.010
+
+    app = QCoreApplication(sys.argv[:1])
+    bus = can.Bus(interface="virtual", channel="tx_scheduler_bench")
+    frame = can.Message(arbitration_id=0x041, data=bytes(8), is_extended_id=False)
+
+    def run_gui_loop(start_tx):
+        """duration 동안 Qt 이벤트 루프를 돌리며 1초마다 block초씩 GUI를 막습니다."""
+        start_tx()
+        blocker = QTimer()
+        blocker.timeout.connect(lambda: _block_gui(block))
+        blocker.start(1000)
+        QTimer.singleShot(int(duration * 1000), app.quit)
+        app.exec_()
+        blocker.stop()
+
+    # 이전 방식: GUI 스레드의 QTimer
+    baseline = TxStream("qtimer", TimingWheel.uniform(period, [frame]))
+
+    def on_qtimer():
+        now = time.perf_counter()
+        if baseline.last_sent is not None:
+            interval = now - baseline.last_sent
+            baseline.deviations.append(interval - period)
+            baseline.missed += max(0, int(interval // period) - 1)
+        baseline.last_sent = now
+        bus.send(frame)
+        baseline.sent += 1
+
+    qtimer = QTimer()
+    qtimer.setTimerType(0)  # Qt.PreciseTimer
+    qtimer.timeout.connect(on_qtimer)
+    run_gui_loop(lambda: qtimer.start(int(period * 1000)))
+    qtimer.stop()
+
+    scheduler = TxScheduler(lambda msg, name: bus.send(msg))
+    run_gui_loop(lambda: scheduler.set_stream("control", period, [frame]))
+    scheduler_stats = scheduler.stats()[0]
+    scheduler.stop()
+    bus.shutdown()
+
+    print(f"10 ms stream for {duration:.0f} s, GUI blocked {block * 1000:.0f} ms every second")
+    for stats in (baseline.stats(), scheduler_stats):
+        print(
+            f"  {stats['name']:<8} mean {stats['mean_period_ms']:6.2f} ms, "
+            f"p99 jitter {stats['jitter_p99_ms']:7.3f} ms, missed {stats['missed']}"
+        )